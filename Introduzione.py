@@ -1,16 +1,27 @@
+import os
+
 import altair as alt
+import pandas as pd
 import polars as pl
 import streamlit as st
 
+from dati import carica_dati, riepilogo_cache, scansiona_partizioni, versione_dati
+from elaborazione_df import RECORD, classifica_record
+from grafici import grafico_in_cache, in_arrow, riepilogo_payload
+from scraping import CARTELLA_DATASET, LEGA_PREDEFINITA
+from sezioni import fine_pagina, inizio_pagina, sezione
+from stili import evidenzia_righe, stile_in_cache
+
+# Tempo del rerun completo, letto in fondo alla pagina (vedi sezioni.py)
+inizio_pagina()
+
 
 # ===============================
 # 1. FUNZIONI FACILITATRICI
 # ===============================
 
 
-# 1) Funzione di caricamento dati
-def carica_dati(path: str):
-    return pl.read_csv(path, null_values=["", "NA ", " NA", "NA"])
+# 1) Funzione di caricamento dati: condivisa tra le pagine e con cache, vedi dati.py
 
 
 # 2) Elaborazione dataset: compatibilità e ordinamento
@@ -72,13 +83,9 @@ def completa_e_ordina(df: pl.DataFrame) -> pl.DataFrame:
 
 
 # 3) Evidenziare una riga di dataset
-def evidenzia_squadra(squadra: str, colore_hex: str): # Usa i codici HEX
-    def highlight(row):
-        if row["Squadra"] == squadra:
-            return [f'background-color: {colore_hex}55'] * len(row)  # '55' è ~30% opacità
-        else:
-            return [''] * len(row)
-    return highlight
+def evidenzia_squadra(df: pd.DataFrame, squadra: str, colore_hex: str): # Usa i codici HEX
+    # tabella e CSS di tutte le celle in un passaggio: le righe della squadra con il colore al ~30% di opacità
+    return df, evidenzia_righe(df, "Squadra", squadra, colore_hex)
 
 
 # ====================================================
@@ -87,10 +94,10 @@ def evidenzia_squadra(squadra: str, colore_hex: str): # Usa i codici HEX
 
 
 # Caricamento dei dataset, completati e ordinati
-df_principale   = carica_dati("principale.csv")
-df_rankings  = carica_dati("rankings.csv")
-df_record = carica_dati("record.csv")
-df_perpetua  = carica_dati("perpetua.csv")
+df_principale   = carica_dati("principale.parquet")
+df_rankings  = carica_dati("rankings.parquet")
+df_record = carica_dati("record.parquet")
+df_perpetua  = carica_dati("perpetua.parquet")
 
 
 # Liverpool - preparazione
@@ -100,12 +107,11 @@ df_liverpool = (
     .select(["Stagione", "Posizione", "Punteggio", "Anno"])
     .rename({"Posizione": "Pos", "Punteggio": "Pts"})
     .sort("Anno")
-    .to_pandas()
 )
 
 # Score inverso: 1° → più grande, 20° → più piccolo
 max_pos = df_liverpool["Pos"].max()
-df_liverpool["Score"] = (max_pos + 1) - df_liverpool["Pos"]
+df_liverpool = df_liverpool.with_columns(((max_pos + 1) - pl.col("Pos")).alias("Score"))
 
 
 
@@ -142,101 +148,147 @@ st.divider()
 st.subheader("Record storici e statistiche rilevanti")
 st.text("Inizio mettendo in evidenza le stagioni più brillanti sotto il profilo statistico, premiando quelle squadre che hanno" \
 " lasciato un segno per la qualità di rendimento.")
-st.dataframe(df_record.slice(0,6), use_container_width=True)
+st.dataframe(in_arrow(df_record.slice(0,6)), use_container_width=True)
 st.markdown("La stagione 2017/18 del Manchester City si conferma come la più dominante della storia recente del calcio inglese," \
 " va a loro il merito di aver sforato per la prima volta la **tripla cifra** nei punti ottenuti.   \n " \
 "L’Arsenal, invece, può vantare un primato ineguagliato: l’unica squadra ad aver chiuso una stagione da **imbattuta**.")
 st.divider()
 st.text("A differenza delle performance esaltanti appena mostrate, la tabella seguente espone" \
 " i risultati più deludenti ottenuti da squadre vincitrici.")
-st.dataframe(df_record.slice(6,6), use_container_width=True)
+st.dataframe(in_arrow(df_record.slice(6,6)), use_container_width=True)
 st.markdown("Il Manchester United emerge (a malincuore per i suoi tifosi) come la protagonista di queste stagioni meno brillanti.   \n " \
 "Notevole — e sorprendente — anche il dato relativo al Chelsea FC: ha vinto un titolo con una differenza reti inferiore" \
 " al numero di partite disputate, il che significa che mediamente non ha mantenuto **nemmeno un gol di scarto per gara**.")
 st.divider()
 st.text("Concludo la sezione relativa ai titoli mostrando le stagioni in cui alcune squadre, pur avendo offerto prestazioni straordinarie," \
 " non sono riuscite a conquistare il titolo, spesso superate da avversarie semplicemente più in forma nel momento cruciale.")
-st.dataframe(df_record.slice(12,6), use_container_width=True)
+st.dataframe(in_arrow(df_record.slice(12,6)), use_container_width=True)
 st.text("In questo contesto, il Liverpool merita una menzione particolare: può essere considerata la squadra “quasi campione” " \
         "per eccellenza, più volte vicina alla vittoria senza mai riuscire a completare l’opera.")
 st.divider()
 st.text("Ecco infine qualche altro dato particolare, su cui però non ci dilungheremo...")
-st.dataframe(df_record.slice(18,7), use_container_width=True)
+st.dataframe(in_arrow(df_record.slice(18,7)), use_container_width=True)
 st.markdown("... Se non per due dati che rivedremo in seguito...")
 st.divider()
 
 
+# -------------------------
+# 3.2.1 Records - classifiche dei primi N
+
+st.text("Ogni record ha anche la sua classifica: i primi N, pari merito compresi, eventualmente solo per una squadra," \
+" per un periodo o (se i dati sono stati raccolti con tabelle.py --leghe) per un'altra competizione.")
+
+# Sezione a sé: record, N, competizione, squadra e stagioni rieseguono solo questa funzione (vedi sezioni.py)
+@sezione("Introduzione")
+def classifiche_dei_record(record: list) -> None:
+    nomi_record = [spec.nome for spec in record]
+    col_record, col_n, col_lega = st.columns([3, 1, 1])
+    spec = record[nomi_record.index(col_record.selectbox("Record", nomi_record))]
+    n_primi = col_n.number_input("Primi N", min_value=1, max_value=100, value=10)
+
+    # competizioni: la Premier League dai file del progetto, le altre dal dataset partizionato (se presente)
+    cartella_leghe = os.path.join(CARTELLA_DATASET, spec.sorgente)
+    leghe = [LEGA_PREDEFINITA]
+    if os.path.isdir(cartella_leghe):
+        leghe += sorted(d.split("=", 1)[1] for d in os.listdir(cartella_leghe) if d.startswith("Lega="))
+    lega = col_lega.selectbox("Competizione", list(dict.fromkeys(leghe)), disabled=len(set(leghe)) == 1)
+    if lega == LEGA_PREDEFINITA:
+        df_sorgente = carica_dati(f"{spec.sorgente}.parquet").lazy()
+    else:
+        df_sorgente = scansiona_partizioni(cartella_leghe).filter(pl.col("Lega") == lega)
+
+    squadra_col = "Vincitore" if spec.sorgente == "principale" else "Squadra"
+    opzioni = df_sorgente.select(
+        pl.col(squadra_col).unique().sort().implode().alias("squadre"), pl.col("Anno").min().alias("primo"), pl.col("Anno").max().alias("ultimo")
+    ).collect().row(0, named=True)
+    col_squadra, col_anni = st.columns([1, 2])
+    squadra = col_squadra.selectbox("Squadra", ["Tutte"] + opzioni["squadre"])
+    anni = col_anni.slider("Stagioni (anno di inizio)", opzioni["primo"], max(opzioni["ultimo"], opzioni["primo"] + 1),
+                           (opzioni["primo"], opzioni["ultimo"]))
+
+    st.dataframe(
+        in_arrow(classifica_record(df_sorgente, spec, n=n_primi, squadra=None if squadra == "Tutte" else squadra, anni=anni, lega=lega)),
+        use_container_width=True, hide_index=True
+    )
+
+
+classifiche_dei_record(RECORD)
+st.divider()
+
+
 # -------------------------
 # 3.3 Liverpool - grafico
 
-# Chart base
-base = alt.Chart(df_liverpool).encode(
-    y=alt.Y("Stagione:O", sort=list(df_liverpool["Stagione"]), title=None),
-    tooltip=[
-        alt.Tooltip("Stagione:O", title="Stagione"),
-        alt.Tooltip("Pos:Q", title="Posizione"),
-        alt.Tooltip("Pts:Q", title="Punti")
-    ]
-)
+# Composizione ricostruita solo quando cambia rankings (vedi grafico_in_cache in grafici.py)
+def grafico_liverpool() -> alt.LayerChart:
+    # Chart base
+    base = alt.Chart(in_arrow(df_liverpool)).encode(
+        y=alt.Y("Stagione:O", sort=list(df_liverpool["Stagione"]), title=None),
+        tooltip=[
+            alt.Tooltip("Stagione:O", title="Stagione"),
+            alt.Tooltip("Pos:Q", title="Posizione"),
+            alt.Tooltip("Pts:Q", title="Punti")
+        ]
+    )
 
-# Barre per lo Score + colore in funzione dei Punti
-bars = base.mark_bar().encode(
-    x=alt.X(
-        "Score:Q",
-        title=None,
-        scale=alt.Scale(domain=[0, max_pos]),
-        axis=alt.Axis(
-            values=list(range(20, 0)),
+    # Barre per lo Score + colore in funzione dei Punti
+    bars = base.mark_bar().encode(
+        x=alt.X(
+            "Score:Q",
+            title=None,
+            scale=alt.Scale(domain=[0, max_pos]),
+            axis=alt.Axis(
+                values=list(range(20, 0)),
+            )
+        ),
+        color=alt.Color(
+            "Pts:Q",
+            scale=alt.Scale(scheme="reds"),
+            legend=alt.Legend(title="Punti")
         )
-    ),
-    color=alt.Color(
-        "Pts:Q",
-        scale=alt.Scale(scheme="reds"),
-        legend=alt.Legend(title="Punti")
     )
-)
 
-# Etichette di punti all’inizio della barra
-labels_pos = base.mark_text(
-    align="left",
-    dx=3,
-    fontSize=10
-).encode(
-    x=alt.value(0),  # posiziona all’inizio
-    text=alt.Text("Pts:Q")
-)
+    # Etichette di punti all’inizio della barra
+    labels_pos = base.mark_text(
+        align="left",
+        dx=3,
+        fontSize=10
+    ).encode(
+        x=alt.value(0),  # posiziona all’inizio
+        text=alt.Text("Pts:Q")
+    )
 
 
-# Etichette di punti alla fine della barra
-labels_pts = base.mark_text(
-    align="left", dx=3, fontSize=10, color="black"
-).encode(
-    x=alt.X("Score:Q"),
-    text=alt.Text("Pos:Q"),
-    color=alt.condition(
-        alt.datum.Pos > 4,        # se Pos ≥ 5
-        alt.value("red"),         # colore rosso
-        alt.value("black")        # altrimenti nero
+    # Etichette di punti alla fine della barra
+    labels_pts = base.mark_text(
+        align="left", dx=3, fontSize=10, color="black"
+    ).encode(
+        x=alt.X("Score:Q"),
+        text=alt.Text("Pos:Q"),
+        color=alt.condition(
+            alt.datum.Pos > 4,        # se Pos ≥ 5
+            alt.value("red"),         # colore rosso
+            alt.value("black")        # altrimenti nero
+        )
     )
-)
 
-# Composizione finale
-chart = (bars + labels_pos + labels_pts).properties(
-    width=700,
-    height=500,
-    background="#f0f0f0",
-    padding={"left":20,"right":20,"top":20,"bottom":20}
-    ).configure_title(
-    fontSize=16, fontWeight="bold", anchor="middle"
-).configure_axis(
-    labelFontSize=12, titleFontSize=14
-)
+    # Composizione finale
+    return (bars + labels_pos + labels_pts).properties(
+        width=700,
+        height=500,
+        background="#f0f0f0",
+        padding={"left":20,"right":20,"top":20,"bottom":20}
+        ).configure_title(
+        fontSize=16, fontWeight="bold", anchor="middle"
+    ).configure_axis(
+        labelFontSize=12, titleFontSize=14
+    )
 
 
 st.subheader("Liverpool: Posizione e Punti per Stagione")
 st.caption("La lunghezza delle barre indica la posizione finale, l'intensità del colore il numero di punti ottenuti." \
 " Le posizioni in rosso sono quelle fuori dalla 'zona champions', valide per l'accesso alla Champions League")
-st.altair_chart(chart, use_container_width=True)
+grafico_in_cache(("liverpool",), versione_dati("rankings.parquet"), grafico_liverpool, use_container_width=True)
 st.markdown("Nel corso delle ultime 32 stagioni, il Liverpool ha centrato l’accesso alla Champions League in ben 20 occasioni," \
 " confermandosi una delle presenze più costanti ai vertici del calcio inglese. In particolare, ha chiuso il campionato al" \
 " **secondo posto per 5 volte**, sfiorando più volte il titolo e consolidando il suo status tra le big della Premier League.")
@@ -248,7 +300,11 @@ st.divider()
 
 st.text("E come ci conferma la classifica perpetua, i Reds sono nella top 3 per punti accumulati.")
 st.caption("Classifica Perpetua: mostra le statistiche di gioco cumulate dalla prima stagione del 1992/93 ad oggi")
-st.dataframe(df_perpetua.to_pandas().head(7).style.apply(evidenzia_squadra("FC Liverpool", "#ec0a0a"), axis=1), use_container_width=True, hide_index=True)
+perpetua_liverpool = stile_in_cache(
+    ("perpetua", "FC Liverpool"), versione_dati("perpetua.parquet"),
+    lambda: evidenzia_squadra(df_perpetua.head(7).to_pandas(), "FC Liverpool", "#ec0a0a"),
+)
+st.dataframe(perpetua_liverpool, use_container_width=True, hide_index=True)
 
 st.divider()
 
@@ -266,7 +322,7 @@ if st.session_state.mostra_dataset:
     
     # 1) df_principale
     st.markdown("**df_principale** (copied and processed): Per ciascuna stagione, la squadra vincitrice e le sue statistiche")
-    st.dataframe(df_principale, use_container_width=True)
+    st.dataframe(in_arrow(df_principale), use_container_width=True)
     st.markdown(
         "**GF**: Goal Fatti &nbsp;&nbsp;&nbsp;&nbsp; **GS**: Goal Subiti &nbsp;&nbsp;&nbsp;&nbsp; **GD**: Goal Difference &nbsp;&nbsp;&nbsp;&nbsp; **PPG**: Points Per Game"
         "<br><br>Il dataset mostrato è stato preso dal sito "
@@ -279,7 +335,7 @@ if st.session_state.mostra_dataset:
 
     # 2) df_rankings
     st.markdown("**df_rankings** (scraped): Classifiche e statistiche di tutte le stagioni")
-    st.dataframe(df_rankings.head(100), use_container_width=True)
+    st.dataframe(in_arrow(df_rankings.head(100)), use_container_width=True)
     st.text("Questo dataset è stato creato tramite il file “crea_rankings.py” presente nella cartella." \
     " (prime 100 righe)")
 
@@ -287,3 +343,9 @@ if st.session_state.mostra_dataset:
     st.markdown("<br><br><br>*Per nascondere i dataset, premere due volte il pulsante.*", unsafe_allow_html=True)
     if st.button("Nascondi dataset"):
         st.session_state.mostra_dataset = False
+
+
+# Contatori della cache dati (hit/miss), byte dei grafici inviati al browser e tempo del rerun nella sidebar
+st.sidebar.caption(riepilogo_cache())
+st.sidebar.caption(riepilogo_payload("Introduzione"))
+st.sidebar.caption(fine_pagina("Introduzione"))
@@ -0,0 +1,68 @@
+# FILE benchmark: tabelle inviate da st.dataframe / st.altair_chart, da Polars via pandas contro Arrow diretto (grafici.py)
+#
+# Per ogni dataset si misura il lavoro che Streamlit fa a ogni rerun per serializzare la tabella (Arrow IPC):
+# - via pandas: frame Polars (o .to_pandas() nella pagina) -> DataFrame pandas -> Arrow, com'era prima
+# - Arrow diretto: in_arrow(frame) -> Arrow, senza la copia pandas
+# riportando tempo, picco di memoria Python/NumPy (tracemalloc: la copia pandas) e se i byte decodificati coincidono.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_arrow.py                 -> dataset reali
+#   python benchmark/bench_arrow.py --scala 100     -> dataset replicati 100 volte
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import polars as pl
+import pyarrow as pa
+from streamlit import dataframe_util
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+from dati import DATASET
+from grafici import in_arrow
+
+
+def misura(funzione, ripetizioni: int = 5) -> tuple[float, int, bytes]:
+    """(mediana ms, picco tracemalloc in byte, risultato)"""
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        risultato = funzione()
+        tempi.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    funzione()
+    _, picco = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(tempi), picco, risultato
+
+
+def decodifica(dati: bytes) -> pa.Table:
+    return pa.ipc.open_stream(dati).read_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serializzazione delle tabelle: via pandas contro Arrow diretto")
+    parser.add_argument("--scala", type=int, default=1, help="repliche delle righe di ogni dataset")
+    args = parser.parse_args()
+
+    righe = []
+    for nome in DATASET:
+        df = pl.read_parquet(CARTELLA / f"{nome}.parquet")
+        df = pl.concat([df] * args.scala)
+        t_pd, m_pd, b_pd = misura(lambda: dataframe_util.convert_anything_to_arrow_bytes(df))
+        t_ar, m_ar, b_ar = misura(lambda: dataframe_util.convert_anything_to_arrow_bytes(in_arrow(df)))
+        righe.append({
+            "dataset": nome, "righe": df.height,
+            "via pandas ms": round(t_pd, 2), "Arrow ms": round(t_ar, 2),
+            "via pandas KiB": m_pd // 1024, "Arrow KiB": m_ar // 1024,
+            "uguali": decodifica(b_pd).equals(decodifica(b_ar)),
+        })
+
+    tabella = pl.DataFrame(righe)
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(tabella)
+        print(tabella.select(pl.sum("via pandas ms", "Arrow ms", "via pandas KiB", "Arrow KiB")))
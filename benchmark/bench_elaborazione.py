@@ -0,0 +1,120 @@
+# FILE benchmark: elaborazione_df.py eager (prima dei LazyFrame) contro la versione lazy con collect_all
+#
+# Ogni versione gira in un processo nuovo, in una cartella temporanea con i dataset di ingresso
+# (reali o replicati N volte spostando le stagioni, così join e record restano sensati).
+# Si misurano tempo dell'elaborazione e picco di memoria (RSS) del processo.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_elaborazione.py                   -> scala 1 e 100
+#   python benchmark/bench_elaborazione.py --scale 1 10 100 --ripetizioni 5
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+VERSIONI = {
+    "eager": Path(__file__).resolve().parent / "elaborazione_eager.py",
+    "lazy": CARTELLA / "elaborazione_df.py",
+}
+INGRESSI = ["winners", "average_age", "top_scorer", "rankings"]
+USCITE = ["average_age", "top_scorer", "rankings", "principale", "titles", "record"]
+
+
+# ===============================
+# 1. DATI SINTETICI
+# ===============================
+
+def _stagione(anno: pl.Expr, separatore: str) -> pl.Expr:
+    return anno.cast(pl.Utf8) + separatore + ((anno + 1) % 100).cast(pl.Utf8).str.zfill(2)
+
+
+def prepara(cartella: Path, scala: int) -> None:
+    """Copia i dataset di ingresso: la copia k ha le stagioni spostate di k * (numero di stagioni)."""
+    for nome in INGRESSI:
+        df = pl.read_parquet(CARTELLA / f"{nome}.parquet")
+        if "Anno" not in df.columns:     # winners ha solo la Stagione "1992-93"
+            df = df.with_columns(pl.col("Stagione").str.slice(0, 4).cast(pl.Int64).alias("Anno"))
+        stagioni = df["Anno"].n_unique()
+        copie = [
+            df.with_columns(pl.col("Anno") + k * stagioni)
+            for k in range(scala)
+        ]
+        df = pl.concat(copie)
+        if nome == "winners":
+            df = df.with_columns(_stagione(pl.col("Anno"), "-").alias("Stagione")).drop("Anno")
+        else:
+            df = df.with_columns(_stagione(pl.col("Anno"), "/").alias("Stagione"))
+        df.write_parquet(cartella / f"{nome}.parquet")
+
+
+# ===============================
+# 2. MISURE
+# ===============================
+
+# Codice eseguito in un processo nuovo: import delle librerie fuori dalla misura, poi lo script
+_PROCESSO = """
+import json, resource, runpy, sys, time
+import altair, pandas, polars
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+prima = rss_kb()
+sys.argv = sys.argv[1:]
+t0 = time.perf_counter()
+runpy.run_path(sys.argv[0], run_name="__main__")
+t1 = time.perf_counter()
+picco = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss   # kB su Linux
+print(json.dumps({"secondi": t1 - t0, "picco_kb": picco, "prima_kb": prima}))
+"""
+
+
+def esegui(script: Path, cartella: Path) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _PROCESSO, str(script), "--forza"],   # --forza: niente nodi saltati tra le ripetizioni
+        cwd=cartella, capture_output=True, text=True, check=True,
+        env={"PYTHONPATH": str(CARTELLA), "PATH": ""},
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def uscite(cartella: Path) -> dict[str, pl.DataFrame]:
+    # l'ultimo record (squadra con più capocannonieri) dipende dall'ordine dei pari merito: escluso dal confronto
+    dati = {nome: pl.read_parquet(cartella / f"{nome}.parquet") for nome in USCITE}
+    dati["record"] = dati["record"].head(-1)
+    return dati
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confronto elaborazione_df eager / lazy")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 100], help="repliche dei dataset di ingresso")
+    parser.add_argument("--ripetizioni", type=int, default=3, help="esecuzioni per versione (si tiene la mediana)")
+    args = parser.parse_args()
+
+    righe = []
+    for scala in args.scale:
+        risultati = {}
+        for versione, script in VERSIONI.items():
+            with tempfile.TemporaryDirectory() as tmp:
+                prepara(Path(tmp), scala)
+                misure = [esegui(script, Path(tmp)) for _ in range(args.ripetizioni)]
+                risultati[versione] = uscite(Path(tmp))
+            righe.append({
+                "scala": scala,
+                "versione": versione,
+                "righe rankings": len(risultati[versione]["rankings"]),
+                "ms": round(statistics.median(m["secondi"] for m in misure) * 1000, 1),
+                "RSS picco MB": round(max(m["picco_kb"] for m in misure) / 1024, 1),
+                "RSS in più MB": round(max(m["picco_kb"] - m["prima_kb"] for m in misure) / 1024, 1),
+            })
+        uguali = all(risultati["eager"][nome].equals(risultati["lazy"][nome]) for nome in USCITE)
+        print(f"Scala x{scala}: uscite uguali tra le versioni: {uguali}")
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
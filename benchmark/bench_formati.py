@@ -0,0 +1,114 @@
+# FILE benchmark: confronto dei tempi di caricamento e della memoria (RSS) tra CSV e Parquet
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_formati.py              -> dataset reali
+#   python benchmark/bench_formati.py --scala 100  -> dataset replicati 100 volte (file più grandi)
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import polars as pl
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dati import DATASET, NULL_VALUES
+
+
+# ===============================
+# 1. MISURE
+# ===============================
+
+# Codice eseguito in un processo nuovo: caricamento "a freddo" (polars già importato)
+_FREDDO = """
+import json, resource, sys, time
+import polars as pl
+path, colonne = sys.argv[1], json.loads(sys.argv[2])
+t0 = time.perf_counter()
+if path.endswith(".parquet"):
+    df = pl.read_parquet(path, columns=colonne)
+else:
+    df = pl.read_csv(path, null_values=%r, columns=colonne)
+t1 = time.perf_counter()
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss   # picco del processo (kB su Linux)
+print(json.dumps({"secondi": t1 - t0, "rss_kb": rss}))
+""" % (NULL_VALUES,)
+
+
+def misura_freddo(path: Path, colonne: list[str] | None) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _FREDDO, str(path), json.dumps(colonne)],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout)
+
+
+def misura_caldo(path: Path, colonne: list[str] | None, ripetizioni: int) -> float:
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        if path.suffix == ".parquet":
+            pl.read_parquet(path, columns=colonne)
+        else:
+            pl.read_csv(path, null_values=NULL_VALUES, columns=colonne)
+        tempi.append(time.perf_counter() - t0)
+    return statistics.median(tempi)
+
+
+# ===============================
+# 2. PREPARAZIONE FILE
+# ===============================
+
+def prepara(cartella: Path, scala: int) -> list[tuple[str, Path, Path]]:
+    """Copia (eventualmente replicati) i dataset in CSV e Parquet nella cartella temporanea."""
+    file = []
+    for nome in DATASET:
+        df = pl.read_parquet(f"{nome}.parquet")
+        if scala > 1:
+            df = pl.concat([df] * scala)
+        csv, parquet = cartella / f"{nome}.csv", cartella / f"{nome}.parquet"
+        df.write_csv(csv)
+        df.write_parquet(parquet)
+        file.append((nome, csv, parquet))
+    return file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scala", type=int, default=1, help="replica ogni dataset N volte")
+    parser.add_argument("--ripetizioni", type=int, default=20, help="letture per la misura a caldo")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        righe = []
+        for nome, csv, parquet in prepara(Path(tmp), args.scala):
+            # proiezione: solo le prime due colonne
+            prime_due = pl.read_parquet_schema(parquet)
+            prime_due = list(prime_due)[:2]
+            for formato, path, colonne in [
+                ("csv", csv, None),
+                ("parquet", parquet, None),
+                ("parquet[2 col]", parquet, prime_due),
+            ]:
+                freddo = misura_freddo(path, colonne)
+                caldo = misura_caldo(path, colonne, args.ripetizioni)
+                righe.append({
+                    "dataset": nome,
+                    "formato": formato,
+                    "kB su disco": round(path.stat().st_size / 1024, 1),
+                    "freddo ms": round(freddo["secondi"] * 1000, 3),
+                    "caldo ms": round(caldo * 1000, 3),
+                    "RSS picco MB": round(freddo["rss_kb"] / 1024, 1),
+                })
+
+    report = pl.DataFrame(righe)
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(f"Scala x{args.scala}")
+        print(report)
+        print(report.group_by("formato", maintain_order=True).agg(
+            pl.col("kB su disco", "freddo ms", "caldo ms").sum(), pl.col("RSS picco MB").max()
+        ))
@@ -0,0 +1,65 @@
+# FILE benchmark: cambio di k nella pagina Cluster, KMeans per ogni k contro tagli di un solo linkage (modelli.py)
+#
+# Feature dei vincitori (principale.parquet) replicate con un piccolo rumore. Lo slider passa per k = 2..10:
+# con KMeans ogni k nuovo è un fit, con il metodo gerarchico il linkage (Ward) si calcola una volta
+# e ogni k è un taglio del dendrogramma (fcluster).
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_gerarchico.py                  -> x1, x20, x100
+#   python benchmark/bench_gerarchico.py --repliche 1 200
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+import modelli as cache_modelli
+from modelli import modelli_cluster
+
+FEATURES = ["Punteggio", "GF", "GS", "GD", "Vittorie", "Pareggi", "Sconfitte", "Average_age"]
+K_SLIDER = range(2, 11)
+
+
+def feature(repliche: int) -> pd.DataFrame:
+    df = pl.read_parquet(CARTELLA / "principale.parquet").select(FEATURES).to_pandas().astype(float)
+    caso = np.random.default_rng(0)
+    copie = [df] + [df + caso.normal(0, 0.5, df.shape) for _ in range(repliche - 1)]
+    return pd.concat(copie, ignore_index=True)
+
+
+def ms(funzione) -> float:
+    t0 = time.perf_counter()
+    funzione()
+    return (time.perf_counter() - t0) * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cambio di k: KMeans per ogni k contro tagli del dendrogramma")
+    parser.add_argument("--repliche", type=int, nargs="+", default=[1, 20, 100], help="copie delle righe di principale")
+    args = parser.parse_args()
+
+    righe = []
+    for repliche in args.repliche:
+        X = feature(repliche)
+        cache_modelli._modelli.clear()
+        m = modelli_cluster(X, cartella=None)
+        t_kmeans = [ms(lambda: m.etichette(k)) for k in K_SLIDER]
+        t_linkage = ms(lambda: m.collegamento())
+        t_tagli = [ms(lambda: m.etichette_gerarchiche(k)) for k in K_SLIDER]
+        t_cache = [ms(lambda: m.etichette_gerarchiche(k)) for k in K_SLIDER]
+        righe.append({
+            "righe": len(X),
+            "KMeans ms per k (min-max)": f"{min(t_kmeans):.1f}-{max(t_kmeans):.1f}",
+            "linkage ms (una volta)": round(t_linkage, 1),
+            "taglio ms per k (min-max)": f"{min(t_tagli):.2f}-{max(t_tagli):.2f}",
+            "taglio già visto ms": round(max(t_cache), 3),
+        })
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
@@ -0,0 +1,120 @@
+# FILE benchmark: heatmap e ricerche degli scontri diretti, filter sul dataset contro array indicizzati
+#
+# Gli scontri sono generati per N squadre (una riga per coppia, nel verso casuale), come h2h_premier.parquet.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_h2h.py                            -> 6, 20 e 50 squadre
+#   python benchmark/bench_h2h.py --squadre 6 50 200 --ricerche 2000
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+from matrici import ScontriDiretti
+
+
+# ===============================
+# 1. DATI SINTETICI
+# ===============================
+
+def scontri(n: int, seme: int = 0) -> pl.DataFrame:
+    caso = random.Random(seme)
+    squadre = [f"Squadra {i:02d}" for i in range(n)]
+    righe = []
+    for k, a in enumerate(squadre):
+        for b in squadre[k + 1:]:
+            team1, team2 = (a, b) if caso.random() < 0.5 else (b, a)
+            win1, draws, win2 = caso.randint(0, 30), caso.randint(0, 20), caso.randint(0, 30)
+            righe.append({
+                "team1": team1, "team2": team2, "played": win1 + draws + win2,
+                "win1": win1, "draws": draws, "win2": win2,
+                "goal1": caso.randint(0, 100), "goal2": caso.randint(0, 100),
+            })
+    return pl.DataFrame(righe)
+
+
+# ===============================
+# 2. VERSIONI
+# ===============================
+
+# Com'era nella pagina: per ogni coppia ordinata fino a due filter del dataset
+def heatmap_cicli(df_h2h: pl.DataFrame) -> pd.DataFrame:
+    unique_teams_h2h = sorted(set(df_h2h["team1"].unique().to_list() + df_h2h["team2"].unique().to_list()))
+    data_list = []
+    for t1 in unique_teams_h2h:
+        for t2 in unique_teams_h2h:
+            if t1 == t2:
+                net, V, S = np.nan, 0, 0
+            else:
+                sub1 = df_h2h.filter((pl.col("team1") == t1) & (pl.col("team2") == t2))
+                if not sub1.is_empty():
+                    V, S = int(sub1[0, "win1"]), int(sub1[0, "win2"])
+                else:
+                    sub2 = df_h2h.filter((pl.col("team1") == t2) & (pl.col("team2") == t1))
+                    V, S = (int(sub2[0, "win2"]), int(sub2[0, "win1"])) if not sub2.is_empty() else (0, 0)
+                net = round(V - S)
+            data_list.append({"team1": t1, "team2": t2, "net": net, "V": V, "S": S})
+    return pd.DataFrame(data_list)
+
+
+def heatmap_array(df_h2h: pl.DataFrame) -> pd.DataFrame:
+    return ScontriDiretti.da_dataframe(df_h2h).heatmap().to_pandas()
+
+
+def vittorie_filter(df_h2h: pl.DataFrame, a: str, b: str) -> int:
+    sub = df_h2h.filter((pl.col("team1") == a) & (pl.col("team2") == b))
+    if not sub.is_empty():
+        return int(sub[0, "win1"])
+    return int(df_h2h.filter((pl.col("team1") == b) & (pl.col("team2") == a))[0, "win2"])
+
+
+def mediana(funzione, ripetizioni: int = 3) -> tuple[float, object]:
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        risultato = funzione()
+        tempi.append(time.perf_counter() - t0)
+    return statistics.median(tempi), risultato
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scontri diretti: filter contro array indicizzati")
+    parser.add_argument("--squadre", type=int, nargs="+", default=[6, 20, 50], help="numero di squadre")
+    parser.add_argument("--ricerche", type=int, default=1000, help="coppie casuali cercate")
+    args = parser.parse_args()
+
+    righe = []
+    for n in args.squadre:
+        df = scontri(n)
+        archivio = ScontriDiretti.da_dataframe(df)
+        coppie = [tuple(random.Random(k).sample(archivio.squadre, 2)) for k in range(args.ricerche)]
+
+        t_cicli, vecchia = mediana(lambda: heatmap_cicli(df))
+        t_array, nuova = mediana(lambda: heatmap_array(df))
+        t_filter, attese = mediana(lambda: [vittorie_filter(df, a, b) for a, b in coppie])
+        t_indice, trovate = mediana(lambda: [archivio.coppia(a, b)["vittorie"] for a, b in coppie])
+        with tempfile.TemporaryDirectory() as tmp:
+            archivio.salva(tmp)
+            t_mmap, letto = mediana(lambda: ScontriDiretti.carica(tmp).heatmap())
+        righe.append({
+            "squadre": n,
+            "heatmap cicli ms": round(t_cicli * 1000, 1),
+            "heatmap array ms": round(t_array * 1000, 2),
+            "heatmap da .npy ms": round(t_mmap * 1000, 2),
+            "ricerche filter ms": round(t_filter * 1000, 1),
+            "ricerche indice ms": round(t_indice * 1000, 2),
+            "uguali": nuova.equals(vecchia) and trovate == attese and letto.to_pandas().equals(vecchia),
+        })
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
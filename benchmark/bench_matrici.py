@@ -0,0 +1,109 @@
+# FILE benchmark: matrici della pagina Big Six, doppio ciclo con un filter per cella contro un solo pivot
+#
+# Le partite sono generate per N squadre (tutte le coppie casa/trasferta, con una parte di coppie mancanti),
+# così si misura anche il caso di tutte le squadre della Premier League (~50).
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_matrici.py                        -> 6, 20 e 50 squadre
+#   python benchmark/bench_matrici.py --squadre 6 20 50 100 --ripetizioni 5
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+from matrici import matrici_scontri
+
+VALORI = ["home_win", "home_diff", "away_win", "away_diff"]
+
+
+# ===============================
+# 1. DATI SINTETICI
+# ===============================
+
+def partite(n: int, mancanti: float = 0.1, seme: int = 0) -> pl.DataFrame:
+    """Una riga per coppia (casa, ospite) come largest_win.parquet, senza una frazione di coppie."""
+    caso = random.Random(seme)
+    squadre = [f"Squadra {i:02d}" for i in range(n)]
+    righe = []
+    for h in squadre:
+        for a in squadre:
+            if h == a or caso.random() < mancanti:
+                continue
+            vinti, persi = caso.randint(1, 8), caso.randint(1, 8)
+            righe.append({
+                "home": h, "away": a,
+                "home_win": f"{vinti}-0", "away_win": f"0-{persi}",
+                "home_diff": vinti, "away_diff": -persi,
+            })
+    return pl.DataFrame(righe)
+
+
+# ===============================
+# 2. VERSIONI
+# ===============================
+
+# Com'era nella pagina: un filter dell'intero dataset per ogni cella di ogni matrice
+def matrici_cicli(df_matches: pl.DataFrame, unique_teams: list[str]) -> dict:
+    matrici = {}
+    for valore in VALORI:
+        vuoto = np.nan if valore.endswith("_diff") else ""
+        rows = []
+        for h in unique_teams:
+            row = {"home": h}
+            for a in unique_teams:
+                if a == h:
+                    row[a] = vuoto
+                else:
+                    sub = df_matches.filter((pl.col("home") == h) & (pl.col("away") == a))
+                    row[a] = vuoto if sub.is_empty() else sub[0, valore]
+            rows.append(row)
+        matrici[valore] = pl.DataFrame(rows).to_pandas().set_index("home")
+    return matrici
+
+
+def matrici_pivot(df_matches: pl.DataFrame, unique_teams: list[str]) -> dict:
+    vuote = {"home_win": "", "away_win": ""}
+    matrici = matrici_scontri(df_matches, VALORI, squadre=unique_teams, diagonale=vuote, mancante=vuote)
+    return {valore: m.to_pandas().set_index("home") for valore, m in matrici.items()}
+
+
+def cronometra(funzione, *args, ripetizioni: int) -> tuple[float, dict]:
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        risultato = funzione(*args)
+        tempi.append(time.perf_counter() - t0)
+    return statistics.median(tempi), risultato
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Matrici Big Six: cicli con filter contro pivot")
+    parser.add_argument("--squadre", type=int, nargs="+", default=[6, 20, 50], help="numero di squadre")
+    parser.add_argument("--ripetizioni", type=int, default=3, help="esecuzioni per versione (si tiene la mediana)")
+    args = parser.parse_args()
+
+    righe = []
+    for n in args.squadre:
+        df = partite(n)
+        squadre = sorted(df["home"].unique().to_list())
+        t_cicli, vecchie = cronometra(matrici_cicli, df, squadre, ripetizioni=args.ripetizioni)
+        t_pivot, nuove = cronometra(matrici_pivot, df, squadre, ripetizioni=args.ripetizioni)
+        righe.append({
+            "squadre": n,
+            "partite": len(df),
+            "cicli ms": round(t_cicli * 1000, 1),
+            "pivot ms": round(t_pivot * 1000, 2),
+            "più veloce": f"x{t_cicli / t_pivot:.0f}",
+            "uguali": all(nuove[v].equals(vecchie[v]) for v in VALORI),
+        })
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
@@ -0,0 +1,89 @@
+# FILE benchmark: modelli della pagina Cluster, fit a ogni rerun contro cache per impronta (modelli.py)
+#
+# Si simula la pagina con la validazione attiva (grafico principale, Elbow k=1..10, Silhouette k=2..10)
+# mentre lo slider passa per tutti i k: prima come faceva la pagina, poi con la cache vuota,
+# con la cache solo su disco (come dopo un riavvio del server) e con la cache in memoria.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_modelli.py
+#   python benchmark/bench_modelli.py --repliche 20
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+from sklearn.cluster import KMeans
+from sklearn.decomposition import PCA
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+import modelli
+from modelli import modelli_cluster
+
+FEATURES = ["Punteggio", "GF", "GS", "GD", "Vittorie", "Pareggi", "Sconfitte", "Average_age"]
+K_SLIDER = range(2, 11)
+
+
+def feature(repliche: int) -> pd.DataFrame:
+    """Feature dei vincitori (principale.parquet), replicate con un piccolo rumore per avere più righe."""
+    df = pl.read_parquet(CARTELLA / "principale.parquet").select(FEATURES).to_pandas().astype(float)
+    caso = np.random.default_rng(0)
+    copie = [df] + [df + caso.normal(0, 0.5, df.shape) for _ in range(repliche - 1)]
+    return pd.concat(copie, ignore_index=True)
+
+
+# Com'era nella pagina: a ogni rerun scaler, PCA, KMeans del k scelto e i 19 fit della validazione
+def rerun_fit(X: pd.DataFrame, k_scelto: int) -> tuple:
+    X_scaled = StandardScaler().fit_transform(X)
+    PCA(n_components=3).fit_transform(X_scaled)
+    etichette = KMeans(n_clusters=k_scelto, random_state=42).fit_predict(X_scaled)
+    inertie = [KMeans(n_clusters=k, random_state=42).fit(X_scaled).inertia_ for k in range(1, 11)]
+    silhouette = [silhouette_score(X_scaled, KMeans(n_clusters=k, random_state=42).fit_predict(X_scaled))
+                  for k in range(2, 11)]
+    return etichette.tolist(), inertie, silhouette
+
+
+def rerun_cache(X: pd.DataFrame, k_scelto: int, cartella: str) -> tuple:
+    m = modelli_cluster(X, cartella=cartella)
+    return (m.etichette(k_scelto).tolist(),
+            [m.inerzia(k) for k in range(1, 11)],
+            [m.punteggio_silhouette(k) for k in range(2, 11)])
+
+
+def giro(funzione, *args) -> tuple[float, list]:
+    t0 = time.perf_counter()
+    risultati = [funzione(*args[:1], k, *args[1:]) for k in K_SLIDER]
+    return (time.perf_counter() - t0) * 1000, risultati
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pagina Cluster: fit a ogni rerun contro cache dei modelli")
+    parser.add_argument("--repliche", type=int, default=1, help="copie delle righe di principale")
+    args = parser.parse_args()
+
+    X = feature(args.repliche)
+    t_fit, attesi = giro(rerun_fit, X)
+    with tempfile.TemporaryDirectory() as tmp:
+        t_vuota, ottenuti = giro(rerun_cache, X, tmp)
+        modelli._modelli.clear()        # come un processo nuovo: resta solo il disco
+        t_disco, da_disco = giro(rerun_cache, X, tmp)
+        t_memoria, _ = giro(rerun_cache, X, tmp)
+
+    print(f"{len(X)} righe, {len(K_SLIDER)} posizioni dello slider con la validazione attiva")
+    print(pl.DataFrame({
+        "versione": ["fit a ogni rerun", "cache vuota", "cache su disco", "cache in memoria"],
+        "ms totali": [round(t, 1) for t in (t_fit, t_vuota, t_disco, t_memoria)],
+        "ms per rerun": [round(t / len(K_SLIDER), 2) for t in (t_fit, t_vuota, t_disco, t_memoria)],
+    }))
+    uguali = all(
+        a[0] == b[0] and np.allclose(a[1], b[1]) and np.allclose(a[2], b[2])
+        for a, b in zip(attesi, ottenuti)
+    ) and ottenuti == da_disco
+    print(f"Risultati uguali: {uguali}")
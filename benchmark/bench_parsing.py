@@ -0,0 +1,101 @@
+# FILE benchmark: velocità (pagine/s) e memoria di picco dei backend di lettura delle tabelle HTML
+#
+# Le pagine di prova sono quelle salvate nella cache degli scraper (.cache_http), se presenti,
+# altrimenti vengono generate dal server finto e "gonfiate" con markup di contorno
+# per avvicinarsi alla dimensione di una vera pagina di Transfermarkt.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_parsing.py
+#   python benchmark/bench_parsing.py --rumore-kb 600 --giri 3
+
+import argparse
+import gzip
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+from scraping import BACKEND_PARSING, CARTELLA_CACHE, leggi_tabella
+from server_finto import pagina_eta, pagina_rankings
+
+
+# ===============================
+# 1. PAGINE DI PROVA
+# ===============================
+
+def aggiungi_rumore(pagina: bytes, kb: int) -> bytes:
+    # menu, link e script prima delle tabelle, come nelle pagine vere
+    blocco = (
+        "<div class='box'><ul>" + "".join(
+            f"<li><a href='/giocatore/{i}'>Giocatore {i}</a><span class='info'>dettagli &amp; note</span></li>"
+            for i in range(20)
+        ) + "</ul></div>\n"
+    )
+    script = "<script>var dati = {" + ",".join(f'"k{i}": {i}' for i in range(200)) + "};</script>\n"
+    rumore = ""
+    while len(rumore) < kb * 1024:
+        rumore += blocco + script
+    return pagina.replace(b"<body>", b"<body>" + rumore.encode(), 1)
+
+
+def carica_pagine(rumore_kb: int) -> tuple[str, list[bytes]]:
+    salvate = sorted(Path(CARTELLA / CARTELLA_CACHE).glob("*.html.gz"))
+    if salvate:
+        return "cache degli scraper", [gzip.decompress(p.read_bytes()) for p in salvate]
+    rankings = pl.read_parquet(CARTELLA / "rankings.parquet")
+    eta = pl.read_parquet(CARTELLA / "average_age.parquet")
+    anni = sorted(rankings["Anno"].unique())
+    pagine = [pagina_rankings(a, rankings) for a in anni] + [pagina_eta(a, eta) for a in anni]
+    return f"generate ({rumore_kb} kB di contorno)", [aggiungi_rumore(p, rumore_kb) for p in pagine]
+
+
+# ===============================
+# 2. MISURE
+# ===============================
+
+def misura(backend: str, pagine: list[bytes], giri: int) -> dict:
+    t0 = time.perf_counter()
+    for _ in range(giri):
+        for pagina in pagine:
+            leggi_tabella(pagina, indice=1, backend=backend)
+    secondi = time.perf_counter() - t0
+
+    # memoria di picco della lettura di una pagina (la più grande), solo allocazioni Python: lxml alloca in C
+    pagina = max(pagine, key=len)
+    tracemalloc.start()
+    leggi_tabella(pagina, indice=1, backend=backend)
+    picco = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "backend": backend,
+        "pagine/s": round(giri * len(pagine) / secondi, 1),
+        "ms/pagina": round(secondi / (giri * len(pagine)) * 1000, 2),
+        "picco MB (Python)": round(picco / 2**20, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confronto dei backend di parsing HTML")
+    parser.add_argument("--rumore-kb", type=int, default=300, help="markup di contorno nelle pagine generate")
+    parser.add_argument("--giri", type=int, default=2, help="passate sull'insieme di pagine")
+    args = parser.parse_args()
+
+    origine, pagine = carica_pagine(args.rumore_kb)
+    print(f"{len(pagine)} pagine ({origine}), {sum(map(len, pagine)) / 2**20:.1f} MB in totale")
+
+    riferimento = [leggi_tabella(p, backend="bs4") for p in pagine]
+    risultati = []
+    for backend in BACKEND_PARSING[1:]:    # "auto" coincide con lxml o veloce
+        try:
+            uguali = all(leggi_tabella(p, backend=backend) == r for p, r in zip(pagine, riferimento))
+        except ImportError as errore:
+            print(f"{backend}: saltato ({errore})")
+            continue
+        risultati.append(misura(backend, pagine, args.giri) | {"uguale a bs4": uguali})
+
+    with pl.Config(tbl_rows=-1):
+        print(pl.DataFrame(risultati))
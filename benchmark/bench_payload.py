@@ -0,0 +1,54 @@
+# FILE benchmark: byte dei grafici inviati al browser da ogni pagina, st.altair_chart contro grafico() (grafici.py)
+#
+# Ogni pagina viene eseguita con AppTest (come una visita nel browser) due volte: con i grafici passati
+# a st.altair_chart (tabelle intere, un dataset per layer) e con grafico() (colonne usate, interi ridotti,
+# un dataset per tabella). Si sommano i byte di spec e dataset dei messaggi dei grafici.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_payload.py
+#   python benchmark/bench_payload.py --pagine pages/4_Cluster.py
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import polars as pl
+from streamlit.testing.v1 import AppTest
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+import grafici
+
+PAGINE = ["Introduzione.py", "pages/2_Titles.py", "pages/3_Ages.py", "pages/4_Cluster.py", "pages/5_Big Six.py"]
+
+
+def byte_grafici(pagina: str, compatta: bool) -> tuple[int, int, int]:
+    """(grafici, byte spec, byte dati) dei grafici della pagina."""
+    grafici.COMPATTA = compatta
+    at = AppTest.from_file(pagina, default_timeout=300).run()
+    elementi = [el.proto for el in at.get("arrow_vega_lite_chart")]
+    spec = sum(len(p.spec.encode()) for p in elementi)
+    dati = sum(len(p.data.data) + sum(len(d.data.data) for d in p.datasets) for p in elementi)
+    return len(elementi), spec, dati
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Byte dei grafici per pagina, prima e dopo la compattazione")
+    parser.add_argument("--pagine", nargs="+", default=PAGINE, help="pagine da eseguire")
+    args = parser.parse_args()
+
+    os.chdir(CARTELLA)
+    grafici.FILE_PAYLOAD = None       # il benchmark non scrive nel registro della app
+    righe = []
+    for pagina in args.pagine:
+        n, spec_prima, dati_prima = byte_grafici(pagina, compatta=False)
+        _, spec_dopo, dati_dopo = byte_grafici(pagina, compatta=True)
+        prima, dopo = spec_prima + dati_prima, spec_dopo + dati_dopo
+        righe.append({"pagina": Path(pagina).stem, "grafici": n,
+                      "KiB prima": round(prima / 1024, 1), "KiB dopo": round(dopo / 1024, 1),
+                      "dati prima": round(dati_prima / 1024, 1), "dati dopo": round(dati_dopo / 1024, 1),
+                      "riduzione %": round(100 * (1 - dopo / prima), 1)})
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
@@ -0,0 +1,118 @@
+# FILE benchmark: estrazione dei record con un ordinamento per record (metodo precedente)
+# contro il passaggio unico per dataset di estrai_records (arg_max/arg_min), e classifiche
+# dei primi 10 di ogni record con ordinamento completo contro classifica_record (top_k)
+#
+# I dataset sono quelli dell'elaborazione, replicati N volte come in bench_elaborazione.py
+# e già in memoria: si misura solo il calcolo dei record.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_record.py
+#   python benchmark/bench_record.py --scale 1 10 100 1000 --ripetizioni 5
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+from bench_elaborazione import prepara
+from elaborazione_df import NODI, RECORD, SpecRecord, classifica_record, estrai_records, leggi
+
+
+# ===============================
+# 1. METODO PRECEDENTE
+# ===============================
+
+def con_ordinamento(sorgenti: dict[str, pl.LazyFrame], specs: list[SpecRecord]) -> pl.LazyFrame:
+    # come il vecchio estrai_record: ordinamento completo del dataset e prima riga, per ogni record
+    righe = []
+    for spec in specs:
+        df = sorgenti[spec.sorgente]
+        cols = df.collect_schema().names()
+        squad_col = "Squadra" if "Squadra" in cols else "Vincitore"
+        q = df if spec.filtro is None else df.filter(spec.filtro)
+        righe.append(
+            q.sort(spec.colonna, descending=spec.desc)
+            .select(
+                pl.lit(spec.nome).alias("Record"),
+                pl.col(squad_col).cast(pl.Utf8).alias("Squadra"),
+                pl.col("Stagione").cast(pl.Utf8),
+                pl.col(spec.colonna).cast(pl.Float64).alias("Valore"),
+            )
+            .limit(1)
+        )
+    return pl.concat(righe)
+
+
+def classifiche_ordinamento(sorgenti: dict[str, pl.LazyFrame], n: int) -> list[pl.DataFrame]:
+    # ordinamento completo di ogni dataset e prime n righe (senza pari merito oltre la n-esima)
+    return [
+        sorgenti[spec.sorgente]
+        .filter(True if spec.filtro is None else spec.filtro)
+        .sort(spec.colonna, descending=spec.desc, maintain_order=True)
+        .head(n)
+        .collect()
+        for spec in RECORD
+    ]
+
+
+def classifiche_parziali(sorgenti: dict[str, pl.LazyFrame], n: int) -> list[pl.DataFrame]:
+    return [classifica_record(sorgenti[spec.sorgente], spec, n=n) for spec in RECORD]
+
+
+# ===============================
+# 2. MISURE
+# ===============================
+
+def misura(funzione, ripetizioni: int):
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        risultato = funzione()
+        tempi.append(time.perf_counter() - t0)
+    return statistics.median(tempi), risultato
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Confronto dell'estrazione dei record")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 10, 100, 1000], help="repliche dei dataset")
+    parser.add_argument("--ripetizioni", type=int, default=5, help="esecuzioni per metodo (si tiene la mediana)")
+    args = parser.parse_args()
+
+    righe = []
+    for scala in args.scale:
+        with tempfile.TemporaryDirectory() as tmp:
+            prepara(Path(tmp), scala)
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                for nome in ["average_age", "top_scorer", "rankings", "principale"]:
+                    NODI[nome].calcola().collect().write_parquet(f"{nome}.parquet")
+                # dataset già in memoria: lettura e preparazione fuori dalla misura
+                sorgenti = {nome: leggi(nome).collect().lazy() for nome in dict.fromkeys(s.sorgente for s in RECORD)}
+            finally:
+                os.chdir(cwd)
+
+        prima, atteso = misura(lambda: con_ordinamento(sorgenti, RECORD).collect(), args.ripetizioni)
+        dopo, ottenuto = misura(lambda: estrai_records(sorgenti, RECORD).collect(), args.ripetizioni)
+        top_ordinamento, _ = misura(lambda: classifiche_ordinamento(sorgenti, 10), args.ripetizioni)
+        top_parziale, _ = misura(lambda: classifiche_parziali(sorgenti, 10), args.ripetizioni)
+        righe.append({
+            "scala": scala,
+            "righe rankings": sorgenti["rankings"].select(pl.len()).collect().item(),
+            "ordinamenti ms": round(prima * 1000, 2),
+            "passaggio unico ms": round(dopo * 1000, 2),
+            "risparmio ms": round((prima - dopo) * 1000, 2),
+            "uguali": atteso.equals(ottenuto),
+            "top-10 ordinamenti ms": round(top_ordinamento * 1000, 2),
+            "top-10 top_k ms": round(top_parziale * 1000, 2),
+        })
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
@@ -0,0 +1,106 @@
+# FILE benchmark: rerun completo della pagina contro rerun della sola sezione (st.fragment, sezioni.py)
+#
+# Si avvia la app con `streamlit run` (headless) e ci si collega come farebbe il browser, via websocket:
+# per ogni sezione si cambia il suo widget rieseguendo tutta la pagina (com'era prima) e rieseguendo
+# solo il fragment (com'è ora), e si misura il tempo fino alla fine del rerun.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_sezioni.py
+#   python benchmark/bench_sezioni.py --ripetizioni 20 --porta 8600
+
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import polars as pl
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+CARTELLA = Path(__file__).resolve().parent.parent
+
+# (pagina, etichetta del widget, valori da alternare)
+SEZIONI = [
+    ("Titles", "Seleziona l'intervallo di anni:", [[1992, 2023], [2000, 2010], [1995, 2005]]),
+    ("Cluster", "Seleziona il cluster da visualizzare", [0, 1, 2]),
+    ("Introduzione", "Record", [0, 1, 2]),
+]
+
+
+async def rerun(ws, stato) -> tuple[float, list]:
+    """ms fino a script_finished e (fragment_id, elemento) di ogni elemento ricevuto."""
+    messaggio = BackMsg()
+    messaggio.rerun_script.CopyFrom(stato)
+    t0 = time.perf_counter()
+    await ws.write_message(messaggio.SerializeToString(), binary=True)
+    elementi = []
+    while True:
+        risposta = ForwardMsg()
+        risposta.ParseFromString(await ws.read_message())
+        if risposta.WhichOneof("type") == "delta" and risposta.delta.WhichOneof("type") == "new_element":
+            elementi.append((risposta.delta.fragment_id, risposta.delta.new_element))
+        if risposta.WhichOneof("type") == "script_finished":
+            return (time.perf_counter() - t0) * 1000, elementi
+
+
+def stato(pagina: str, widget, valore, fragment_id: str | None = None):
+    s = BackMsg().rerun_script
+    s.page_name = pagina
+    if fragment_id:
+        s.fragment_id = fragment_id
+    if widget is not None:
+        w = s.widget_states.widgets.add()
+        tipo = widget.WhichOneof("type")
+        w.id = getattr(widget, tipo).id
+        if tipo == "slider":
+            w.double_array_value.data.extend(valore)
+        else:
+            w.int_value = valore
+    return s
+
+
+async def misura(porta: int, ripetizioni: int) -> list[dict]:
+    righe = []
+    for pagina, etichetta, valori in SEZIONI:
+        ws = await websocket_connect(f"ws://localhost:{porta}/_stcore/stream")
+        await rerun(ws, stato(pagina, None, None))          # primo caricamento: dati e modelli in cache
+        _, elementi = await rerun(ws, stato(pagina, None, None))
+        fragment_id, widget = next((f, e) for f, e in elementi if e.WhichOneof("type") in ("slider", "selectbox")
+                                   and getattr(e, e.WhichOneof("type")).label == etichetta)
+        completi, sezione = [], []
+        for i in range(ripetizioni):
+            valore = valori[i % len(valori)]
+            completi.append((await rerun(ws, stato(pagina, widget, valore)))[0])
+            sezione.append((await rerun(ws, stato(pagina, widget, valore, fragment_id)))[0])
+        ws.close()
+        righe.append({"pagina": pagina, "widget": etichetta,
+                      "ms rerun completo": round(statistics.median(completi), 1),
+                      "ms solo sezione": round(statistics.median(sezione), 1),
+                      "più veloce": f"x{statistics.median(completi) / statistics.median(sezione):.1f}"})
+    return righe
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rerun completo contro rerun della sola sezione (fragment)")
+    parser.add_argument("--ripetizioni", type=int, default=10, help="interazioni per sezione")
+    parser.add_argument("--porta", type=int, default=8599, help="porta del server streamlit")
+    args = parser.parse_args()
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", "Introduzione.py", "--server.headless", "true",
+         "--server.port", str(args.porta), "--browser.gatherUsageStats", "false"],
+        cwd=CARTELLA, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        time.sleep(5)
+        righe = asyncio.run(misura(args.porta, args.ripetizioni))
+    finally:
+        server.terminate()
+        server.wait()
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200, fmt_str_lengths=50):
+        print(pl.DataFrame(righe))
@@ -0,0 +1,80 @@
+# FILE benchmark: grafici ricostruiti a ogni rerun contro cache delle spec (grafico_in_cache, grafici.py)
+#
+# Si simula una sessione con AppTest: Introduzione e Titles ricaricate più volte, pagina Cluster con
+# validazione e biplot attivi mentre lo slider passa per tutti i k (due giri, metodo KMeans e Ward).
+# Ogni rerun si misura con la cache delle spec svuotata prima di ogni rerun (grafici ricostruiti e
+# riserializzati come prima) e con la cache attiva; --max-spec riduce il tetto dell'LRU.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_spec_cache.py
+#   python benchmark/bench_spec_cache.py --giri 3 --max-spec 8
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import polars as pl
+from streamlit.testing.v1 import AppTest
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+import grafici
+
+K_SLIDER = range(2, 11)
+
+
+def sessione(giri: int, svuota: bool) -> dict[str, list[float]]:
+    """ms di ogni rerun per pagina; svuota=True -> cache delle spec vuota a ogni rerun."""
+    tempi = {"Introduzione": [], "Titles": [], "Cluster": []}
+
+    def rerun(pagina: str, at: AppTest) -> None:
+        if svuota:
+            grafici.svuota_spec()
+        t0 = time.perf_counter()
+        at.run()
+        tempi[pagina].append((time.perf_counter() - t0) * 1000)
+
+    intro = AppTest.from_file("Introduzione.py", default_timeout=300)
+    titles = AppTest.from_file("pages/2_Titles.py", default_timeout=300)
+    cluster = AppTest.from_file("pages/4_Cluster.py", default_timeout=300).run()
+    for casella in cluster.sidebar.checkbox:
+        if casella.label in ("Mostra Elbow Method e Silhouette Score", "Mostra Biplot"):
+            casella.check()
+    for _ in range(giri):
+        rerun("Introduzione", intro)
+        rerun("Titles", titles)
+        for metodo in ("KMeans", "Gerarchico (Ward)"):
+            cluster.sidebar.radio[0].set_value(metodo)
+            for k in K_SLIDER:
+                cluster.sidebar.slider[0].set_value(k)
+                rerun("Cluster", cluster)
+    return tempi
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grafici ricostruiti a ogni rerun contro cache delle spec")
+    parser.add_argument("--giri", type=int, default=2, help="giri completi della sessione")
+    parser.add_argument("--max-spec", type=int, default=grafici.MAX_SPEC, help="voci massime della cache")
+    args = parser.parse_args()
+
+    os.chdir(CARTELLA)
+    grafici.FILE_PAYLOAD = None
+    grafici.MAX_SPEC = args.max_spec
+    sessione(1, svuota=True)            # riscaldamento: dati, modelli e linkage già in cache per entrambe le misure
+    ricostruiti = sessione(args.giri, svuota=True)
+    grafici.svuota_spec()
+    in_cache = sessione(args.giri, svuota=False)
+    stats = grafici.statistiche_spec()
+
+    print(f"{args.giri} giri, cache delle spec: {stats['hit']} hit / {stats['miss']} miss, "
+          f"{stats['rimosse']} rimosse, {stats['voci']} voci, {stats['byte'] / 1024:.0f} KiB")
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame([
+            {"pagina": pagina, "rerun": len(ricostruiti[pagina]),
+             "ms mediani ricostruiti": round(statistics.median(ricostruiti[pagina]), 1),
+             "ms mediani in cache": round(statistics.median(in_cache[pagina]), 1)}
+            for pagina in ricostruiti
+        ]))
@@ -0,0 +1,67 @@
+# FILE benchmark: cluster di tutte le squadre-stagioni, stima esatta contro stima a blocchi (modelli.py)
+#
+# Le feature di rankings + average_age + top_scorer (feature_stagioni) vengono replicate con un piccolo
+# rumore per simulare molte leghe e stagioni. Si confronta StandardScaler + PCA + KMeans su tutte le righe
+# (come la pagina per i vincitori) con partial_fit + IncrementalPCA + MiniBatchKMeans (incrementale=True).
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_squadre_stagioni.py                      -> x1, x10, x100
+#   python benchmark/bench_squadre_stagioni.py --repliche 1 1000 --blocco 5000
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+import modelli as cache_modelli
+from modelli import FEATURE_CLUSTER, feature_stagioni, modelli_cluster
+
+K = 3
+
+
+def feature(repliche: int) -> pd.DataFrame:
+    df = feature_stagioni(
+        *(pl.scan_parquet(CARTELLA / f"{nome}.parquet") for nome in ("rankings", "average_age", "top_scorer"))
+    ).select(FEATURE_CLUSTER).collect().to_pandas().astype(float)
+    caso = np.random.default_rng(0)
+    copie = [df] + [df + caso.normal(0, 0.5, df.shape) for _ in range(repliche - 1)]
+    return pd.concat(copie, ignore_index=True)
+
+
+def cronometra(funzione) -> tuple[float, object]:
+    t0 = time.perf_counter()
+    risultato = funzione()
+    return time.perf_counter() - t0, risultato
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cluster delle squadre-stagioni: stima esatta contro a blocchi")
+    parser.add_argument("--repliche", type=int, nargs="+", default=[1, 10, 100], help="copie delle squadre-stagioni")
+    parser.add_argument("--blocco", type=int, default=cache_modelli.BLOCCO, help="righe per blocco")
+    args = parser.parse_args()
+
+    righe = []
+    for repliche in args.repliche:
+        X = feature(repliche)
+        cache_modelli._modelli.clear()
+        t_esatta, esatti = cronometra(lambda: modelli_cluster(X, cartella=None))
+        t_km, _ = cronometra(lambda: esatti.etichette(K))
+        t_blocchi, blocchi = cronometra(lambda: modelli_cluster(X, cartella=None, incrementale=True, blocco=args.blocco))
+        t_mb, _ = cronometra(lambda: blocchi.etichette(K, minibatch=True))
+        righe.append({
+            "righe": len(X),
+            "esatta s": round(t_esatta + t_km, 3),
+            "a blocchi s": round(t_blocchi + t_mb, 3),
+            "scarto varianza spiegata": float(np.abs(esatti.pca.explained_variance_ratio_
+                                                     - blocchi.pca.explained_variance_ratio_).max()),
+            "scarto inerzia %": round((blocchi.inerzia(K, minibatch=True) / esatti.inerzia(K) - 1) * 100, 2),
+        })
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
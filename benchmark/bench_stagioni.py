@@ -0,0 +1,128 @@
+# FILE benchmark: aggiunta incrementale di una stagione contro la costruzione completa dei dataset
+#
+# In una cartella temporanea si costruiscono i dataset con tutte le stagioni (costruzione completa);
+# in un'altra si costruiscono senza l'ultima stagione e poi la si aggiunge con aggiungi_stagione.
+# I dataset aggiornati (AGGIORNATI in elaborazione_df.py) devono essere uguali nelle due cartelle.
+# La perpetua di riferimento è ricalcolata da rankings con un group_by sull'intero storico.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_stagioni.py                       -> scala 1 e 100
+#   python benchmark/bench_stagioni.py --scale 1 100 1000 --ripetizioni 5
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+from bench_elaborazione import prepara
+from elaborazione_df import AGGIORNATI, SORGENTI, aggiorna_stagione, aggiungi_stagione, costruisci
+from squadre import nome_completo
+
+
+# ===============================
+# 1. PREPARAZIONE
+# ===============================
+
+def perpetua_completa(rankings: pl.DataFrame) -> pl.DataFrame:
+    return (
+        rankings.group_by(nome_completo().alias("Squadra"))
+        .agg(
+            pl.col("Giocate").sum().alias("Partite"),
+            pl.col("Vittorie").sum().alias("V"),
+            pl.col("Pareggi").sum().alias("P"),
+            pl.col("Sconfitte").sum().alias("S"),
+            pl.col("Punteggio").sum().alias("Punti"),
+        )
+        .sort(["Punti", "V", "Squadra"], descending=[True, True, False])
+        .with_row_index("Posizione", offset=1)
+        .cast({"Posizione": pl.Int64})
+    )
+
+
+def separa_ultima(cartella: Path) -> dict[str, pl.DataFrame]:
+    """Toglie dai dataset di ingresso l'ultima stagione e ne restituisce le righe (rankings, average_age, top_scorer)."""
+    ultima = pl.read_parquet(cartella / "rankings.parquet")["Anno"].max()
+    stagione = {}
+    for nome in SORGENTI:
+        df = pl.read_parquet(cartella / f"{nome}.parquet")
+        anno = pl.col("Anno") if "Anno" in df.columns else pl.col("Stagione").str.split("-").list.get(0).cast(pl.Int64)
+        stagione[nome] = df.filter(anno == ultima)
+        df.filter(anno != ultima).write_parquet(cartella / f"{nome}.parquet")
+    del stagione["winners"]     # la riga del vincitore si ricava da rankings
+    return stagione
+
+
+def in_silenzio(funzione, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return funzione(*args, **kwargs)
+
+
+# ===============================
+# 2. MISURE
+# ===============================
+
+def confronta(scala: int, ripetizioni: int) -> dict:
+    with tempfile.TemporaryDirectory() as completa, tempfile.TemporaryDirectory() as incrementale:
+        for tmp in (completa, incrementale):
+            prepara(Path(tmp), scala)
+            rankings = pl.read_parquet(Path(tmp) / "rankings.parquet")
+            perpetua_completa(rankings).write_parquet(Path(tmp) / "perpetua.parquet")
+        stagione = separa_ultima(Path(incrementale))
+        perpetua_completa(pl.read_parquet(Path(incrementale) / "rankings.parquet")) \
+            .write_parquet(Path(incrementale) / "perpetua.parquet")
+
+        os.chdir(completa)
+        tempi_completa = []
+        for _ in range(ripetizioni):
+            t0 = time.perf_counter()
+            in_silenzio(costruisci, forza=True)
+            perpetua_completa(pl.read_parquet("rankings.parquet")).write_parquet("perpetua.parquet")
+            tempi_completa.append(time.perf_counter() - t0)
+        attese = {nome: pl.read_parquet(f"{nome}.parquet") for nome in AGGIORNATI}
+
+        os.chdir(incrementale)
+        in_silenzio(costruisci)
+        tabelle = {nome: pl.read_parquet(f"{nome}.parquet") for nome in AGGIORNATI}
+        tempi_memoria = []
+        for _ in range(ripetizioni):
+            t0 = time.perf_counter()
+            aggiorna_stagione(tabelle, **stagione)
+            tempi_memoria.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        in_silenzio(aggiungi_stagione, **stagione)
+        tempo_disco = time.perf_counter() - t0
+        ottenute = {nome: pl.read_parquet(f"{nome}.parquet") for nome in AGGIORNATI}
+        saltati = not any(in_silenzio(costruisci).values())    # lo stato registra la stagione aggiunta
+        os.chdir(CARTELLA)
+
+    diverse = [nome for nome in AGGIORNATI if not ottenute[nome].equals(attese[nome])]
+    return {
+        "scala": scala,
+        "righe rankings": len(attese["rankings"]),
+        "completa ms": round(statistics.median(tempi_completa) * 1000, 1),
+        "aggiunta in memoria ms": round(statistics.median(tempi_memoria) * 1000, 1),
+        "aggiunta su disco ms": round(tempo_disco * 1000, 1),
+        "uguali": not diverse,
+        "diverse": ", ".join(diverse) or "-",
+        "grafo poi saltato": saltati,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggiunta di una stagione: incrementale contro costruzione completa")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 100], help="repliche dei dataset di ingresso")
+    parser.add_argument("--ripetizioni", type=int, default=3, help="esecuzioni per misura (si tiene la mediana)")
+    args = parser.parse_args()
+
+    righe = [confronta(scala, args.ripetizioni) for scala in args.scale]
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
@@ -0,0 +1,110 @@
+# FILE benchmark: stili delle tabelle, funzioni Python per cella/riga contro matrici di CSS (stili.py)
+#
+# Scala di colori delle matrici Big Six (N x N squadre) ed evidenziazione di una squadra in una tabella
+# di N righe. Si misura il calcolo del CSS (Styler._compute, quello che fa st.dataframe) e il tempo
+# con la cache per versione del dataset.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_stili.py
+#   python benchmark/bench_stili.py --squadre 6 50 200 --righe 646 64600
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import matplotlib.colors as mcolors
+import numpy as np
+import pandas as pd
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+from stili import applica, evidenzia_righe, scala_colori, stile_in_cache
+
+COLORI = ("#d7191c", "#f7f7f7", "#1a9641")
+
+
+# ===============================
+# 1. VERSIONI DI PRIMA
+# ===============================
+
+custom_cmap = mcolors.LinearSegmentedColormap.from_list("rossobiancoverde", list(COLORI))
+
+
+def color_cell(val, vmin, vmax, cmap=custom_cmap):
+    if pd.isna(val):
+        return "background-color: transparent; text-align: center;"
+    norm = (val - vmin) / (vmax - vmin)
+    norm = min(max(norm, 0.0), 1.0)
+    return f"background-color: {mcolors.to_hex(cmap(norm))}; color: black; text-align: center;"
+
+
+def matrice_celle(risultati: pd.DataFrame, diff: pd.DataFrame, vmin: int, vmax: int):
+    return risultati.style.apply(
+        lambda row: [color_cell(diff.loc[row.name, col], vmin, vmax) for col in risultati.columns],
+        axis=1,
+    )
+
+
+def evidenzia_squadra(squadra: str, colore_hex: str):
+    def highlight(row):
+        if row["Squadra"] == squadra:
+            return [f'background-color: {colore_hex}55'] * len(row)
+        return [''] * len(row)
+    return highlight
+
+
+# ===============================
+# 2. MISURE
+# ===============================
+
+def mediana(funzione, ripetizioni: int = 3) -> tuple[float, object]:
+    tempi = []
+    for _ in range(ripetizioni):
+        t0 = time.perf_counter()
+        risultato = funzione()
+        tempi.append(time.perf_counter() - t0)
+    return statistics.median(tempi) * 1000, risultato
+
+
+def disegna(styler):
+    styler._compute()
+    return styler.ctx
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stili per cella contro matrici di CSS")
+    parser.add_argument("--squadre", type=int, nargs="+", default=[6, 50, 200], help="lato delle matrici")
+    parser.add_argument("--righe", type=int, nargs="+", default=[646, 64600], help="righe delle tabelle evidenziate")
+    args = parser.parse_args()
+    caso = np.random.default_rng(0)
+
+    righe = []
+    for n in args.squadre:
+        squadre = [f"Squadra {i:03d}" for i in range(n)]
+        diff = pd.DataFrame(caso.integers(-8, 9, (n, n)).astype(float), index=squadre, columns=squadre)
+        np.fill_diagonal(diff.values, np.nan)
+        risultati = diff.map(lambda v: "" if pd.isna(v) else f"{int(abs(v))}-0")
+        t_celle, vecchio = mediana(lambda: disegna(matrice_celle(risultati, diff, -8, 8)))
+        t_lut, nuovo = mediana(lambda: disegna(applica(risultati, scala_colori(diff, -8, 8, COLORI))))
+        t_cache, _ = mediana(lambda: disegna(stile_in_cache(
+            ("bench", n), "v1", lambda: (risultati, scala_colori(diff, -8, 8, COLORI)))))
+        righe.append({"tabella": f"matrice {n}x{n}", "per cella ms": round(t_celle, 1),
+                      "matrice CSS ms": round(t_lut, 1), "in cache ms": round(t_cache, 1), "uguali": vecchio == nuovo})
+
+    for n in args.righe:
+        df = pd.DataFrame({
+            "Squadra": caso.choice(["Chelsea FC", "FC Arsenal", "FC Liverpool", "Manchester United"], n),
+            "Gol": caso.integers(0, 40, n), "Anno": caso.integers(1992, 2024, n),
+        })
+        t_righe, vecchio = mediana(lambda: disegna(df.style.apply(evidenzia_squadra("Chelsea FC", "#001F5C"), axis=1)))
+        t_css, nuovo = mediana(lambda: disegna(applica(df, evidenzia_righe(df, "Squadra", "Chelsea FC", "#001F5C"))))
+        t_cache, _ = mediana(lambda: disegna(stile_in_cache(
+            ("bench", n), "v1", lambda: (df, evidenzia_righe(df, "Squadra", "Chelsea FC", "#001F5C")))))
+        righe.append({"tabella": f"{n} righe", "per cella ms": round(t_righe, 1),
+                      "matrice CSS ms": round(t_css, 1), "in cache ms": round(t_cache, 1), "uguali": vecchio == nuovo})
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
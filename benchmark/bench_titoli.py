@@ -0,0 +1,88 @@
+# FILE benchmark: titoli per intervallo di anni, filtro + group_by contro somme prefisse (titoli.py)
+#
+# Per ogni posizione dello slider [min_anno, max_anno] la pagina Titles filtrava i vincitori e
+# raggruppava per squadra; con IndiceTitoli bastano due righe dell'array cumulato e una sottrazione.
+# Oltre alle 32 stagioni reali si provano storici sintetici più lunghi (vincitore a caso tra --squadre).
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_titoli.py
+#   python benchmark/bench_titoli.py --stagioni 1000 100000 --squadre 40 --posizioni 500
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+from titoli import IndiceTitoli
+
+
+# Com'era nella pagina
+def torta_group_by(df_winners: pl.DataFrame, min_anno: int, max_anno: int) -> pl.DataFrame:
+    return (
+        df_winners.filter((pl.col("Anno") >= min_anno) & (pl.col("Anno") <= max_anno))
+        .group_by("Vincitore")
+        .agg(pl.len().alias("Totale_Titoli"))
+        .with_columns([
+            ((pl.col("Totale_Titoli") / pl.col("Totale_Titoli").sum()) * 100).alias("Percentuale"),
+            (((pl.col("Totale_Titoli") / pl.col("Totale_Titoli").sum()) * 100)
+             .round(1).cast(pl.Utf8) + "%").alias("Percentuale_str")
+        ])
+    )
+
+
+def vincitori(stagioni: int, squadre: int, seme: int = 0) -> pl.DataFrame:
+    if stagioni == 0:
+        return pl.read_parquet(CARTELLA / "principale.parquet").select("Anno", "Stagione", "Vincitore")
+    caso = np.random.default_rng(seme)
+    anni = np.arange(1992, 1992 + stagioni)
+    return pl.DataFrame({
+        "Anno": anni,
+        "Stagione": [f"{a}/{(a + 1) % 100:02d}" for a in anni],
+        "Vincitore": [f"Squadra {k:02d}" for k in caso.integers(0, squadre, stagioni)],
+    })
+
+
+def ms_per_chiamata(funzione, intervalli) -> tuple[float, list]:
+    t0 = time.perf_counter()
+    risultati = [funzione(a, b) for a, b in intervalli]
+    return (time.perf_counter() - t0) * 1000 / len(intervalli), risultati
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Titoli per intervallo di anni: group_by contro somme prefisse")
+    parser.add_argument("--stagioni", type=int, nargs="+", default=[0, 1000, 100000],
+                        help="stagioni dello storico (0 = principale.parquet)")
+    parser.add_argument("--squadre", type=int, default=20, help="squadre dello storico sintetico")
+    parser.add_argument("--posizioni", type=int, default=300, help="posizioni dello slider provate")
+    args = parser.parse_args()
+    caso = np.random.default_rng(1)
+
+    righe = []
+    for stagioni in args.stagioni:
+        df = vincitori(stagioni, args.squadre)
+        anni = df["Anno"].to_numpy()
+        intervalli = [tuple(sorted(caso.choice(anni, 2))) for _ in range(args.posizioni)]
+
+        t0 = time.perf_counter()
+        indice = IndiceTitoli.da_dataframe(df)
+        t_indice = (time.perf_counter() - t0) * 1000
+        t_vecchio, attesi = ms_per_chiamata(lambda a, b: torta_group_by(df, a, b), intervalli)
+        t_nuovo, ottenuti = ms_per_chiamata(indice.distribuzione, intervalli)
+        t_array, _ = ms_per_chiamata(indice.intervallo, intervalli)
+        uguali = all(
+            v.sort("Vincitore").select("Vincitore", "Totale_Titoli", "Percentuale_str")
+            .equals(n.select("Vincitore", pl.col("Totale_Titoli").cast(pl.UInt32), "Percentuale_str"))
+            for v, n in zip(attesi, ottenuti)
+        )
+        righe.append({"stagioni": df.height, "costruzione indice ms": round(t_indice, 2),
+                      "group_by ms": round(t_vecchio, 3), "indice ms": round(t_nuovo, 3),
+                      "solo array ms": round(t_array, 4), "uguali": uguali})
+
+    with pl.Config(tbl_rows=-1, tbl_cols=-1, tbl_width_chars=200):
+        print(pl.DataFrame(righe))
@@ -0,0 +1,70 @@
+# FILE benchmark: validazione dei cluster (Elbow + Silhouette per k = 1..10) su molte righe
+#
+# Dati sintetici a gruppi (make_blobs) con le stesse 9 feature della pagina Cluster.
+# Si confronta la validazione esatta (KMeans + Silhouette su tutte le righe, in sequenza come nella pagina)
+# con quella approssimata (MiniBatchKMeans + Silhouette su un campione) e con il pool di processi,
+# riportando tempi e scarto delle metriche approssimate (ModelliCluster.confronta_validazione).
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/bench_validazione.py                               -> 2000 e 20000 righe
+#   python benchmark/bench_validazione.py --righe 50000 --campione 5000 --processi 4
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import polars as pl
+from sklearn.datasets import make_blobs
+
+CARTELLA = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(CARTELLA))
+import modelli as cache_modelli
+from modelli import modelli_cluster
+
+K_RANGE = list(range(1, 11))
+
+
+def feature(righe: int, seme: int = 0) -> pd.DataFrame:
+    X, _ = make_blobs(n_samples=righe, n_features=9, centers=4, cluster_std=2.0, random_state=seme)
+    return pd.DataFrame(X, columns=[f"f{i}" for i in range(9)])
+
+
+def cronometra(funzione, *args, **kwargs) -> tuple[float, object]:
+    t0 = time.perf_counter()
+    risultato = funzione(*args, **kwargs)
+    return time.perf_counter() - t0, risultato
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validazione dei cluster esatta contro approssimata")
+    parser.add_argument("--righe", type=int, nargs="+", default=[2000, 20000], help="righe della matrice di feature")
+    parser.add_argument("--campione", type=int, default=2000, help="righe usate per la Silhouette approssimata")
+    parser.add_argument("--processi", type=int, default=None, help="processi del pool (default: tutte le CPU)")
+    args = parser.parse_args()
+
+    tempi = []
+    for righe in args.righe:
+        X = feature(righe)
+        # ogni versione parte da una cache vuota e senza disco, così si misurano solo i fit
+        cache_modelli._modelli.clear()
+        t_pool, _ = cronometra(modelli_cluster(X, cartella=None).valida, K_RANGE, processi=args.processi)
+        cache_modelli._modelli.clear()
+        t_appr, _ = cronometra(modelli_cluster(X, cartella=None).valida, K_RANGE,
+                               minibatch=True, campione=args.campione, processi=args.processi)
+        cache_modelli._modelli.clear()
+        t_esatta, _ = cronometra(modelli_cluster(X, cartella=None).valida, K_RANGE, processi=1)
+        tempi.append({"righe": righe, "esatta s": round(t_esatta, 2), "esatta nel pool s": round(t_pool, 2),
+                      "approssimata s": round(t_appr, 2), "più veloce": f"x{t_esatta / t_appr:.0f}"})
+
+        # scarto dalle metriche esatte (i modelli esatti sono già in cache: si stimano solo quelli approssimati)
+        modelli = modelli_cluster(X, cartella=None)
+        with pl.Config(tbl_rows=-1, tbl_width_chars=200, float_precision=4):
+            print(f"\n{righe} righe, MiniBatchKMeans e Silhouette su {args.campione} righe:")
+            print(modelli.confronta_validazione(K_RANGE, campione=args.campione, processi=args.processi)
+                  .select("k", "Inerzia", "Scarto inerzia %", "Silhouette", "Silhouette approssimata",
+                          "Scarto Silhouette", "Secondi Silhouette", "Secondi Silhouette approssimata"))
+
+    with pl.Config(tbl_rows=-1, tbl_width_chars=200):
+        print(pl.DataFrame(tempi))
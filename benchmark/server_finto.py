@@ -0,0 +1,134 @@
+# FILE server HTTP locale che imita le pagine di Transfermarkt usate dagli scraper
+#
+# Le pagine sono generate dai dataset del progetto (rankings.parquet, average_age.parquet),
+# quindi uno scraping completo contro questo server deve restituire gli stessi dati.
+# Qualunque codice di competizione (GB1, IT1, ...) restituisce le pagine della Premier League.
+#
+# Uso (dalla cartella del progetto):
+#   python benchmark/server_finto.py --porta 8000 --errori 0.2 --latenza 0.3
+#   python crea_rankings.py --base-url http://localhost:8000 --rps 10 --max-in-volo 8
+#   python tabelle.py --base-url http://localhost:8000 --rps 10 --max-in-volo 8
+
+import argparse
+import hashlib
+import html
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import polars as pl
+
+CARTELLA = Path(__file__).resolve().parent.parent
+
+
+# ===============================
+# 1. GENERAZIONE DELLE PAGINE
+# ===============================
+
+def _pagina(intestazioni: list[str], righe: list[list[str]]) -> bytes:
+    # la tabella giusta è la seconda della pagina (gli scraper usano find_all('table')[1])
+    th = "".join(f"<th>{html.escape(t)}</th>" for t in intestazioni)
+    tr = "".join(
+        "<tr>" + "".join(f"<td>{html.escape(v)}</td>" for v in riga) + "</tr>\n"
+        for riga in righe
+    )
+    return (
+        "<html><head><title>Transfermarkt</title></head><body>"
+        "<table class='navigazione'><tr><td>menu</td></tr></table>"
+        f"<div class='responsive-table'><table class='items'><thead><tr>{th}</tr></thead>\n"
+        f"<tbody>\n{tr}</tbody></table></div></body></html>"
+    ).encode()
+
+
+def pagina_rankings(anno: int, df: pl.DataFrame | None = None) -> bytes:
+    df = pl.read_parquet(CARTELLA / "rankings.parquet") if df is None else df
+    stagione = df.filter(pl.col("Anno") == anno).sort("Posizione")
+    righe = [
+        [str(r["Posizione"]), "", r["Squadra"], str(r["Giocate"]), str(r["Vittorie"]),
+         str(r["Pareggi"]), str(r["Sconfitte"]), f"{r['GF']}:{r['GS']}", str(r["GD"]), str(r["Punteggio"])]
+        for r in stagione.iter_rows(named=True)
+    ]
+    return _pagina(["#", "Società", "", "V", "P", "S", "Gol", "+/-", "Pt."], righe)
+
+
+def pagina_eta(anno: int, df: pl.DataFrame | None = None) -> bytes:
+    df = pl.read_parquet(CARTELLA / "average_age.parquet") if df is None else df
+    stagione = df.filter(pl.col("Anno") == anno)
+    righe = [
+        [str(i), r["Squadra"], str(r["Rosa"]), str(r["Impiegati"]), f"{r['Average_age']}".replace(".", ",")]
+        for i, r in enumerate(stagione.iter_rows(named=True), start=1)
+    ]
+    return _pagina(["#", "Squadra", "Rosa", "Impiegati", "ø-età per partita"], righe)
+
+
+# ===============================
+# 2. SERVER
+# ===============================
+
+def avvia(porta: int = 8000, errori: float = 0.0, latenza: float = 0.0) -> ThreadingHTTPServer:
+    """Avvia il server in un thread e lo restituisce (server.shutdown() per fermarlo)."""
+    rankings = pl.read_parquet(CARTELLA / "rankings.parquet")
+    eta = pl.read_parquet(CARTELLA / "average_age.parquet")
+
+    class Gestore(BaseHTTPRequestHandler):
+        richieste = 0
+
+        def do_GET(self):
+            Gestore.richieste += 1
+            time.sleep(latenza)
+            if random.random() < errori:
+                self.send_response(random.choice([429, 503]))
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            anno = re.search(r"saison_id=(\d+)", self.path)
+            if anno is None:
+                self.send_error(404)
+                return
+            if "/tabelle/" in self.path:
+                corpo = pagina_rankings(int(anno.group(1)), rankings)
+            elif "/altersschnitt/" in self.path:
+                corpo = pagina_eta(int(anno.group(1)), eta)
+            else:
+                self.send_error(404)
+                return
+            etag = '"' + hashlib.sha1(corpo).hexdigest() + '"'
+            if self.headers.get("If-None-Match") == etag:    # rivalidazione: pagina non cambiata
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", porta), Gestore)
+    server.gestore = Gestore
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Server locale che imita Transfermarkt")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--errori", type=float, default=0.0, help="frazione di risposte 429/503")
+    parser.add_argument("--latenza", type=float, default=0.0, help="secondi di attesa per risposta")
+    args = parser.parse_args()
+    server = avvia(args.porta, args.errori, args.latenza)
+    print(f"Server finto su http://127.0.0.1:{args.porta} (Ctrl+C per fermarlo)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+        sys.exit(0)
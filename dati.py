@@ -0,0 +1,172 @@
+# FILE di accesso ai dati condiviso da tutte le pagine: caricamento dei dataset con cache di processo
+
+import hashlib
+import os
+import sys
+import threading
+from pathlib import Path
+
+import polars as pl
+
+
+# ===============================
+# 1. CACHE DI PROCESSO
+# ===============================
+
+NULL_VALUES = ["", "NA ", " NA", "NA"]
+
+# path assoluto -> (mtime_ns, dimensione, hash contenuto)
+_file: dict[str, tuple[int, int, str]] = {}
+# (path assoluto, colonne) -> (hash contenuto, DataFrame)
+_frame: dict[tuple[str, tuple[str, ...] | None], tuple[str, pl.DataFrame]] = {}
+_lock = threading.Lock()
+_statistiche = {"hit": 0, "miss": 0, "rivalidazioni": 0, "invalidazioni": 0}
+
+
+# 1) Hash del contenuto del file (ricalcolato solo quando cambia mtime)
+def _hash_file(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for blocco in iter(lambda: f.read(1 << 20), b""):
+            h.update(blocco)
+    return h.hexdigest()
+
+
+def _impronta(path: str) -> str:
+    stat = os.stat(path)
+    with _lock:
+        voce = _file.get(path)
+    if voce is not None and voce[:2] == (stat.st_mtime_ns, stat.st_size):
+        return voce[2]
+    digest = _hash_file(path)
+    with _lock:
+        if voce is not None and voce[2] == digest:
+            _statistiche["rivalidazioni"] += 1   # file "toccato" ma identico
+        _file[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+# 2) Lettura vera e propria del file, in base all'estensione
+def _leggi(path: str, colonne: list[str] | None) -> pl.DataFrame:
+    if path.endswith(".parquet"):
+        return pl.read_parquet(path, columns=colonne)
+    return pl.read_csv(path, null_values=NULL_VALUES, columns=colonne)
+
+
+# ===============================
+# 2. FUNZIONI PUBBLICHE
+# ===============================
+
+
+# 1) Funzione di caricamento dati (sostituisce le copie presenti in ogni pagina)
+def carica_dati(path: str, colonne: list[str] | None = None) -> pl.DataFrame:
+    """
+    Restituisce il DataFrame del file (.parquet o .csv), riletto solo se il file è cambiato.
+    - Chiave della cache: path assoluto + mtime/dimensione, con hash del contenuto come verifica
+    - colonne: proiezione, legge dal file solo le colonne indicate
+    - Il DataFrame è condiviso tra sessioni: non va modificato in place
+    """
+    path = os.path.abspath(path)
+    chiave = (path, tuple(colonne) if colonne is not None else None)
+    digest = _impronta(path)
+
+    with _lock:
+        voce = _frame.get(chiave)
+        if voce is not None and voce[0] == digest:
+            _statistiche["hit"] += 1
+            return voce[1]
+
+    df = _leggi(path, colonne)
+    with _lock:
+        if voce is not None:
+            _statistiche["invalidazioni"] += 1
+        _statistiche["miss"] += 1
+        _frame[chiave] = (digest, df)
+    return df
+
+
+# 2) Versione (hash del contenuto) di un dataset
+def versione_dati(path: str) -> str:
+    return _impronta(os.path.abspath(path))
+
+
+# 3) Salvataggio: Parquet come formato principale, CSV come esportazione opzionale
+def salva_dati(df: pl.DataFrame, path: str, esporta_csv: bool = False) -> None:
+    """
+    Scrive df in Parquet (sostituzione atomica del file) e, se richiesto, anche
+    il CSV con lo stesso nome per compatibilità con excel/strumenti esterni.
+    """
+    destinazione = Path(path).with_suffix(".parquet")
+    tmp = destinazione.with_name(destinazione.name + ".tmp")
+    df.write_parquet(tmp, statistics=True)
+    os.replace(tmp, destinazione)
+    if esporta_csv:
+        df.write_csv(destinazione.with_suffix(".csv"))
+
+
+# 4) Dataset partizionato stile Hive: <radice>/Lega=GB1/Anno=1992/dati.parquet
+def salva_partizioni(df: pl.DataFrame, radice: str, chiavi: list[str]) -> None:
+    """
+    Scrive un file per ogni combinazione dei valori di chiavi, sostituendo in modo
+    atomico solo le partizioni presenti in df (le altre restano come sono).
+    Le colonne chiave stanno nel percorso e non nel file: scansiona_partizioni le ricostruisce.
+    """
+    for valori, parte in df.group_by(chiavi, maintain_order=True):
+        cartella = Path(radice).joinpath(*(f"{chiave}={valore}" for chiave, valore in zip(chiavi, valori)))
+        cartella.mkdir(parents=True, exist_ok=True)
+        salva_dati(parte.drop(chiavi), str(cartella / "dati.parquet"))
+
+
+def scansiona_partizioni(radice: str) -> pl.LazyFrame:
+    """
+    LazyFrame sull'intero dataset partizionato: i filtri sulle colonne chiave
+    (es. pl.col("Lega") == "IT1") leggono solo le cartelle corrispondenti.
+    """
+    return pl.scan_parquet(str(Path(radice) / "**" / "*.parquet"), hive_partitioning=True)
+
+
+# 5) Contatori della cache
+def statistiche_cache() -> dict[str, int]:
+    with _lock:
+        stats = dict(_statistiche)
+        stats["file_in_cache"] = len(_file)
+    return stats
+
+
+def riepilogo_cache() -> str:
+    s = statistiche_cache()
+    totale = s["hit"] + s["miss"]
+    ratio = s["hit"] / totale * 100 if totale else 0.0
+    return (f"Cache dati: {s['hit']} hit / {s['miss']} miss ({ratio:.0f}% hit), "
+            f"{s['invalidazioni']} invalidazioni, {s['file_in_cache']} file")
+
+
+# 6) Svuota la cache (e azzera i contatori)
+def svuota_cache() -> None:
+    with _lock:
+        _file.clear()
+        _frame.clear()
+        for k in _statistiche:
+            _statistiche[k] = 0
+
+
+# ===============================
+# 3. CONVERSIONE CSV -> PARQUET
+# ===============================
+
+# Tutti i dataset del progetto: i CSV restano come esportazione di compatibilità
+DATASET = [
+    "winners", "average_age", "top_scorer", "rankings", "principale",
+    "titles", "record", "perpetua", "largest_win", "h2h_premier",
+]
+
+
+def converti_csv(nome: str) -> None:
+    salva_dati(pl.read_csv(f"{nome}.csv", null_values=NULL_VALUES), f"{nome}.parquet")
+
+
+if __name__ == "__main__":
+    # python dati.py [nome ...] -> rigenera i Parquet a partire dai CSV (di default tutti)
+    for nome in sys.argv[1:] or DATASET:
+        converti_csv(nome)
+        print(f"{nome}.csv -> {nome}.parquet")
@@ -1,6 +1,16 @@
 import altair as alt
+import argparse
+import json
+import os
 import polars as pl
 import pandas as pd
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+from dati import salva_dati, versione_dati
+from squadre import nome_completo
 
 
 # ===============================
@@ -8,58 +18,50 @@ import pandas as pd
 # ===============================
 
 
-# 1) Funzione di caricamento dati
-def carica_dati(path: str):
-    return pl.read_csv(path, null_values=["", "NA ", " NA", "NA"])
+# 1) Funzione di caricamento dati: condivisa tra le pagine e con cache, vedi dati.py
 
 
 # 2) Elaborazione dataset: compatibilità e ordinamento
-def completa_e_ordina(df: pl.DataFrame) -> pl.DataFrame:
+def completa_e_ordina(df: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
     """
     - Aggiunge 'Anno' o 'Stagione' se mancanti
     - Converte 'Stagione' nel formato 'YYYY/YY'
     - Forza i tipi: Anno -> Int64, Stagione -> Utf8
     - Riordina le colonne: 'Stagione', ..., 'Anno'
+    - Accetta DataFrame o LazyFrame (restituisce lo stesso tipo), con un solo with_columns
     """
-    df_result = df.clone()
+    cols = df.collect_schema().names()
 
-    # --- Aggiungi Anno se manca ---
-    if "Anno" not in df_result.columns and "Stagione" in df_result.columns:
-        df_result = df_result.with_columns(
+    # --- Anno: dalla Stagione se manca, altrimenti con il cast corretto ---
+    anno = None
+    if "Anno" in cols:
+        anno = pl.col("Anno").cast(pl.Int64)
+    elif "Stagione" in cols:
+        anno = (
             pl.col("Stagione")
             .str.replace_all("-", "/")
             .str.split("/")
             .list.get(0)
             .cast(pl.Int64)
-            .alias("Anno")
-        )
-
-    # --- Aggiungi Stagione se manca ---
-    if "Stagione" not in df_result.columns and "Anno" in df_result.columns:
-        df_result = df_result.with_columns(
-            (
-                pl.col("Anno").cast(pl.Utf8) + "/" +
-                (pl.col("Anno") + 1).cast(pl.Utf8).str.slice(-2, 2)
-            ).alias("Stagione")
         )
 
-    # --- Forza cast corretto ---
-    if "Anno" in df_result.columns:
-        df_result = df_result.with_columns(pl.col("Anno").cast(pl.Int64))
-    if "Stagione" in df_result.columns:
-        df_result = df_result.with_columns(pl.col("Stagione").cast(pl.Utf8))
-
-    # --- Riformatta Stagione ---
-    if "Anno" in df_result.columns:
-        df_result = df_result.with_columns(
-            (
-                pl.col("Anno").cast(pl.Utf8) + "/" +
-                (pl.col("Anno") + 1).cast(pl.Utf8).str.slice(-2, 2)
-            ).alias("Stagione")
-        )
+    # --- Stagione riformattata da Anno (o solo cast, se Anno non si può ricavare) ---
+    # il testo 'YYYY/YY' si costruisce solo per gli anni distinti e poi si sostituisce riga per riga
+    if anno is not None:
+        anni = anno.unique()
+        stagioni = anni.cast(pl.Utf8) + "/" + (anni + 1).cast(pl.Utf8).str.slice(-2, 2)
+        espressioni = [
+            anno.alias("Anno"),
+            anno.replace_strict(anni, stagioni, return_dtype=pl.Utf8).alias("Stagione"),
+        ]
+    elif "Stagione" in cols:
+        espressioni = [pl.col("Stagione").cast(pl.Utf8)]
+    else:
+        espressioni = []
+    df_result = df.with_columns(espressioni)
 
     # --- Riordina ---
-    cols = df_result.columns
+    cols = df_result.collect_schema().names()
     centro = [col for col in cols if col not in ("Stagione", "Anno")]
     colonne_finali = []
     if "Stagione" in cols:
@@ -71,49 +73,70 @@ def completa_e_ordina(df: pl.DataFrame) -> pl.DataFrame:
     return df_result.select(colonne_finali)
 
 
-# 3.1) df_record -  estrazione record da dataset 
-
-def estrai_record(df: pl.DataFrame,
-                  record_nome: str,
-                  col_valore: str,
-                  desc: bool = True,
-                  filtro: pl.Expr | None = None,
-                  squad_col: str | None = None,
-                  stagione_col: str | None = None) -> pl.DataFrame:
-    
-    # Autodetect di possibili nomi delle variabili "Squadra | Vincitrice" e "Anno | Stagione"
-    if squad_col is None:
-        squad_col = "Squadra"   if "Squadra"   in df.columns else \
-                    "Vincitore" if "Vincitore" in df.columns else None
-    if stagione_col is None:
-        stagione_col = "Stagione" if "Stagione" in df.columns else \
-                       "Anno"     if "Anno"     in df.columns else None
-    if squad_col is None or stagione_col is None:
-        raise ValueError("Impossibile determinare le colonne squadra/stagione")
-    
-    q = df if filtro is None else df.filter(filtro)
-
-    riga = (
-        q.sort(col_valore, descending=desc)
-          .select([
-              pl.lit(record_nome).alias("Record"),
-              pl.col(squad_col).alias("Squadra"),
-              pl.col(stagione_col).alias("Stagione"),
-              pl.col(col_valore).alias("Valore")
-          ])
-          .limit(1)
-    ).with_columns([
-        pl.col("Record").cast(pl.Utf8),
-        pl.col("Squadra").cast(pl.Utf8),
-        pl.col("Stagione").cast(pl.Utf8),    
-        pl.col("Valore").cast(pl.Float64)     
-    ])
-    return riga
-
-
-# 3.2) df_record - formattazione
-
-def formatta_record(r: pl.DataFrame) -> pl.DataFrame:
+# 3.1) df_record - descrizione dichiarativa di un record
+
+@dataclass(frozen=True)
+class SpecRecord:
+    """
+    - nome: etichetta del record
+    - sorgente: dataset da cui estrarlo (nome del file senza estensione)
+    - colonna: valore del record, desc=True -> massimo, desc=False -> minimo
+    - filtro: righe da considerare (es. solo le non vincitrici)
+    """
+    nome: str
+    sorgente: str
+    colonna: str
+    desc: bool = True
+    filtro: pl.Expr | None = None
+
+
+def _filtrata(colonna: pl.Expr, filtro: pl.Expr | None) -> pl.Expr:
+    return colonna if filtro is None else colonna.filter(filtro)
+
+
+# 3.2) df_record - estrazione in un solo passaggio per dataset
+
+def estrai_records(sorgenti: dict[str, pl.LazyFrame], specs: list[SpecRecord]) -> pl.LazyFrame:
+    """
+    Una riga per record (Record, Squadra, Stagione, Valore), nell'ordine di specs.
+    - Una sola select per dataset: arg_max/arg_min al posto di un ordinamento completo per ogni record
+    - A parità di valore vince la prima riga del dataset, come con l'ordinamento di prima
+    - I valori nulli non vengono considerati
+    """
+    parti = []
+    for nome_sorgente, df in sorgenti.items():
+        cols = df.collect_schema().names()
+        # Autodetect di possibili nomi delle variabili "Squadra | Vincitrice" e "Anno | Stagione"
+        squad_col = "Squadra"   if "Squadra"   in cols else \
+                    "Vincitore" if "Vincitore" in cols else None
+        stagione_col = "Stagione" if "Stagione" in cols else \
+                       "Anno"     if "Anno"     in cols else None
+
+        righe = []
+        for ordine, spec in enumerate(specs):
+            if spec.sorgente != nome_sorgente:
+                continue
+            if squad_col is None or stagione_col is None:
+                raise ValueError("Impossibile determinare le colonne squadra/stagione")
+            valore = _filtrata(pl.col(spec.colonna), spec.filtro)
+            riga = valore.arg_max() if spec.desc else valore.arg_min()
+            righe.append(pl.struct(
+                pl.lit(ordine).alias("Ordine"),
+                pl.lit(spec.nome).alias("Record"),
+                _filtrata(pl.col(squad_col), spec.filtro).get(riga).cast(pl.Utf8).alias("Squadra"),
+                _filtrata(pl.col(stagione_col), spec.filtro).get(riga).cast(pl.Utf8).alias("Stagione"),
+                valore.get(riga).cast(pl.Float64).alias("Valore"),
+            ).alias(f"record_{ordine}"))
+
+        if righe:    # una riga con un campo struct per record, poi una riga per record
+            parti.append(df.select(righe).unpivot().select(pl.col("value").struct.unnest()))
+
+    return pl.concat(parti).sort("Ordine").drop("Ordine")
+
+
+# 3.3) df_record - formattazione
+
+def formatta_record(r: pl.LazyFrame) -> pl.LazyFrame:
     """
     Garantisce uniformità: cast delle colonne, ordine, nomi coerenti.
     """
@@ -128,137 +151,441 @@ def formatta_record(r: pl.DataFrame) -> pl.DataFrame:
     )
 
 
+# 3.4) df_record - classifica dei primi N di un record, pari merito compresi
+
+def classifica_record(df: pl.DataFrame | pl.LazyFrame,
+                      spec: SpecRecord,
+                      n: int = 10,
+                      squadra: str | None = None,
+                      anni: tuple[int, int] | None = None,
+                      lega: str | None = None) -> pl.DataFrame:
+    """
+    Classifica del record spec sul dataset df (quello della sua sorgente): restano tutte le righe
+    con valore almeno pari all'n-esimo, quindi i pari merito non vengono tagliati (Pos 1, 2, 2, 4...).
+    - squadra, anni (primo, ultimo) e lega filtrano le righe prima della classifica
+      (lega solo se df ha la colonna Lega, es. dataset partizionati di tabelle.py)
+    - La soglia si trova con top_k/bottom_k (selezione parziale), si ordinano solo le righe rimaste
+    - A parità di valore l'ordine è quello del dataset: la prima riga è quella di record.csv
+    """
+    lf = completa_e_ordina(df.lazy())
+    cols = lf.collect_schema().names()
+    squad_col = "Squadra" if "Squadra" in cols else "Vincitore"
+
+    valore = pl.col(spec.colonna)
+    filtri = [valore.is_not_null()]
+    if spec.filtro is not None:
+        filtri.append(spec.filtro)
+    if squadra is not None:
+        filtri.append(pl.col(squad_col) == squadra)
+    if anni is not None:
+        filtri.append(pl.col("Anno").is_between(*anni))
+    if lega is not None and "Lega" in cols:
+        filtri.append(pl.col("Lega") == lega)
+
+    soglia = valore.top_k(n).min() if spec.desc else valore.bottom_k(n).max()
+    return (
+        lf.filter(filtri)
+        .filter(valore >= soglia if spec.desc else valore <= soglia)
+        .select(
+            pl.col(squad_col).cast(pl.Utf8).alias("Squadra"),
+            pl.col("Stagione"),
+            *([pl.col("Lega")] if "Lega" in cols else []),
+            valore.cast(pl.Float64).alias("Valore"),
+        )
+        .sort("Valore", descending=spec.desc, maintain_order=True)
+        .with_columns(pl.col("Valore").rank("min", descending=spec.desc).cast(pl.UInt32).alias("Pos"))
+        .select(pl.col("Pos"), pl.all().exclude("Pos"))
+        .collect()
+    )
+
+
 # ====================================================
 # 2. OPERAZIONI DI PREPARAZIONE DEI DATASET
 # ====================================================
 
+# Ogni dataset generato ha la sua funzione, che restituisce solo il piano (LazyFrame) leggendo
+# i dataset da cui dipende: quando ricalcolarli e in che ordine lo decide il grafo della sezione 3.
 
-# Caricamento dei dataset, completati e ordinati
-df_winners   = completa_e_ordina(carica_dati("winners.csv"))     #dataset trovato
-df_average   = completa_e_ordina(carica_dati("average_age.csv"))   #dataset creato    <-- average_age_copia.csv per usare il file generato da crea_average_age
-df_topscorer = completa_e_ordina(carica_dati("top_scorer.csv"))     #dataset trovato
-df_rankings  = completa_e_ordina(carica_dati("rankings.csv"))    #dataset creato       <-- rankings_copia.csv
 
-
-# Salvo le modifiche ai dataframe
-df_average.write_csv("average_age.csv")     # aggiorno df_average
-df_topscorer.write_csv("top_scorer.csv")     # aggiorno df_topscorer
-df_rankings.write_csv("rankings.csv")     # aggiorno df_rankings
+# Caricamento di un dataset, completato e ordinato
+def leggi(nome: str) -> pl.LazyFrame:
+    return completa_e_ordina(pl.scan_parquet(f"{nome}.parquet"))
 
 
 # -------------------------------
-# 2.1 Creazione di df_principale, salvato in cartella
-
-# Calcolo della media dell'età in lega per ciascun anno
-df_league_avg = (
-    df_average
-    .group_by("Anno")
-    .agg(pl.col("Average_age").mean().round(1).alias("League_average_age"))
-)
-
-# Unisco la media della lega in df_winners utilizzando "Anno"
-df_winners = df_winners.join(
-    df_league_avg,
-    left_on="Anno",
-    right_on="Anno",
-    how="left"
-)
-
-#  Aggiunta dell'età media del vincitore da df_average
-df_principale = completa_e_ordina(
-    df_winners.join(
-    df_average.select(["Squadra", "Anno", "Average_age"]),
-    left_on=["Vincitore", "Anno"],
-    right_on=["Squadra", "Anno"],
-    how="left"
-)
-)
-
-df_principale.write_csv("principale.csv")   # <-- salvo df_principale
+# 2.1 Creazione di df_principale
+
+def _principale(df_winners: pl.LazyFrame, df_average: pl.LazyFrame) -> pl.LazyFrame:
+    # Calcolo della media dell'età in lega per ciascun anno
+    df_league_avg = (
+        df_average
+        .group_by("Anno")
+        .agg(pl.col("Average_age").mean().round(1).alias("League_average_age"))
+    )
 
+    # Unisco la media della lega in df_winners utilizzando "Anno"
+    df_winners = df_winners.join(
+        df_league_avg,
+        left_on="Anno",
+        right_on="Anno",
+        how="left"
+    )
 
-# -------------------------------
-# 2.2 Creazione di df_titles, salvato in cartella
-
-# Ordinando per "Anno" e usando "pl.arange()" come contatore progressivo
-df_titles = (
-    df_principale
-    .sort("Anno")
-    .with_columns(
-        (pl.arange(0, pl.count()).over("Vincitore") + 1).alias("Titoli")
+    #  Aggiunta dell'età media del vincitore da df_average
+    return completa_e_ordina(
+        df_winners.join(
+        df_average.select(["Squadra", "Anno", "Average_age"]),
+        left_on=["Vincitore", "Anno"],
+        right_on=["Squadra", "Anno"],
+        how="left"
+    )
     )
-    .select(["Stagione", "Anno", "Vincitore", "Titoli"])
-    .pipe(completa_e_ordina)
-)
 
-df_titles.write_csv("titles.csv")   # <-- salvo df_titles
+
+def crea_principale() -> pl.LazyFrame:
+    #winners: dataset trovato, average_age: dataset creato
+    return _principale(leggi("winners"), leggi("average_age"))
 
 
 # -------------------------------
-# 2.4 Estrazione dei Record
+# 2.2 Creazione di df_titles
 
-records: list[pl.DataFrame] = []
+def crea_titles() -> pl.LazyFrame:
+    # Ordinando per "Anno" e usando "pl.arange()" come contatore progressivo
+    return (
+        leggi("principale")
+        .sort("Anno")
+        .with_columns(
+            (pl.arange(0, pl.len()).over("Vincitore") + 1).alias("Titoli")
+        )
+        .select(["Stagione", "Anno", "Vincitore", "Titoli"])
+        .pipe(completa_e_ordina)
+    )
 
-# --- Record di merito
-records += [
-    estrai_record(df_principale, "TITOLO CON PIÙ PUNTI",     "Punteggio"),
-    estrai_record(df_principale, "MIGLIOR PPG",              "PPG"),
-    estrai_record(df_principale, "TITOLO CON PIÙ VITTORIE",  "Vittorie"),
-    estrai_record(df_principale, "TITOLO CON MENO SCONFITTE","Sconfitte", desc=False),
-    estrai_record(df_principale, "TITOLO CON PIÙ GF",        "GF"),
-    estrai_record(df_principale, "TITOLO CON MIGLIOR GD",    "GD")
-]
 
-# --- Record di demerito
-records += [
-    estrai_record(df_principale, "TITOLO CON MENO PUNTI",    "Punteggio", desc=False),
-    estrai_record(df_principale, "PEGGIOR PPG",              "PPG", desc=False),
-    estrai_record(df_principale, "TITOLO CON MENO VITTORIE", "Vittorie", desc=False),
-    estrai_record(df_principale, "TITOLO CON PIÙ SCONFITTE", "Sconfitte"),
-    estrai_record(df_principale, "TITOLO CON MENO GF",       "GF", desc=False),
-    estrai_record(df_principale, "TITOLO CON PEGGIOR GD",    "GD", desc=False)
-]
+# -------------------------------
+# 2.4 Estrazione dei Record
 
-# --- Record non vincitrici
 non_champ = pl.col("Posizione") != 1
-records += [
-    estrai_record(df_rankings, "NON TITOLO CON PIÙ PUNTI",     "Punteggio", filtro=non_champ),
-    estrai_record(df_rankings, "MIGLIOR PPG SENZA TITOLO",     "PPG",       filtro=non_champ),
-    estrai_record(df_rankings, "NON TITOLO CON PIÙ VITTORIE",  "Vittorie",  filtro=non_champ),
-    estrai_record(df_rankings, "NON TITOLO CON MENO SCONFITTE","Sconfitte", desc=False, filtro=non_champ),
-    estrai_record(df_rankings, "NON TITOLO CON PIÙ GF",        "GF",        filtro=non_champ),
-    estrai_record(df_rankings, "NON TITOLO CON MIGLIOR GD",    "GD",        filtro=non_champ)
-]
 
-# --- Record età
-records += [
-    estrai_record(df_average, "SQUADRA PIÙ VECCHIA",         "Average_age"),
-    estrai_record(df_average, "SQUADRA PIÙ GIOVANE",         "Average_age", desc=False),
-    estrai_record(df_principale, "VINCITRICE PIÙ VECCHIA",      "Average_age"),
-    estrai_record(df_principale, "VINCITRICE PIÙ GIOVANE",      "Average_age", desc=False)
+RECORD: list[SpecRecord] = [
+    # --- Record di merito
+    SpecRecord("TITOLO CON PIÙ PUNTI",      "principale", "Punteggio"),
+    SpecRecord("MIGLIOR PPG",               "principale", "PPG"),
+    SpecRecord("TITOLO CON PIÙ VITTORIE",   "principale", "Vittorie"),
+    SpecRecord("TITOLO CON MENO SCONFITTE", "principale", "Sconfitte", desc=False),
+    SpecRecord("TITOLO CON PIÙ GF",         "principale", "GF"),
+    SpecRecord("TITOLO CON MIGLIOR GD",     "principale", "GD"),
+
+    # --- Record di demerito
+    SpecRecord("TITOLO CON MENO PUNTI",     "principale", "Punteggio", desc=False),
+    SpecRecord("PEGGIOR PPG",               "principale", "PPG", desc=False),
+    SpecRecord("TITOLO CON MENO VITTORIE",  "principale", "Vittorie", desc=False),
+    SpecRecord("TITOLO CON PIÙ SCONFITTE",  "principale", "Sconfitte"),
+    SpecRecord("TITOLO CON MENO GF",        "principale", "GF", desc=False),
+    SpecRecord("TITOLO CON PEGGIOR GD",     "principale", "GD", desc=False),
+
+    # --- Record non vincitrici
+    SpecRecord("NON TITOLO CON PIÙ PUNTI",      "rankings", "Punteggio", filtro=non_champ),
+    SpecRecord("MIGLIOR PPG SENZA TITOLO",      "rankings", "PPG",       filtro=non_champ),
+    SpecRecord("NON TITOLO CON PIÙ VITTORIE",   "rankings", "Vittorie",  filtro=non_champ),
+    SpecRecord("NON TITOLO CON MENO SCONFITTE", "rankings", "Sconfitte", desc=False, filtro=non_champ),
+    SpecRecord("NON TITOLO CON PIÙ GF",         "rankings", "GF",        filtro=non_champ),
+    SpecRecord("NON TITOLO CON MIGLIOR GD",     "rankings", "GD",        filtro=non_champ),
+
+    # --- Record età
+    SpecRecord("SQUADRA PIÙ VECCHIA",    "average_age", "Average_age"),
+    SpecRecord("SQUADRA PIÙ GIOVANE",    "average_age", "Average_age", desc=False),
+    SpecRecord("VINCITRICE PIÙ VECCHIA", "principale",  "Average_age"),
+    SpecRecord("VINCITRICE PIÙ GIOVANE", "principale",  "Average_age", desc=False),
+
+    # --- Capocannonieri
+    SpecRecord("MIGLIOR CAPOCANNONIERE", "top_scorer", "Gol"),
+    SpecRecord("PEGGIOR CAPOCANNONIERE", "top_scorer", "Gol", desc=False),
 ]
 
-# --- Capocannonieri
-records += [
-    estrai_record(df_topscorer, "MIGLIOR CAPOCANNONIERE",  "Gol"),
-    estrai_record(df_topscorer, "PEGGIOR CAPOCANNONIERE",  "Gol", desc=False)
-]
 
-# --- Squadra con più capocannonieri
-squad_most_scorers = (
-    df_topscorer.group_by("Squadra").count()
-               .sort("count", descending=True)
-               .select([
-                   pl.lit("SQUADRA MAGGIOR VOLTE CON CAPOCANNONIERE").alias("Record"),
-                   pl.col("Squadra"),
-                   pl.lit("-").alias("Stagione"),
-                   pl.col("count").alias("Valore")
-               ])
-               .limit(1)
-)
-records.append(squad_most_scorers)
-
-# --- Concatenazione finale
-df_record = pl.concat([formatta_record(r) for r in records])
-
-df_record.write_csv("record.csv")   # <-- salvo df_record
+def crea_record() -> pl.LazyFrame:
+    sorgenti = {nome: leggi(nome) for nome in dict.fromkeys(spec.sorgente for spec in RECORD)}
+    records = [estrai_records(sorgenti, RECORD)]
+    df_topscorer = sorgenti["top_scorer"]
+
+    # --- Squadra con più capocannonieri
+    # a pari numero vince l'ultima ad averlo raggiunto (riga più recente), come nell'aggiunta di una stagione
+    squad_most_scorers = (
+        df_topscorer.with_row_index("riga")
+                   .group_by("Squadra").agg(pl.len().alias("count"), pl.col("riga").max())
+                   .sort(["count", "riga"], descending=True)
+                   .select([
+                       pl.lit("SQUADRA MAGGIOR VOLTE CON CAPOCANNONIERE").alias("Record"),
+                       pl.col("Squadra"),
+                       pl.lit("-").alias("Stagione"),
+                       pl.col("count").alias("Valore")
+                   ])
+                   .limit(1)
+    )
+    records.append(squad_most_scorers)
+
+    # --- Concatenazione finale
+    return pl.concat([formatta_record(r) for r in records])
+
+
+# ====================================================
+# 3. GRAFO DI COSTRUZIONE
+# ====================================================
+
+# Stato dell'ultima costruzione: per ogni nodo le impronte (hash del contenuto) di ingressi e uscite
+STATO_COSTRUZIONE = ".stato_elaborazione.json"
+
+
+@dataclass(frozen=True)
+class Nodo:
+    """
+    Un dataset generato: nome (file <nome>.parquet), dataset letti e funzione che ne costruisce il piano.
+    Dipende dai nodi che producono i suoi ingressi; un nodo può leggere e riscrivere lo stesso file.
+    """
+    nome: str
+    ingressi: tuple[str, ...]
+    calcola: Callable[[], pl.LazyFrame]
+
+
+# winners/average_age/top_scorer/rankings -> principale -> titles/record
+# (average_age, top_scorer e rankings vengono solo completati e ordinati, sul posto)
+NODI = {nodo.nome: nodo for nodo in [
+    Nodo("average_age", ("average_age",), lambda: leggi("average_age")),   #dataset creato    <-- average_age_copia per usare il file generato da crea_average_age
+    Nodo("top_scorer", ("top_scorer",), lambda: leggi("top_scorer")),     #dataset trovato
+    Nodo("rankings", ("rankings",), lambda: leggi("rankings")),    #dataset creato       <-- rankings_copia
+    Nodo("principale", ("winners", "average_age"), crea_principale),
+    Nodo("titles", ("principale",), crea_titles),
+    Nodo("record", ("principale", "rankings", "average_age", "top_scorer"), crea_record),
+]}
+
+
+# 1) Impronte attuali dei file (None se il file non esiste)
+def _impronte(paths: list[str]) -> dict[str, str | None]:
+    return {path: versione_dati(path) if os.path.exists(path) else None for path in paths}
+
+
+# 2) Impronte di ingressi e uscite di un nodo, come vengono salvate nello stato
+def _file_nodo(nodo: Nodo, esporta_csv: bool) -> tuple[list[str], list[str]]:
+    ingressi = [f"{nome}.parquet" for nome in nodo.ingressi]
+    uscite = [f"{nodo.nome}.parquet"] + ([f"{nodo.nome}.csv"] if esporta_csv else [])
+    return ingressi, uscite
+
+
+def _impronte_nodo(nodo: Nodo, esporta_csv: bool) -> dict:
+    ingressi, uscite = _file_nodo(nodo, esporta_csv)
+    return {"ingressi": _impronte(ingressi), "uscite": _impronte(uscite)}
+
+
+def _salva_stato(stato: dict, stato_path: str) -> None:
+    tmp = f"{stato_path}.tmp"
+    Path(tmp).write_text(json.dumps(stato, indent=2, sort_keys=True))
+    os.replace(tmp, stato_path)
+
+
+# 3) Esecuzione di un nodo, saltata se ingressi e uscite sono quelli dell'ultima costruzione
+def _esegui(nodo: Nodo, precedente: dict | None, esporta_csv: bool, forza: bool) -> tuple[bool, dict]:
+    ingressi, uscite = _file_nodo(nodo, esporta_csv)
+    if (not forza and precedente is not None
+            and precedente["ingressi"] == _impronte(ingressi)
+            and all(impronta is not None and precedente["uscite"].get(path) == impronta
+                    for path, impronta in _impronte(uscite).items())):
+        return False, precedente
+
+    salva_dati(nodo.calcola().collect(), uscite[0], esporta_csv)
+    # impronte lette dopo il salvataggio: per i nodi "sul posto" l'ingresso è il file appena scritto
+    return True, _impronte_nodo(nodo, esporta_csv)
+
+
+# 4) Costruzione del grafo: nodi indipendenti in parallelo, ognuno appena i suoi ingressi sono pronti
+def costruisci(nodi: dict[str, Nodo] = NODI,
+               esporta_csv: bool = False,
+               forza: bool = False,
+               max_in_parallelo: int = 4,
+               stato_path: str = STATO_COSTRUZIONE) -> dict[str, bool]:
+    """
+    Aggiorna i dataset del grafo e restituisce {nome: ricostruito}.
+    - Un nodo viene ricalcolato solo se è cambiato (hash del contenuto) uno dei suoi ingressi
+      o una delle sue uscite, quindi toccare un file rifà solo i dataset che ne dipendono
+    - forza: ricalcola tutto
+    """
+    stato = json.loads(Path(stato_path).read_text()) if os.path.exists(stato_path) else {}
+    dipendenze = {
+        nome: {ingresso for ingresso in nodo.ingressi if ingresso in nodi and ingresso != nome}
+        for nome, nodo in nodi.items()
+    }
+    esiti: dict[str, bool] = {}
+    da_fare = set(nodi)
+    in_corso: dict = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max_in_parallelo) as pool:
+            while da_fare or in_corso:
+                for nome in sorted(n for n in da_fare if dipendenze[n] <= esiti.keys()):
+                    da_fare.remove(nome)
+                    in_corso[pool.submit(_esegui, nodi[nome], stato.get(nome), esporta_csv, forza)] = nome
+                fatti, _ = wait(in_corso, return_when=FIRST_COMPLETED)
+                for futuro in fatti:
+                    nome = in_corso.pop(futuro)
+                    esiti[nome], stato[nome] = futuro.result()
+                    print(f"{nome}: {'ricostruito' if esiti[nome] else 'invariato, saltato'}")
+    finally:
+        #lo stato dei nodi completati viene salvato anche se un nodo fallisce
+        _salva_stato(stato, stato_path)
+    return esiti
+
+
+# ====================================================
+# 4. AGGIUNTA DI UNA STAGIONE
+# ====================================================
+
+# Una stagione nuova aggiorna i dataset guardando solo le sue righe: contatore dei titoli del vincitore,
+# record in carica confrontati con i migliori della stagione e somme della classifica perpetua.
+# Il risultato è lo stesso di una costruzione completa (verifica: python benchmark/bench_stagioni.py).
+
+# dataset di ingresso e dataset derivati (perpetua è copiata, non è un nodo del grafo)
+SORGENTI = ("winners", "rankings", "average_age", "top_scorer")
+AGGIORNATI = SORGENTI + ("principale", "titles", "record", "perpetua")
+
+
+# 1) Righe nuove in coda, con colonne e tipi del dataset esistente
+def _accoda(df: pl.DataFrame, nuove: pl.DataFrame) -> pl.DataFrame:
+    return pl.concat([df, nuove.select(df.columns).cast(df.schema)])
+
+
+# 2) Riga di winners della stagione: la prima in classifica, con nome completo e stagione "YYYY-YY"
+def _vincitore(rankings: pl.DataFrame) -> pl.DataFrame:
+    anno = pl.col("Anno")
+    return rankings.filter(pl.col("Posizione") == 1).select(
+        (anno.cast(pl.Utf8) + "-" + ((anno + 1) % 100).cast(pl.Utf8).str.zfill(2)).alias("Stagione"),
+        nome_completo().alias("Vincitore"),
+        pl.all().exclude("Stagione", "Squadra", "Posizione", "Anno"),
+    )
+
+
+# 3) Classifica perpetua: somme della stagione aggiunte a quelle di ogni squadra, poi nuove posizioni
+def _aggiorna_perpetua(perpetua: pl.DataFrame, rankings: pl.DataFrame) -> pl.DataFrame:
+    somme = {"Partite": "Giocate", "V": "Vittorie", "P": "Pareggi", "S": "Sconfitte", "Punti": "Punteggio"}
+    stagione = rankings.group_by(nome_completo().alias("Squadra")).agg(
+        pl.col(origine).sum().alias(colonna) for colonna, origine in somme.items()
+    )
+    return (
+        perpetua.drop("Posizione")
+        .join(stagione, on="Squadra", how="full", coalesce=True, suffix="_stagione")
+        .select(
+            pl.col("Squadra"),
+            *[(pl.col(c).fill_null(0) + pl.col(f"{c}_stagione").fill_null(0)).alias(c) for c in somme],
+        )
+        .sort(["Punti", "V", "Squadra"], descending=[True, True, False])
+        .with_row_index("Posizione", offset=1)
+        .select(perpetua.columns)
+        .cast(perpetua.schema)
+    )
+
+
+# 4) Record: il migliore della stagione sostituisce quello in carica solo se strettamente migliore
+#    (a parità resta la riga più vecchia, come con arg_max/arg_min sulla costruzione completa)
+def _aggiorna_record(record: pl.DataFrame, candidati: pl.DataFrame,
+                     top_scorer: pl.DataFrame, top_scorer_stagione: pl.DataFrame) -> pl.DataFrame:
+    righe = []
+    for spec, attuale, nuovo in zip(RECORD, record.iter_rows(named=True), candidati.iter_rows(named=True)):
+        if nuovo["Valore"] is not None and (
+                attuale["Valore"] is None
+                or (nuovo["Valore"] > attuale["Valore"] if spec.desc else nuovo["Valore"] < attuale["Valore"])):
+            attuale = nuovo
+        righe.append(attuale)
+
+    # Squadra con più capocannonieri: contatore delle sole squadre della stagione,
+    # a parità vince l'ultima ad averlo raggiunto (come in crea_record)
+    capo = record.row(len(RECORD), named=True)
+    volte = {}
+    for squadra in top_scorer_stagione["Squadra"]:
+        if squadra not in volte:
+            volte[squadra] = (top_scorer["Squadra"] == squadra).sum()
+        volte[squadra] += 1
+        if volte[squadra] >= capo["Valore"]:
+            capo = capo | {"Squadra": squadra, "Valore": float(volte[squadra])}
+    righe.append(capo)
+    return pl.DataFrame(righe, schema=record.schema)
+
+
+# 5) Aggiornamento in memoria: tabelle (una per nome in AGGIORNATI) e righe della stagione nuova
+def aggiorna_stagione(tabelle: dict[str, pl.DataFrame],
+                      rankings: pl.DataFrame,
+                      average_age: pl.DataFrame,
+                      top_scorer: pl.DataFrame) -> dict[str, pl.DataFrame]:
+    """
+    Restituisce le tabelle di AGGIORNATI con la stagione aggiunta.
+    - rankings/average_age/top_scorer: solo le righe della stagione nuova (es. quelle degli scraper),
+      tutte dello stesso anno e successive all'ultima stagione di principale
+    - Il lavoro dipende dalle righe della stagione, non dallo storico: le righe si accodano, i contatori
+      e i record si confrontano solo con i valori nuovi, la perpetua somma una riga per squadra
+    """
+    nuove = {
+        "rankings": completa_e_ordina(rankings),
+        "average_age": completa_e_ordina(average_age),
+        "top_scorer": completa_e_ordina(top_scorer),
+    }
+    anni = pl.concat([df.select("Anno") for df in nuove.values()])["Anno"].unique()
+    ultimo = tabelle["principale"]["Anno"].max()
+    if len(anni) != 1 or anni[0] <= ultimo:
+        raise ValueError(f"Serve una sola stagione successiva al {ultimo}, trovati gli anni {anni.to_list()}")
+
+    nuove["winners"] = _vincitore(nuove["rankings"])
+    nuove["principale"] = _principale(
+        completa_e_ordina(nuove["winners"].lazy()), nuove["average_age"].lazy()
+    ).collect()
+
+    # contatore dei titoli: quello dell'ultimo titolo del vincitore + 1
+    titles = tabelle["titles"]
+    vincitore = nuove["principale"]["Vincitore"][0]
+    nuove["titles"] = nuove["principale"].select(
+        "Stagione", "Vincitore",
+        pl.lit((titles.filter(pl.col("Vincitore") == vincitore)["Titoli"].max() or 0) + 1).alias("Titoli"),
+        "Anno",
+    )
+
+    candidati = estrai_records(
+        {nome: nuove[nome].lazy() for nome in dict.fromkeys(spec.sorgente for spec in RECORD)}, RECORD
+    ).collect()
+
+    aggiornate = {nome: _accoda(tabelle[nome], nuove[nome])
+                  for nome in ("winners", "rankings", "average_age", "top_scorer", "principale", "titles")}
+    aggiornate["record"] = _aggiorna_record(tabelle["record"], candidati,
+                                            tabelle["top_scorer"], nuove["top_scorer"])
+    aggiornate["perpetua"] = _aggiorna_perpetua(tabelle["perpetua"], nuove["rankings"])
+    return aggiornate
+
+
+# 6) Aggiunta su disco: i dataset derivati aggiornati sono quelli di una costruzione completa,
+#    quindi lo stato del grafo li registra e la costruzione successiva non li ricalcola
+def aggiungi_stagione(rankings: pl.DataFrame,
+                      average_age: pl.DataFrame,
+                      top_scorer: pl.DataFrame,
+                      esporta_csv: bool = False,
+                      stato_path: str = STATO_COSTRUZIONE) -> None:
+    costruisci(esporta_csv=esporta_csv, stato_path=stato_path)   # si parte da dataset derivati aggiornati
+    tabelle = {nome: pl.read_parquet(f"{nome}.parquet") for nome in AGGIORNATI}
+    for nome, df in aggiorna_stagione(tabelle, rankings, average_age, top_scorer).items():
+        salva_dati(df, f"{nome}.parquet", esporta_csv)
+
+    stato = json.loads(Path(stato_path).read_text())
+    for nome, nodo in NODI.items():
+        stato[nome] = _impronte_nodo(nodo, esporta_csv)
+    _salva_stato(stato, stato_path)
+    print(f"Stagione {tabelle['principale']['Anno'].max() + 1} aggiunta: {', '.join(AGGIORNATI)}")
+
+
+if __name__ == "__main__":
+    # python elaborazione_df.py [--csv] [--forza]: il CSV si esporta solo con --csv
+    # python elaborazione_df.py --stagione r.parquet a.parquet t.parquet: aggiunge una stagione nuova
+    parser = argparse.ArgumentParser(description="Costruzione dei dataset derivati (solo quelli con ingressi cambiati)")
+    parser.add_argument("--csv", action="store_true", help="esporta anche i CSV")
+    parser.add_argument("--forza", action="store_true", help="ricalcola tutti i dataset")
+    parser.add_argument("--stagione", nargs=3, metavar=("RANKINGS", "AVERAGE_AGE", "TOP_SCORER"),
+                        help="file Parquet con le sole righe di una stagione nuova da aggiungere")
+    args = parser.parse_args()
+    if args.stagione:
+        aggiungi_stagione(*(pl.read_parquet(path) for path in args.stagione), esporta_csv=args.csv)
+    else:
+        costruisci(esporta_csv=args.csv, forza=args.forza)
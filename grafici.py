@@ -0,0 +1,295 @@
+# FILE dati per grafici e tabelle: i DataFrame Polars arrivano a Streamlit come tabelle Arrow
+#
+# st.dataframe e st.altair_chart inviano al browser ogni tabella in formato Arrow: una tabella pyarrow
+# viene serializzata così com'è, tutto il resto (anche un DataFrame Polars) passa prima da pandas.
+# in_arrow() costruisce direttamente la tabella Arrow dal frame Polars (senza copia delle colonne numeriche),
+# quindi a ogni rerun non c'è più la seconda copia in pandas; pandas resta solo dove serve davvero
+# (sklearn nella pagina Cluster, Styler per le tabelle colorate).
+# grafico() sostituisce st.altair_chart: ogni tabella del grafico viene inviata una sola volta (anche se usata
+# da più layer), con le sole colonne citate nella spec e gli interi nel tipo più piccolo che li contiene;
+# i byte inviati da ogni pagina finiscono nella sidebar e in .payload_pagine.jsonl.
+# grafico_in_cache() conserva spec e dataset già serializzati per (grafico, widget, versione dei dati):
+# se niente è cambiato il grafico non viene ricostruito.
+
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Callable
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import polars as pl
+import pyarrow as pa
+import streamlit as st
+from streamlit import dataframe_util
+
+# registro dei byte inviati da ogni pagina (una riga JSON per rerun); None -> nessun file
+FILE_PAYLOAD = ".payload_pagine.jsonl"
+# False -> i grafici passano da st.altair_chart come prima (per confrontare i byte, vedi benchmark/bench_payload.py)
+COMPATTA = True
+
+
+# ===============================
+# 1. DA POLARS AD ARROW
+# ===============================
+
+# 1) Tipi pandas/NumPy di una colonna, come li scrive pyarrow nei metadati di un DataFrame pandas
+def _tipi_pandas(tipo: pa.DataType) -> tuple[str, str] | None:
+    if pa.types.is_string(tipo):
+        return "unicode", "object"
+    if pa.types.is_null(tipo):
+        return "empty", "object"
+    if pa.types.is_boolean(tipo):
+        return "bool", "bool"
+    if pa.types.is_integer(tipo) or pa.types.is_floating(tipo):
+        nome = np.dtype(tipo.to_pandas_dtype()).name
+        return nome, nome
+    return None
+
+
+# 2) Metadati "pandas" dello schema: il frontend di Streamlit li legge da ogni tabella (indice 0..n-1)
+def _metadati_pandas(tabella: pa.Table, tipi: list[tuple[str, str]]) -> bytes:
+    return json.dumps({
+        "index_columns": [{"kind": "range", "name": None, "start": 0, "stop": tabella.num_rows, "step": 1}],
+        "column_indexes": [{"name": None, "field_name": None, "pandas_type": "unicode",
+                            "numpy_type": "object", "metadata": {"encoding": "UTF-8"}}],
+        "columns": [{"name": nome, "field_name": nome, "pandas_type": pandas_type,
+                     "numpy_type": numpy_type, "metadata": None}
+                    for nome, (pandas_type, numpy_type) in zip(tabella.column_names, tipi)],
+        "creator": {"library": "pyarrow", "version": pa.__version__},
+        "pandas_version": pd.__version__,
+    }).encode()
+
+
+# 3) Tabella Arrow pronta per st.dataframe e alt.Chart
+def in_arrow(df: pl.DataFrame) -> pa.Table:
+    """
+    Tabella Arrow del frame Polars, con gli stessi valori che arriverebbero al browser passando da pandas.
+    - Le stringhe (large_string in Polars) diventano string, come quelle scritte da pandas
+    - I NaN delle colonne float diventano nulli, come da pandas ad Arrow
+    - Gli interi con valori nulli restano interi (con pandas diventavano float con NaN)
+    - Colonne di altri tipi (date, categorie, liste): si passa da pandas come prima
+    """
+    con_nan = [nome for nome, tipo in df.schema.items()
+               if tipo.is_float() and df[nome].is_nan().any()]
+    if con_nan:
+        df = df.with_columns(pl.col(con_nan).fill_nan(None))
+    tabella = df.to_arrow()
+    schema = pa.schema([
+        pa.field(campo.name, pa.string()) if pa.types.is_large_string(campo.type) else campo
+        for campo in tabella.schema
+    ])
+    tipi = [_tipi_pandas(campo.type) for campo in schema]
+    if any(tipo is None for tipo in tipi):
+        return pa.Table.from_pandas(df.to_pandas())
+    tabella = tabella.cast(schema)
+    return tabella.replace_schema_metadata({"pandas": _metadati_pandas(tabella, tipi)})
+
+
+# ===============================
+# 2. GRAFICI ALTAIR COMPATTI
+# ===============================
+
+# chiavi della spec Vega-Lite che contengono nomi di colonna, o espressioni che li citano come datum.X
+CHIAVI_CAMPO = {"field", "lookup", "key"}
+CHIAVI_CAMPI = {"fields", "groupby", "fold"}
+CHIAVI_ESPRESSIONE = {"filter", "calculate", "expr", "test"}
+DATUM = re.compile(r"datum\.([A-Za-z_]\w*)|datum\[['\"]([^'\"]+)['\"]\]")
+INTERI = [(pl.Int8, 2**7), (pl.Int16, 2**15), (pl.Int32, 2**31)]
+
+
+# 1) Colonne citate da qualunque parte della spec (encoding, tooltip, transform, selezioni)
+def _campi_usati(spec, campi: set[str] | None = None) -> set[str]:
+    campi = set() if campi is None else campi
+    if isinstance(spec, dict):
+        for chiave, valore in spec.items():
+            if chiave in CHIAVI_CAMPO and isinstance(valore, str):
+                campi.add(valore)
+            elif chiave in CHIAVI_CAMPI and isinstance(valore, list):
+                campi.update(v for v in valore if isinstance(v, str))
+            elif chiave in CHIAVI_ESPRESSIONE and isinstance(valore, str):
+                campi.update(a or b for a, b in DATUM.findall(valore))
+            else:
+                _campi_usati(valore, campi)
+    elif isinstance(spec, list):
+        for valore in spec:
+            _campi_usati(valore, campi)
+    return campi
+
+
+# 2) Tabella del grafico: solo le colonne usate, interi ridotti (int64 -> int8/16/32 se i valori ci stanno)
+def _compatta_tabella(dati, campi: set[str]) -> pa.Table:
+    if isinstance(dati, pa.Table):
+        df = pl.from_arrow(dati)
+    elif isinstance(dati, pd.DataFrame):
+        df = pl.from_pandas(dati)
+    else:
+        df = dati
+    usate = [c for c in df.columns if c in campi]
+    if usate:                      # nessuna colonna citata (es. solo valori fissi): la tabella resta com'è
+        df = df.select(usate)
+    riduzioni = []
+    for nome, tipo in df.schema.items():
+        if tipo in (pl.Int64, pl.Int32, pl.Int16) and df[nome].null_count() < df.height:
+            minimo, massimo = df[nome].min(), df[nome].max()
+            for piccolo, limite in INTERI:
+                if -limite <= minimo and massimo < limite:
+                    if piccolo != tipo:
+                        riduzioni.append(pl.col(nome).cast(piccolo))
+                    break
+    return in_arrow(df.with_columns(riduzioni) if riduzioni else df)
+
+
+# 3) Spec Vega-Lite con i dataset in Arrow: una voce per tabella distinta, nome = hash dei byte
+def spec_compatta(chart: alt.TopLevelMixin, compatta: bool = True) -> tuple[dict, dict[str, bytes]]:
+    """
+    (spec, dataset): la stessa spec che Streamlit ricava da st.altair_chart, ma con i dati già compattati.
+    - Ogni tabella del grafico compare una volta sola anche se è usata da più layer
+    - Le colonne non citate in encoding, tooltip, transform e selezioni non vengono inviate
+    - compatta=False: tabelle intere, come le invia st.altair_chart (per misurare la differenza)
+    """
+    tabelle: dict[str, object] = {}
+
+    def registra(dati) -> dict[str, str]:
+        # nome provvisorio per oggetto: la stessa tabella usata da più layer diventa un solo dataset
+        nome = f"tabella_{id(dati)}"
+        tabelle[nome] = dati
+        return {"name": nome}
+
+    alt.data_transformers.register("compatta", registra)
+    # stesso tema di st.altair_chart (quello di default aggiunge dimensioni che Streamlit non usa)
+    with alt.themes.enable("none") if alt.themes.active == "default" else nullcontext():
+        with alt.data_transformers.enable("compatta"):
+            spec = chart.to_dict()
+
+    campi = _campi_usati(spec)
+    dataset, rinomina = {}, {}
+    for provvisorio, dati in tabelle.items():
+        if compatta:
+            byte = dataframe_util.convert_arrow_table_to_arrow_bytes(_compatta_tabella(dati, campi))
+        else:
+            byte = dataframe_util.convert_anything_to_arrow_bytes(dati)
+        nome = hashlib.md5(byte).hexdigest()
+        dataset[nome] = byte
+        rinomina[provvisorio] = nome
+    testo = json.dumps(spec)
+    for provvisorio, nome in rinomina.items():
+        testo = testo.replace(f'"{provvisorio}"', f'"{nome}"')
+    return json.loads(testo), dataset
+
+
+# ===============================
+# 3. GRAFICI NELLA PAGINA E BYTE INVIATI
+# ===============================
+
+# contatori del rerun in corso: ogni sessione di Streamlit esegue la pagina nel proprio thread
+_rerun = threading.local()
+
+
+def _contatori() -> dict[str, int]:
+    if not hasattr(_rerun, "contatori"):
+        _rerun.contatori = {"grafici": 0, "dalla_cache": 0, "byte_spec": 0, "byte_dati": 0}
+    return _rerun.contatori
+
+
+def _conta(byte_spec: int, dataset: dict[str, bytes], dalla_cache: bool = False) -> None:
+    contatori = _contatori()
+    contatori["grafici"] += 1
+    contatori["dalla_cache"] += dalla_cache
+    contatori["byte_spec"] += byte_spec
+    contatori["byte_dati"] += sum(len(byte) for byte in dataset.values())
+
+
+# 1) Al posto di st.altair_chart
+def grafico(chart: alt.TopLevelMixin, **kwargs) -> None:
+    spec, dataset = spec_compatta(chart, compatta=COMPATTA)
+    _conta(len(json.dumps(spec).encode()), dataset)
+    if COMPATTA:
+        st.vega_lite_chart(spec={**spec, "datasets": dataset}, **kwargs)
+    else:
+        st.altair_chart(chart, **kwargs)
+
+
+# 2) Byte dei grafici della pagina in questo rerun: registrati su file e restituiti come testo per la sidebar
+def riepilogo_payload(pagina: str) -> str:
+    contatori = _contatori()
+    del _rerun.contatori          # il prossimo rerun riparte da zero
+    totale = contatori["byte_spec"] + contatori["byte_dati"]
+    if FILE_PAYLOAD is not None:
+        riga = {"ora": time.strftime("%Y-%m-%dT%H:%M:%S"), "pagina": pagina, **contatori, "byte_totali": totale}
+        with open(FILE_PAYLOAD, "a", encoding="utf-8") as f:
+            f.write(json.dumps(riga) + "\n")
+    return (f"Grafici: {contatori['grafici']} ({contatori['dalla_cache']} dalla cache), {totale / 1024:.1f} KiB inviati "
+            f"({contatori['byte_spec'] / 1024:.1f} spec + {contatori['byte_dati'] / 1024:.1f} dati)")
+
+
+# ===============================
+# 4. CACHE DELLE SPEC PER VERSIONE DEI DATI E STATO DEI WIDGET
+# ===============================
+
+# (chiave, versione) -> (spec JSON, dataset Arrow, byte); LRU con tetto sul numero di voci e sui byte totali
+_spec: OrderedDict[tuple, tuple[str, dict[str, bytes], int]] = OrderedDict()
+_lock = threading.Lock()
+_statistiche = {"hit": 0, "miss": 0, "rimosse": 0}
+MAX_SPEC = 256
+MAX_BYTE_SPEC = 32 * 2**20
+
+
+# 1) Grafico già serializzato se nulla è cambiato, altrimenti crea() + serializzazione
+def grafico_in_cache(chiave: tuple, versione: str, crea: Callable[[], alt.TopLevelMixin], **kwargs) -> None:
+    """
+    Come grafico(crea(), **kwargs), ma la spec JSON e i dataset restano in cache.
+    - chiave: (nome del grafico, valori dei widget da cui dipende), es. ("biplot", 1, 2, k, metodo)
+    - versione: versione dei dati da cui viene (es. versione_dati(path)); una versione nuova
+      sostituisce tutte le voci dello stesso grafico
+    - crea() costruisce il grafico Altair e viene chiamata solo in caso di miss
+    - Con COMPATTA = False si passa sempre da st.altair_chart, senza cache
+    """
+    if not COMPATTA:
+        grafico(crea(), **kwargs)
+        return
+    voce = (chiave, versione)
+    with _lock:
+        trovato = _spec.get(voce)
+        if trovato is not None:
+            _spec.move_to_end(voce)
+            _statistiche["hit"] += 1
+    dalla_cache = trovato is not None
+    if trovato is None:
+        spec, dataset = spec_compatta(crea())
+        testo = json.dumps(spec)
+        trovato = (testo, dataset, len(testo) + sum(len(byte) for byte in dataset.values()))
+        with _lock:
+            _statistiche["miss"] += 1
+            for vecchia in [k for k in _spec if k[0][0] == chiave[0] and k[1] != versione]:
+                del _spec[vecchia]
+                _statistiche["rimosse"] += 1
+            _spec[voce] = trovato
+            totale = sum(byte for _, _, byte in _spec.values())
+            while len(_spec) > 1 and (len(_spec) > MAX_SPEC or totale > MAX_BYTE_SPEC):
+                totale -= _spec.popitem(last=False)[1][2]
+                _statistiche["rimosse"] += 1
+    testo, dataset, _ = trovato
+    _conta(len(testo.encode()), dataset, dalla_cache)
+    st.vega_lite_chart(spec={**json.loads(testo), "datasets": dataset}, **kwargs)
+
+
+# 2) Contatori e svuotamento della cache
+def statistiche_spec() -> dict[str, int]:
+    with _lock:
+        stats = dict(_statistiche)
+        stats["voci"] = len(_spec)
+        stats["byte"] = sum(byte for _, _, byte in _spec.values())
+    return stats
+
+
+def svuota_spec() -> None:
+    with _lock:
+        _spec.clear()
+        for k in _statistiche:
+            _statistiche[k] = 0
@@ -0,0 +1,178 @@
+# FILE matrici squadra contro squadra (righe = squadra di casa, colonne = squadra ospite)
+#
+# Le matrici si costruiscono con un solo pivot del dataset delle partite, per qualunque insieme di squadre
+# (le Big Six della pagina 5 o tutte le squadre della Premier League).
+# Gli scontri diretti (h2h_premier) sono tenuti in array NumPy densi indicizzati per squadra.
+#
+# Uso (dalla cartella del progetto):
+#   python matrici.py [cartella]    -> salva gli array degli scontri diretti in .npy (di default h2h_premier_npy)
+
+import functools
+import json
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import polars as pl
+
+from dati import carica_dati, versione_dati
+
+
+# ===============================
+# 1. MATRICI DAL DATASET DELLE PARTITE
+# ===============================
+
+
+def matrici_scontri(df: pl.DataFrame,
+                    valori: list[str],
+                    squadre: list[str] | None = None,
+                    riga: str = "home",
+                    colonna: str = "away",
+                    diagonale: dict[str, object] | None = None,
+                    mancante: dict[str, object] | None = None) -> dict[str, pl.DataFrame]:
+    """
+    Una matrice per ogni colonna di valori, tutte da un solo pivot: {valore: DataFrame}.
+    - Ogni matrice ha la colonna riga (squadre) e una colonna per squadra, nell'ordine di squadre
+      (di default tutte le squadre di casa, in ordine alfabetico)
+    - diagonale: valore delle celle squadra contro sé stessa, per matrice (null se non indicato)
+    - mancante: valore delle coppie senza partita, per matrice (null se non indicato)
+    - Con più partite per la stessa coppia vale la prima riga del dataset
+    """
+    squadre = sorted(df[riga].unique().to_list()) if squadre is None else list(squadre)
+    diagonale = diagonale or {}
+    mancante = mancante or {}
+
+    larga = (
+        df.filter(pl.col(riga).is_in(squadre) & pl.col(colonna).is_in(squadre) & (pl.col(riga) != pl.col(colonna)))
+        .pivot(on=colonna, index=riga, values=valori, aggregate_function="first", separator="|")
+    )
+    # tutte le squadre come righe, nell'ordine richiesto (le squadre senza partite restano vuote)
+    larga = pl.DataFrame({riga: squadre}).join(larga, on=riga, how="left")
+
+    matrici = {}
+    for valore in valori:
+        tipo = df.schema[valore]
+        celle = []
+        for squadra in squadre:
+            nome = f"{valore}|{squadra}" if len(valori) > 1 else squadra
+            cella = pl.col(nome) if nome in larga.columns else pl.lit(None, dtype=tipo)
+            celle.append(
+                pl.when(pl.col(riga) == squadra).then(pl.lit(diagonale.get(valore), dtype=tipo))
+                .otherwise(cella.fill_null(pl.lit(mancante.get(valore), dtype=tipo)))
+                .alias(squadra)
+            )
+        matrici[valore] = larga.select(pl.col(riga), *celle)
+    return matrici
+
+
+# ===============================
+# 2. SCONTRI DIRETTI
+# ===============================
+
+# array salvati su disco, uno per file .npy
+ARRAY_SCONTRI = ("giocate", "vittorie", "pareggi", "gol")
+
+
+@dataclass
+class ScontriDiretti:
+    """
+    Bilanci testa a testa in array (squadre x squadre), riga = squadra, colonna = avversaria.
+    - giocate, pareggi: simmetrici; vittorie[i, j]: vittorie di i contro j; gol[i, j]: gol di i contro j
+    - Le coppie senza scontri valgono 0, come la diagonale
+    - indice: squadra -> posizione, per trovare una coppia senza cercare nel dataset
+    """
+    squadre: list[str]
+    giocate: np.ndarray
+    vittorie: np.ndarray
+    pareggi: np.ndarray
+    gol: np.ndarray
+    indice: dict[str, int] = field(init=False)
+
+    def __post_init__(self):
+        self.indice = {squadra: k for k, squadra in enumerate(self.squadre)}
+
+    # 1) Dal dataset h2h_premier: una riga per coppia, in uno qualunque dei due versi
+    @classmethod
+    def da_dataframe(cls, df: pl.DataFrame) -> "ScontriDiretti":
+        squadre = sorted(set(df["team1"].to_list()) | set(df["team2"].to_list()))
+        indice = {squadra: k for k, squadra in enumerate(squadre)}
+        i = df["team1"].replace_strict(indice, return_dtype=pl.Int64).to_numpy()
+        j = df["team2"].replace_strict(indice, return_dtype=pl.Int64).to_numpy()
+
+        def simmetrica(di_team1: str, di_team2: str) -> np.ndarray:
+            m = np.zeros((len(squadre), len(squadre)), dtype=np.int64)
+            m[j, i] = df[di_team2].to_numpy()
+            m[i, j] = df[di_team1].to_numpy()
+            return m
+
+        return cls(
+            squadre,
+            giocate=simmetrica("played", "played"),
+            vittorie=simmetrica("win1", "win2"),
+            pareggi=simmetrica("draws", "draws"),
+            gol=simmetrica("goal1", "goal2"),
+        )
+
+    # 2) Bilancio di una coppia, dal punto di vista di a
+    def coppia(self, a: str, b: str) -> dict[str, int]:
+        i, j = self.indice[a], self.indice[b]
+        return {
+            "giocate": int(self.giocate[i, j]),
+            "vittorie": int(self.vittorie[i, j]),
+            "pareggi": int(self.pareggi[i, j]),
+            "sconfitte": int(self.vittorie[j, i]),
+            "gol_fatti": int(self.gol[i, j]),
+            "gol_subiti": int(self.gol[j, i]),
+        }
+
+    # 3) Saldo vittorie - sconfitte di ogni squadra contro ogni altra
+    def saldo(self) -> np.ndarray:
+        return self.vittorie - self.vittorie.T
+
+    # 4) Dataframe lungo per la heatmap: team1, team2, net (V - S, NaN sulla diagonale), V, S
+    def heatmap(self, squadre: list[str] | None = None) -> pl.DataFrame:
+        scelte = np.arange(len(self.squadre)) if squadre is None else np.array([self.indice[s] for s in squadre])
+        n = len(scelte)
+        vinte = self.vittorie[np.ix_(scelte, scelte)]
+        net = (vinte - vinte.T).astype(np.float64)
+        np.fill_diagonal(net, np.nan)
+        nomi = pl.Series([self.squadre[k] for k in scelte])
+        return pl.DataFrame({
+            "team1": nomi.gather(np.repeat(np.arange(n), n)),
+            "team2": nomi.gather(np.tile(np.arange(n), n)),
+            "net": net.ravel(),
+            "V": vinte.ravel(),
+            "S": vinte.T.ravel(),
+        })
+
+    # 5) Salvataggio e lettura in .npy (con mmap gli array si leggono dal disco solo dove servono)
+    def salva(self, cartella: str) -> None:
+        Path(cartella).mkdir(parents=True, exist_ok=True)
+        for nome in ARRAY_SCONTRI:
+            np.save(Path(cartella) / f"{nome}.npy", getattr(self, nome))
+        (Path(cartella) / "squadre.json").write_text(json.dumps(self.squadre, ensure_ascii=False))
+
+    @classmethod
+    def carica(cls, cartella: str, mmap: bool = True) -> "ScontriDiretti":
+        return cls(
+            json.loads((Path(cartella) / "squadre.json").read_text()),
+            **{nome: np.load(Path(cartella) / f"{nome}.npy", mmap_mode="r" if mmap else None)
+               for nome in ARRAY_SCONTRI},
+        )
+
+
+# Archivio costruito una volta per versione del file (hash del contenuto, vedi dati.py)
+@functools.lru_cache(maxsize=4)
+def _scontri(path: str, versione: str) -> ScontriDiretti:
+    return ScontriDiretti.da_dataframe(carica_dati(path))
+
+
+def scontri_diretti(path: str = "h2h_premier.parquet") -> ScontriDiretti:
+    return _scontri(path, versione_dati(path))
+
+
+if __name__ == "__main__":
+    cartella = sys.argv[1] if len(sys.argv) > 1 else "h2h_premier_npy"
+    scontri_diretti().salva(cartella)
+    print(f"h2h_premier.parquet -> {cartella}/ ({', '.join(ARRAY_SCONTRI)})")
@@ -0,0 +1,337 @@
+# FILE modelli della pagina Cluster: standardizzazione, PCA e KMeans per ogni k, in cache
+#
+# I modelli dipendono solo dalla matrice delle feature: l'impronta (hash) della matrice è la chiave della cache,
+# in memoria e su disco (.cache_modelli), quindi un riavvio del server non rifà gli stessi fit.
+# Ogni k viene stimato una sola volta e condiviso tra grafico principale, Elbow e Silhouette.
+# Con molte righe la validazione (un fit per k) gira in un pool di processi, la Silhouette si può
+# stimare su un campione e al posto di KMeans si può usare MiniBatchKMeans.
+# Le feature si possono costruire anche per tutte le squadre-stagioni (feature_stagioni), stimando
+# standardizzazione e PCA a blocchi (partial_fit, IncrementalPCA).
+# In alternativa a KMeans c'è il clustering gerarchico: la matrice di linkage si calcola una volta
+# e ogni k è solo un taglio del dendrogramma.
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import polars as pl
+import sklearn
+from scipy.cluster.hierarchy import dendrogram, fcluster, linkage
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.decomposition import PCA, IncrementalPCA
+from sklearn.metrics import silhouette_score
+from sklearn.preprocessing import StandardScaler
+
+from squadre import NOMI_CAPOCANNONIERI, nome_completo
+
+CARTELLA_MODELLI = ".cache_modelli"
+SEME = 42
+# versione del contenuto salvato su disco: cambiandola i file vecchi non vengono più letti
+VERSIONE_CACHE = 4
+# sotto questo numero di righe la validazione resta nel processo: avviare il pool costa più dei fit
+RIGHE_PER_POOL = 5000
+# righe per blocco nelle stime incrementali
+BLOCCO = 1000
+
+_lock = threading.Lock()
+
+
+# ===============================
+# 1. STIME DI UN k
+# ===============================
+
+# Funzioni di modulo: girano anche nei processi del pool
+
+def _stima(X: np.ndarray, k: int, minibatch: bool) -> tuple[KMeans | MiniBatchKMeans, float]:
+    t0 = time.perf_counter()
+    algoritmo = MiniBatchKMeans if minibatch else KMeans
+    return algoritmo(n_clusters=k, random_state=SEME).fit(X), time.perf_counter() - t0
+
+
+def _silhouette(X: np.ndarray, etichette: np.ndarray, campione: int | None, seme: int) -> tuple[float, float]:
+    """Silhouette esatta (O(n²)) o su campione righe estratte con il seme dato."""
+    t0 = time.perf_counter()
+    if campione is not None and campione >= len(X):
+        campione = None
+    valore = silhouette_score(X, etichette, sample_size=campione, random_state=seme if campione else None)
+    return float(valore), time.perf_counter() - t0
+
+
+def _valida_k(X: np.ndarray, k: int, minibatch: bool, campione: int | None, seme: int) -> dict:
+    modello, t_fit = _stima(X, k, minibatch)
+    voce = {"k": k, "modello": modello, "t_fit": t_fit, "silhouette": None, "t_silhouette": None}
+    if k >= 2:
+        voce["silhouette"], voce["t_silhouette"] = _silhouette(X, modello.labels_, campione, seme)
+    return voce
+
+
+# ===============================
+# 2. MODELLI DI UNA MATRICE DI FEATURE
+# ===============================
+
+@dataclass
+class ModelliCluster:
+    """
+    Modelli stimati su una matrice di feature (impronta = hash di dati, colonne e parametri).
+    - scaler, pca, X_scaled, X_pca: stimati alla creazione (a blocchi se incrementale)
+    - kmeans: modello per (k, minibatch), stimato alla prima richiesta e poi solo letto
+    - silhouette: valore per (k, minibatch, campione, seme), campione=None -> Silhouette esatta
+    - collegamenti: matrice di linkage per metodo (es. "ward"), tagli: etichette per (metodo, k)
+    - tempi: secondi di ogni stima, con le stesse chiavi precedute da "fit" o "silhouette"
+    """
+    impronta: str
+    scaler: StandardScaler
+    pca: PCA
+    X_scaled: np.ndarray
+    X_pca: np.ndarray
+    path: str | None = None
+    incrementale: bool = False
+    kmeans: dict[tuple[int, bool], KMeans | MiniBatchKMeans] = field(default_factory=dict)
+    silhouette: dict[tuple[int, bool, int | None, int], float] = field(default_factory=dict)
+    tempi: dict[tuple, float] = field(default_factory=dict)
+    collegamenti: dict[str, np.ndarray] = field(default_factory=dict)
+    tagli: dict[tuple[str, int], np.ndarray] = field(default_factory=dict)
+
+    # 1) KMeans (o MiniBatchKMeans) con k cluster: stesso modello del fit diretto con random_state=SEME
+    def modello(self, k: int, minibatch: bool = False) -> KMeans | MiniBatchKMeans:
+        with _lock:
+            trovato = self.kmeans.get((k, minibatch))
+        if trovato is None:
+            trovato, secondi = _stima(self.X_scaled, k, minibatch)
+            with _lock:
+                trovato = self.kmeans.setdefault((k, minibatch), trovato)
+                self.tempi.setdefault(("fit", k, minibatch), secondi)
+            self.salva()
+        return trovato
+
+    def etichette(self, k: int, minibatch: bool = False) -> np.ndarray:
+        return self.modello(k, minibatch).labels_
+
+    def inerzia(self, k: int, minibatch: bool = False) -> float:
+        return float(self.modello(k, minibatch).inertia_)
+
+    # 2) Silhouette delle etichette del modello con k cluster (k >= 2), esatta o su un campione di righe
+    def punteggio_silhouette(self, k: int, minibatch: bool = False,
+                             campione: int | None = None, seme: int = SEME) -> float:
+        chiave = (k, minibatch, campione, seme)
+        with _lock:
+            trovato = self.silhouette.get(chiave)
+        if trovato is None:
+            trovato, secondi = _silhouette(self.X_scaled, self.etichette(k, minibatch), campione, seme)
+            with _lock:
+                self.silhouette[chiave] = trovato
+                self.tempi.setdefault(("silhouette", *chiave), secondi)
+            self.salva()
+        return trovato
+
+    # 3) Validazione di più k: i k mancanti si stimano insieme, in un pool di processi se le righe sono tante
+    def valida(self, k_range: list[int], minibatch: bool = False, campione: int | None = None,
+               seme: int = SEME, processi: int | None = None) -> pl.DataFrame:
+        """
+        Una riga per k: k, Inerzia, Silhouette (null per k=1), secondi di fit e di Silhouette.
+        - processi: dimensione del pool (default: tutte le CPU); 1 -> nessun pool
+        - I risultati restano in cache come quelli di modello() e punteggio_silhouette()
+        """
+        with _lock:
+            mancanti = [k for k in k_range
+                        if (k, minibatch) not in self.kmeans
+                        or (k >= 2 and (k, minibatch, campione, seme) not in self.silhouette)]
+        processi = processi or os.cpu_count() or 1
+        if len(mancanti) > 1 and processi > 1 and len(self.X_scaled) >= RIGHE_PER_POOL:
+            with ProcessPoolExecutor(max_workers=min(processi, len(mancanti))) as pool:
+                stime = list(pool.map(_valida_k, *zip(*[
+                    (self.X_scaled, k, minibatch, campione, seme) for k in mancanti
+                ])))
+            with _lock:
+                for voce in stime:
+                    k = voce["k"]
+                    self.kmeans.setdefault((k, minibatch), voce["modello"])
+                    self.tempi.setdefault(("fit", k, minibatch), voce["t_fit"])
+                    if voce["silhouette"] is not None:
+                        self.silhouette.setdefault((k, minibatch, campione, seme), voce["silhouette"])
+                        self.tempi.setdefault(("silhouette", k, minibatch, campione, seme), voce["t_silhouette"])
+            self.salva()
+
+        return pl.DataFrame({
+            "k": list(k_range),
+            "Inerzia": [self.inerzia(k, minibatch) for k in k_range],
+            "Silhouette": [self.punteggio_silhouette(k, minibatch, campione, seme) if k >= 2 else None
+                           for k in k_range],
+            "Secondi fit": [self.tempi.get(("fit", k, minibatch)) for k in k_range],
+            "Secondi Silhouette": [self.tempi.get(("silhouette", k, minibatch, campione, seme)) for k in k_range],
+        })
+
+    # 4) Scarto delle metriche approssimate (MiniBatchKMeans e/o Silhouette su campione) da quelle esatte
+    def confronta_validazione(self, k_range: list[int], minibatch: bool = True, campione: int | None = 2000,
+                              seme: int = SEME, processi: int | None = None) -> pl.DataFrame:
+        esatta = self.valida(k_range, processi=processi)
+        approssimata = self.valida(k_range, minibatch=minibatch, campione=campione, seme=seme, processi=processi)
+        return esatta.join(approssimata, on="k", suffix=" approssimata").with_columns(
+            ((pl.col("Inerzia approssimata") / pl.col("Inerzia") - 1) * 100).round(2).alias("Scarto inerzia %"),
+            (pl.col("Silhouette approssimata") - pl.col("Silhouette")).round(4).alias("Scarto Silhouette"),
+        )
+
+    # 5) Clustering gerarchico: linkage calcolato una volta per metodo, poi ogni k è un taglio in O(n)
+    def collegamento(self, metodo: str = "ward") -> np.ndarray:
+        with _lock:
+            trovato = self.collegamenti.get(metodo)
+        if trovato is None:
+            t0 = time.perf_counter()
+            trovato = linkage(self.X_scaled, method=metodo)
+            with _lock:
+                trovato = self.collegamenti.setdefault(metodo, trovato)
+                self.tempi.setdefault(("linkage", metodo), time.perf_counter() - t0)
+            self.salva()
+        return trovato
+
+    def etichette_gerarchiche(self, k: int, metodo: str = "ward") -> np.ndarray:
+        """Etichette 0..k-1 del dendrogramma tagliato in k gruppi (i tagli restano in memoria, non su disco)."""
+        with _lock:
+            trovato = self.tagli.get((metodo, k))
+        if trovato is None:
+            trovato = fcluster(self.collegamento(metodo), k, criterion="maxclust") - 1
+            with _lock:
+                trovato = self.tagli.setdefault((metodo, k), trovato)
+        return trovato
+
+    # 6) Segmenti del dendrogramma per Altair, colorati con il cluster del taglio in k gruppi
+    def dendrogramma(self, k: int, etichette_foglie: list[str], metodo: str = "ward") -> tuple[pl.DataFrame, pl.DataFrame, float]:
+        """
+        (segmenti, foglie, altezza del taglio)
+        - segmenti: x, x2, y, y2 e Cluster (null sopra il taglio), tre per ogni unione
+        - foglie: posizione x ed etichetta di ogni foglia, nell'ordine del dendrogramma
+        """
+        Z = self.collegamento(metodo)
+        altezze = Z[:, 2]
+        taglio = float((altezze[-k] + altezze[-k + 1]) / 2) if k > 1 else float(altezze[-1] * 1.05)
+        albero = dendrogram(Z, no_plot=True)
+        ordine = albero["leaves"]
+        gruppi = self.etichette_gerarchiche(k, metodo)
+
+        righe = []
+        for xs, ys in zip(albero["icoord"], albero["dcoord"]):
+            # foglia più vicina al figlio sinistro: sta sempre dentro il sottoalbero, quindi nel suo cluster
+            cluster = None
+            if ys[1] < taglio:
+                cluster = str(gruppi[ordine[int(round((xs[0] - 5) / 10))]])
+            for i in range(3):
+                righe.append({"x": xs[i], "x2": xs[i + 1], "y": ys[i], "y2": ys[i + 1], "Cluster": cluster})
+        foglie = pl.DataFrame({
+            "x": [5.0 + 10 * i for i in range(len(ordine))],
+            "Foglia": [etichette_foglie[i] for i in ordine],
+            "Cluster": [str(gruppi[i]) for i in ordine],
+        })
+        return pl.DataFrame(righe, schema={"x": pl.Float64, "x2": pl.Float64, "y": pl.Float64,
+                                           "y2": pl.Float64, "Cluster": pl.Utf8}), foglie, taglio
+
+    # 7) Salvataggio su disco (file temporaneo e poi rinomina, mai un file a metà)
+    def salva(self) -> None:
+        if self.path is None:
+            return
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{self.path}.{threading.get_ident()}.tmp"
+        with _lock:
+            joblib.dump(self, tmp)
+        os.replace(tmp, self.path)
+
+
+# ===============================
+# 3. CACHE PER IMPRONTA
+# ===============================
+
+_modelli: dict[str, ModelliCluster] = {}
+
+
+def impronta_feature(X: pd.DataFrame, *parametri) -> str:
+    h = hashlib.sha1(np.ascontiguousarray(X.to_numpy(dtype=np.float64)).tobytes())
+    h.update(repr((list(X.columns), parametri, sklearn.__version__, VERSIONE_CACHE)).encode())
+    return h.hexdigest()
+
+
+def _stima_a_blocchi(X: pd.DataFrame, n_componenti: int, blocco: int) -> tuple:
+    # standardizzazione e PCA stimate un blocco di righe alla volta: memoria dei fit limitata al blocco
+    scaler = StandardScaler()
+    for inizio in range(0, len(X), blocco):
+        scaler.partial_fit(X.iloc[inizio:inizio + blocco])
+    X_scaled = scaler.transform(X)
+    pca = IncrementalPCA(n_components=n_componenti, batch_size=max(blocco, n_componenti))
+    X_pca = pca.fit_transform(X_scaled)
+    return scaler, pca, X_scaled, X_pca
+
+
+def modelli_cluster(X: pd.DataFrame, n_componenti: int = 3, cartella: str | None = CARTELLA_MODELLI,
+                    incrementale: bool = False, blocco: int = BLOCCO) -> ModelliCluster:
+    """
+    Modelli della matrice di feature X: dalla memoria, altrimenti dal disco, altrimenti stimati ora.
+    - cartella=None: nessun salvataggio su disco
+    - incrementale: StandardScaler.partial_fit e IncrementalPCA a blocchi di righe (per matrici grandi,
+      da usare con i modelli minibatch=True)
+    """
+    impronta = impronta_feature(X, n_componenti, SEME, incrementale, blocco if incrementale else None)
+    with _lock:
+        trovato = _modelli.get(impronta)
+    if trovato is not None:
+        return trovato
+
+    path = None if cartella is None else str(Path(cartella) / f"{impronta}.joblib")
+    if path is not None and os.path.exists(path):
+        trovato = joblib.load(path)
+        trovato.path = path
+    elif incrementale:
+        trovato = ModelliCluster(impronta, *_stima_a_blocchi(X, n_componenti, blocco), path, incrementale=True)
+        trovato.salva()
+    else:
+        scaler = StandardScaler()
+        X_scaled = scaler.fit_transform(X)
+        pca = PCA(n_components=n_componenti)
+        X_pca = pca.fit_transform(X_scaled)
+        trovato = ModelliCluster(impronta, scaler, pca, X_scaled, X_pca, path)
+        trovato.salva()
+    with _lock:
+        return _modelli.setdefault(impronta, trovato)
+
+
+# ===============================
+# 4. FEATURE DI TUTTE LE SQUADRE-STAGIONI
+# ===============================
+
+# stesse feature dei vincitori nella pagina Cluster
+FEATURE_CLUSTER = ["Punteggio", "GF", "GS", "GD", "Vittorie", "Pareggi", "Sconfitte", "HasTopScorer", "Average_age"]
+
+
+def feature_stagioni(rankings: pl.LazyFrame, average_age: pl.LazyFrame, top_scorer: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Una riga per squadra e stagione (Stagione, Squadra, Posizione, [Lega], feature, Anno).
+    - rankings con i nomi completi (squadre.py) unito a average_age su squadra, anno e, se entrambi
+      ce l'hanno, lega (dataset partizionati di tabelle.py)
+    - HasTopScorer: 1 se il capocannoniere della stagione gioca nella squadra
+    - Le righe senza età media (squadra con un nome non collegato) vengono escluse
+    """
+    chiavi = ["Squadra", "Anno"]
+    if "Lega" in rankings.collect_schema().names() and "Lega" in average_age.collect_schema().names():
+        chiavi.append("Lega")
+    capocannonieri = (
+        top_scorer
+        .select(nome_completo("Squadra", NOMI_CAPOCANNONIERI).alias("Squadra"), pl.col("Anno"))
+        .unique()
+        .with_columns(pl.lit(1, dtype=pl.Int64).alias("HasTopScorer"))
+    )
+    return (
+        rankings.with_columns(nome_completo().alias("Squadra"))
+        .join(average_age.select(*chiavi, "Average_age"), on=chiavi, how="inner")
+        .join(capocannonieri, on=["Squadra", "Anno"], how="left")
+        .with_columns(pl.col("HasTopScorer").fill_null(0))
+        .select(
+            "Stagione", "Squadra", "Posizione",
+            *(["Lega"] if "Lega" in chiavi else []),
+            *FEATURE_CLUSTER, "Anno",
+        )
+        .sort(chiavi[1:] + ["Posizione"])
+    )
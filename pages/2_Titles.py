@@ -1,17 +1,22 @@
 import altair as alt
 import polars as pl
-import pandas as pd
 import streamlit as st
 
+from dati import carica_dati, riepilogo_cache, versione_dati
+from grafici import grafico, grafico_in_cache, in_arrow, riepilogo_payload
+from sezioni import fine_pagina, inizio_pagina, sezione
+from titoli import IndiceTitoli, indice_titoli
+
+# Tempo del rerun completo, letto in fondo alla pagina (vedi sezioni.py)
+inizio_pagina()
+
 
 # ===============================
 # 1. FUNZIONE FACILITATRICI
 # ===============================
 
 
-# Funzione di caricamento dati
-def carica_dati(path: str):
-    return pl.read_csv(path, null_values=["", "NA ", " NA", "NA"])
+# Funzione di caricamento dati: condivisa tra le pagine e con cache, vedi dati.py
 
 
 # ====================================================
@@ -20,9 +25,12 @@ def carica_dati(path: str):
 
 
 # Caricamento dei dataset
-df_winners   = carica_dati("principale.csv")
-df_rankings  = carica_dati("rankings.csv")
-df_titles  = carica_dati("titles.csv")
+df_rankings  = carica_dati("rankings.parquet", colonne=["Squadra", "Posizione", "Anno"])
+df_titles  = carica_dati("titles.parquet")
+
+# Titoli cumulati squadra x stagione, costruiti una volta per versione di principale (vedi titoli.py):
+# alimentano sia il grafico a barre dei titoli cumulativi sia il grafico a torta per intervallo di anni
+indice = indice_titoli()
 
 # Codici associati ai colori sociali delle squadre
 colori_sociali = {
@@ -43,59 +51,61 @@ colori_sociali = {
 
 # 3.1 Grafico a barre: Titoli cumulativi
 
-hover_selection = alt.selection_single(
-    fields=["Vincitore"],  
-    on="mouseover",  
-    empty="all",  
-    clear="mouseout" ,
-    nearest=False
-)
-titles_bar = alt.Chart(
-    df_titles.to_pandas()
-).mark_bar(
-    stroke='black', strokeWidth=0.3 
-).encode(
-    x=alt.X(
-        'Anno:O', 
-        title=None,
-        axis=alt.Axis(labelAngle=-45)  
-    ),
-    y=alt.Y(
-        'Titoli:Q', 
-        title=None,
-        scale=alt.Scale(domain=[0, df_titles['Titoli'].max() + 1]) 
-    ), 
-   tooltip=['Vincitore', 'Stagione', 'Titoli'], 
-    color=alt.Color(
-        "Vincitore:N",
-        scale=alt.Scale(
-            domain=list(colori_sociali.keys()),  
-            range=list(colori_sociali.values()) 
-        )
-    ).legend(
-        title="Squadre",
-        symbolStrokeWidth=0.3,
-        symbolSize=100,
-        labelFontSize=12,
-        titleFontSize=14
-        ),
-    opacity=alt.condition(
-        hover_selection, 
-        alt.value(1), 
-        alt.value(0.3) 
+# Grafico ricostruito solo quando cambia principale (vedi grafico_in_cache in grafici.py)
+def crea_titles_bar() -> alt.Chart:
+    hover_selection = alt.selection_single(
+        fields=["Vincitore"],  
+        on="mouseover",  
+        empty="all",  
+        clear="mouseout" ,
+        nearest=False
     )
-).properties(
-    height=400,
-    width=800,
-    background='#f0f0f0', 
-    padding={"left": 20, "right": 20, "top": 20, "bottom": 20}  
-).configure_view(
-    strokeWidth=0  
-).configure_axis(
-    labelFontSize=14,  
-    titleFontSize=16,  
-    grid=False         
-).add_selection(hover_selection)
+    return alt.Chart(
+        in_arrow(indice.cumulativi())
+    ).mark_bar(
+        stroke='black', strokeWidth=0.3 
+    ).encode(
+        x=alt.X(
+            'Anno:O', 
+            title=None,
+            axis=alt.Axis(labelAngle=-45)  
+        ),
+        y=alt.Y(
+            'Titoli:Q', 
+            title=None,
+            scale=alt.Scale(domain=[0, indice.massimo() + 1]) 
+        ), 
+       tooltip=['Vincitore', 'Stagione', 'Titoli'], 
+        color=alt.Color(
+            "Vincitore:N",
+            scale=alt.Scale(
+                domain=list(colori_sociali.keys()),  
+                range=list(colori_sociali.values()) 
+            )
+        ).legend(
+            title="Squadre",
+            symbolStrokeWidth=0.3,
+            symbolSize=100,
+            labelFontSize=12,
+            titleFontSize=14
+            ),
+        opacity=alt.condition(
+            hover_selection, 
+            alt.value(1), 
+            alt.value(0.3) 
+        )
+    ).properties(
+        height=400,
+        width=800,
+        background='#f0f0f0', 
+        padding={"left": 20, "right": 20, "top": 20, "bottom": 20}  
+    ).configure_view(
+        strokeWidth=0  
+    ).configure_axis(
+        labelFontSize=14,  
+        titleFontSize=16,  
+        grid=False         
+    ).add_selection(hover_selection)
 
 
 st.subheader("Evoluzione Temporale dei Trofei")
@@ -103,7 +113,7 @@ st.caption(
     "Conteggio cumulativo dei trofei per ogni anno.  \n"
     "Avvicinarsi lentamente alla stagione di interesse. Sconsiglio di scorrere velocemente tra le barre (nearest=True fallava)."
 )
-st.altair_chart(titles_bar, use_container_width=True)
+grafico_in_cache(("titles_bar",), versione_dati("principale.parquet"), crea_titles_bar, use_container_width=True)
 
 st.divider()
 
@@ -111,83 +121,77 @@ st.divider()
 # ---------------------------
 # 3.2 Grafico a torta: Distribuzione dei titoli per intervallo di anni
 
-st.subheader("Distribuzione Titoli per Intervallo di Anni")
-st.caption("Passare il puntatore su uno spicchio per vederne la percentuale")
+# Sezione a sé: muovere lo slider riesegue solo questa funzione, non il resto della pagina (vedi sezioni.py)
+@sezione("Titles")
+def distribuzione_titoli(indice: IndiceTitoli) -> None:
+    st.subheader("Distribuzione Titoli per Intervallo di Anni")
+    st.caption("Passare il puntatore su uno spicchio per vederne la percentuale")
 
 
-# Imposto i limiti per lo slider in base alla colonna "Anno" di df_titles
-min_anno_val = int(df_titles["Anno"].min())
-max_anno_val = int(df_titles["Anno"].max())
+    # Imposto i limiti per lo slider in base alle stagioni dell'indice
+    min_anno_val = int(indice.anni[0])
+    max_anno_val = int(indice.anni[-1])
 
-min_anno, max_anno = st.slider(
-    "Seleziona l'intervallo di anni:",
-    min_value=min_anno_val,
-    max_value=max_anno_val,
-    value=(min_anno_val, max_anno_val),
-    step=1
-)
+    min_anno, max_anno = st.slider(
+        "Seleziona l'intervallo di anni:",
+        min_value=min_anno_val,
+        max_value=max_anno_val,
+        value=(min_anno_val, max_anno_val),
+        step=1
+    )
 
-# Filtraggio dei dati in base allo slider (utilizzo "Anno" in df_winners)
-df_filtrato = df_winners.filter(
-    (pl.col("Anno") >= min_anno) & (pl.col("Anno") <= max_anno)
-)
-df_pie = (
-    df_filtrato.group_by("Vincitore")
-    .agg(pl.count().alias("Totale_Titoli"))
-    .with_columns([
-        ((pl.col("Totale_Titoli") / pl.col("Totale_Titoli").sum()) * 100).alias("Percentuale"),
-        (((pl.col("Totale_Titoli") / pl.col("Totale_Titoli").sum()) * 100)
-         .round(1)
-         .cast(pl.Utf8) + "%").alias("Percentuale_str")
-    ])
-)
+    # Titoli di ogni squadra nell'intervallo: differenza di due righe delle somme prefisse, senza filtrare i vincitori
+    df_pie = indice.distribuzione(min_anno, max_anno)
 
-selection = alt.selection_single(fields=["Vincitore"], on="mouseover", empty="all")
+    selection = alt.selection_single(fields=["Vincitore"], on="mouseover", empty="all")
 
-pie_chart = alt.Chart(df_pie.to_pandas()).mark_arc(
-    innerRadius=70,
-    outerRadius=150,
-    stroke="black",
-    strokeWidth=0.5
-).encode(
-    theta=alt.Theta("Totale_Titoli:Q", title="Numero di Titoli"),
-    color=alt.Color(
-        "Vincitore:N", title="Squadra Vincente",
-        scale=alt.Scale(
-            domain=["Blackburn Rovers", "Chelsea FC", "FC Arsenal", "FC Liverpool",
-                    "Leicester City", "Manchester City", "Manchester United"],
-            range=["#FFFFFF", "#001F5C", "#ff4b4b", "#ec0a0a", "#005BAB", "#6CABDD", "#C50000"]
-        )
-    ),
-    opacity=alt.condition(selection, alt.value(1), alt.value(0.3)),
-    tooltip=[
-        alt.Tooltip("Vincitore:N", title="Squadra"),
-        alt.Tooltip("Totale_Titoli:Q", title="Titoli vinti", format=".0f"),
-        alt.Tooltip("Percentuale_str:N", title="Percentuale")
-    ]
-).add_selection(
-    selection
-).properties(
-    padding={"left": 20, "right": 20, "top": 20, "bottom": 20},
-    background='#f0f0f0',
-    width=600,
-    height=450
-).configure_view(
-    strokeWidth=0
-).configure_legend(
-    symbolStrokeWidth=0.3,
-    symbolSize=100,
-    labelFontSize=14,
-    titleFontSize=16
-).configure_title(
-    anchor="middle",
-    fontSize=16,
-    fontWeight="bold",
-    color="black"
-)
+    pie_chart = alt.Chart(in_arrow(df_pie)).mark_arc(
+        innerRadius=70,
+        outerRadius=150,
+        stroke="black",
+        strokeWidth=0.5
+    ).encode(
+        theta=alt.Theta("Totale_Titoli:Q", title="Numero di Titoli"),
+        color=alt.Color(
+            "Vincitore:N", title="Squadra Vincente",
+            scale=alt.Scale(
+                domain=["Blackburn Rovers", "Chelsea FC", "FC Arsenal", "FC Liverpool",
+                        "Leicester City", "Manchester City", "Manchester United"],
+                range=["#FFFFFF", "#001F5C", "#ff4b4b", "#ec0a0a", "#005BAB", "#6CABDD", "#C50000"]
+            )
+        ),
+        opacity=alt.condition(selection, alt.value(1), alt.value(0.3)),
+        tooltip=[
+            alt.Tooltip("Vincitore:N", title="Squadra"),
+            alt.Tooltip("Totale_Titoli:Q", title="Titoli vinti", format=".0f"),
+            alt.Tooltip("Percentuale_str:N", title="Percentuale")
+        ]
+    ).add_selection(
+        selection
+    ).properties(
+        padding={"left": 20, "right": 20, "top": 20, "bottom": 20},
+        background='#f0f0f0',
+        width=600,
+        height=450
+    ).configure_view(
+        strokeWidth=0
+    ).configure_legend(
+        symbolStrokeWidth=0.3,
+        symbolSize=100,
+        labelFontSize=14,
+        titleFontSize=16
+    ).configure_title(
+        anchor="middle",
+        fontSize=16,
+        fontWeight="bold",
+        color="black"
+    )
 
 
-st.altair_chart(pie_chart, use_container_width=True)
+    grafico(pie_chart, use_container_width=True)
+
+
+distribuzione_titoli(indice)
 
 
 st.markdown("I grafici rappresentano la distribuzione e l’evoluzione temporale dei titoli in Premier League.    \n " \
@@ -214,8 +218,8 @@ df_lines = (
         pl.col("Anno").alias("Anno")
     )
     .select(["Stagione", "Squadra", "Posizione", "Anno"])
-    .to_pandas()
 )
+df_lines_arrow = in_arrow(df_lines)
 
 # 2) Selector per l’hover
 hover = alt.selection_single(
@@ -225,12 +229,12 @@ hover = alt.selection_single(
 
 # 3) layer invisibile + lookup per recuperare in tooltip entrambe le posizioni
 rect_hover = (
-    alt.Chart(df_lines)
+    alt.Chart(df_lines_arrow)
       .transform_filter(alt.datum.Squadra == "Manchester Utd.")
       .transform_lookup(
          lookup="Stagione",
          from_=alt.LookupData(
-             data=df_lines[df_lines["Squadra"]=="Manchester City"],
+             data=in_arrow(df_lines.filter(pl.col("Squadra")=="Manchester City")),
              key="Stagione",
              fields=["Posizione"]
          ),
@@ -250,7 +254,7 @@ rect_hover = (
 
 # 4) barra verticale grigia all’hover
 hover_rule = (
-    alt.Chart(df_lines)
+    alt.Chart(df_lines_arrow)
       .mark_rule(color="gray", strokeWidth=1)
       .encode(
           x="Stagione:O",
@@ -261,7 +265,7 @@ hover_rule = (
 
 # 5) cerchi che evidenziano entrambe le squadre all’hover
 hover_circles = (
-    alt.Chart(df_lines)
+    alt.Chart(df_lines_arrow)
       .mark_circle(size=100)
       .encode(
           x="Stagione:O",
@@ -279,7 +283,7 @@ hover_circles = (
 )
 
 # 6) Base chart con x ordinal
-base = alt.Chart(df_lines).encode(
+base = alt.Chart(df_lines_arrow).encode(
     x=alt.X("Stagione:O", title=None, axis=alt.Axis(labelAngle=-45))
 )
 
@@ -287,19 +291,19 @@ base = alt.Chart(df_lines).encode(
 stg_ord = sorted(df_lines["Stagione"].unique())
 
 top4_band = (
-    alt.Chart(pd.DataFrame({"Stagione": stg_ord}))
+    alt.Chart(in_arrow(pl.DataFrame({"Stagione": stg_ord})))
     .mark_rect(color="silver", opacity=0.4)
     .encode(x="Stagione:O", y=alt.value(0), y2=alt.value(55))
 )
 euro_band = (
-    alt.Chart(pd.DataFrame({"Stagione": stg_ord}))
+    alt.Chart(in_arrow(pl.DataFrame({"Stagione": stg_ord})))
     .mark_rect(color="silver", opacity=0.2)
     .encode(x="Stagione:O", y=alt.value(55), y2=alt.value(99))
 )
-rule2008 = alt.Chart(pd.DataFrame({"Stagione": ["2008"]})) \
+rule2008 = alt.Chart(in_arrow(pl.DataFrame({"Stagione": ["2008"]}))) \
     .mark_rule(color="#90ee90", strokeDash=[4,4], strokeWidth=2) \
     .encode(x="Stagione:O")
-rule2012 = alt.Chart(pd.DataFrame({"Stagione": ["2012"]})) \
+rule2012 = alt.Chart(in_arrow(pl.DataFrame({"Stagione": ["2012"]}))) \
     .mark_rule(color="#FFD700", strokeDash=[4,4], strokeWidth=2) \
     .encode(x="Stagione:O")
 
@@ -327,11 +331,10 @@ city_post = base.transform_filter((alt.datum.Squadra=="Manchester City") & (alt.
 # 9) Etichette finali
 last_pos = (
     df_lines
-    .sort_values("Anno")
-    .groupby("Squadra")
-    .tail(1)
+    .sort("Anno")
+    .filter(pl.col("Anno") == pl.col("Anno").max().over("Squadra"))
 )
-final_labels = alt.Chart(last_pos).mark_text(
+final_labels = alt.Chart(in_arrow(last_pos)).mark_text(
     align="left", dx=5, dy=5, fontSize=12, fontWeight="bold"
 ).encode(
     x="Stagione:O",
@@ -375,7 +378,7 @@ chart = (
 
 st.subheader("Andamento posizioni: Rivalità di Manchester")
 st.caption("Verde: Abu Dhabi United Group acquista il Manchester city - Giallo: Ferguson non è più il coach del Manchester United")
-st.altair_chart(chart, use_container_width=True)
+grafico(chart, use_container_width=True)
 
 
 st.markdown("Dal 1992 fino al 2013 si può parlare a tutti gli effetti di **“Era Ferguson”**: in questo periodo il Manchester United" \
@@ -404,10 +407,16 @@ if st.session_state.mostra_dataset:
 
     # 1) df_titles
     st.markdown("**df_titles** (crafted): Tiene conto del numero totale di titoli vinti")
-    st.dataframe(df_titles, use_container_width=True)
+    st.dataframe(in_arrow(df_titles), use_container_width=True)
     st.text("")
   
     # Nascondi Dataset
     st.markdown("<br><br><br>*Per nascondere i dataset, premere due volte il pulsante.*", unsafe_allow_html=True)
     if st.button("Nascondi dataset"):
-        st.session_state.mostra_dataset = False
\ No newline at end of file
+        st.session_state.mostra_dataset = False
+
+
+# Contatori della cache dati (hit/miss), byte dei grafici inviati al browser e tempo del rerun nella sidebar
+st.sidebar.caption(riepilogo_cache())
+st.sidebar.caption(riepilogo_payload("Titles"))
+st.sidebar.caption(fine_pagina("Titles"))
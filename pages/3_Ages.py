@@ -3,25 +3,27 @@ import polars as pl
 import pandas as pd
 import streamlit as st
 
+from dati import carica_dati, riepilogo_cache, versione_dati
+from grafici import grafico, in_arrow, riepilogo_payload
+from sezioni import fine_pagina, inizio_pagina
+from stili import evidenzia_righe, stile_in_cache
+
+# Tempo del rerun completo, letto in fondo alla pagina (vedi sezioni.py)
+inizio_pagina()
+
 
 # ===============================
 # 1. FUNZIONE FACILITATRICI
 # ===============================
 
 
-# Funzione di caricamento dati
-def carica_dati(path: str):
-    return pl.read_csv(path, null_values=["", "NA ", " NA", "NA"])
+# Funzione di caricamento dati: condivisa tra le pagine e con cache, vedi dati.py
 
 
 # Evidenziare una riga di dataset
-def evidenzia_squadra(squadra: str, colore_hex: str): # Usa i codici HEX
-    def highlight(row):
-        if row["Squadra"] == squadra:
-            return [f'background-color: {colore_hex}55'] * len(row)  # '55' è ~30% opacità
-        else:
-            return [''] * len(row)
-    return highlight
+def evidenzia_squadra(df: pd.DataFrame, squadra: str, colore_hex: str): # Usa i codici HEX
+    # tabella e CSS di tutte le celle in un passaggio: le righe della squadra con il colore al ~30% di opacità
+    return df, evidenzia_righe(df, "Squadra", squadra, colore_hex)
 
 
 
@@ -31,9 +33,9 @@ def evidenzia_squadra(squadra: str, colore_hex: str): # Usa i codici HEX
 
 
 # Caricamento dei dataset
-df_winners   = carica_dati("principale.csv")
-df_age   = carica_dati("average_age.csv")
-df_topscorer = carica_dati("top_scorer.csv")
+df_winners   = carica_dati("principale.parquet")
+df_age   = carica_dati("average_age.parquet")
+df_topscorer = carica_dati("top_scorer.parquet")
 
 # --------------------
 # 2.1 età lega
@@ -66,8 +68,8 @@ df_353 = df_353.join(
     how="left"
 ).sort("Anno")
 
-# Converto in pandas per Altair
-df_353_pd = df_353.to_pandas()
+# Tabella Arrow per Altair (senza passare da pandas, vedi grafici.py)
+df_353_arrow = in_arrow(df_353)
 
 # --------------------
 # 2.2 chelsea
@@ -88,7 +90,7 @@ df_chelsea = (
     # .join(chelsea_points, on="Anno", how="inner")
     .sort("Anno")
 )
-df_chelsea_pd = df_chelsea.to_pandas()
+df_chelsea_arrow = in_arrow(df_chelsea)
 
 
 
@@ -109,7 +111,7 @@ selector_353 = alt.selection_single(
 )
 
 # 2) Banda più ampia: dalla 3ª più giovane (lower3) alla 3ª più vecchia (upper3)
-area_banda_ampia = alt.Chart(df_353_pd).mark_area(
+area_banda_ampia = alt.Chart(df_353_arrow).mark_area(
     color="#90ee90",  # verde chiaro
     opacity=0.3
 ).encode(
@@ -120,7 +122,7 @@ area_banda_ampia = alt.Chart(df_353_pd).mark_area(
 )
 
 # 3) Banda più stretta: dalla 5ª più giovane (lower5) alla 5ª più vecchia (upper5)
-area_banda_stretta = alt.Chart(df_353_pd).mark_area(
+area_banda_stretta = alt.Chart(df_353_arrow).mark_area(
     color="#32cd32",  # verde lime
     opacity=0.4
 ).encode(
@@ -131,14 +133,14 @@ area_banda_stretta = alt.Chart(df_353_pd).mark_area(
 )
 
 # 4) Linea media Lega
-line_league0 = alt.Chart(df_353_pd).mark_line(
+line_league0 = alt.Chart(df_353_arrow).mark_line(
     color="#228B22"
 ).encode(
     x="Anno:Q",
     y="league_mean:Q"
 )
 
-point_league = alt.Chart(df_353_pd).mark_circle(
+point_league = alt.Chart(df_353_arrow).mark_circle(
     color="#228B22", size=50  
 ).encode(
     x="Anno:Q",
@@ -148,14 +150,14 @@ point_league = alt.Chart(df_353_pd).mark_circle(
 line_league = line_league0 + point_league
 
 # 5) Linea squadra vincitrice
-line_winner0 = alt.Chart(df_353_pd).mark_line(
+line_winner0 = alt.Chart(df_353_arrow).mark_line(
     color="crimson"
 ).encode(
     x="Anno:Q",
     y="Average_age:Q"
 )
 
-point_winner = alt.Chart(df_353_pd).mark_circle(
+point_winner = alt.Chart(df_353_arrow).mark_circle(
     color="crimson", size=50  
 ).encode(
     x="Anno:Q",
@@ -165,7 +167,7 @@ point_winner = alt.Chart(df_353_pd).mark_circle(
 line_winner = line_winner0 + point_winner
 
 # 6) Rettangolo invisibile per il tooltip
-rect_hover_353 = alt.Chart(df_353_pd).mark_rect(opacity=0).encode(
+rect_hover_353 = alt.Chart(df_353_arrow).mark_rect(opacity=0).encode(
     x="Anno:Q",
     x2=alt.X2("Anno_end"),
     y=alt.value(22),
@@ -179,7 +181,7 @@ rect_hover_353 = alt.Chart(df_353_pd).mark_rect(opacity=0).encode(
 ).add_selection(selector_353)
 
 # 7) Barra verticale
-vertical_line_353 = alt.Chart(df_353_pd).mark_rule(
+vertical_line_353 = alt.Chart(df_353_arrow).mark_rule(
     color="black",
     strokeDash=[4, 4],
     strokeWidth=1
@@ -215,7 +217,7 @@ st.caption(
     "Le bande indicano le età comprese tra la 3ª e la 5ª squadra più giovane e la 3ª e la 5ª meno giovane della stagione:  \n"
     "banda chiara tra le terze, banda scura tra le quinte. Linea Rossa = vincitore, Linea Verde = media della lega."
 )
-st.altair_chart(final_chart_353, use_container_width=True)
+grafico(final_chart_353, use_container_width=True)
 st.markdown("Il confronto diretto tra le età medie delle squadre vincitrici e quelle della lega non sembra rivelare una regolarità chiara nel tempo."\
 " Alcune squadre hanno conquistato il titolo con rose mediamente molto giovani, altre con organici più esperti.     \n" \
 " Un dato particolarmente interessante riguarda il Chelsea FC, che detiene il primato sia per aver vinto con la squadra più giovane"
@@ -233,7 +235,7 @@ st.divider()
 df_differenza = df_winners.with_columns(
     (pl.col("Average_age") - pl.col("League_average_age")).alias("Differenza")
 )
-df_differenza_pd = df_differenza.to_pandas()
+df_differenza_arrow = in_arrow(df_differenza)
 
 # Selettore
 selector_diff = alt.selection_single(
@@ -245,7 +247,7 @@ selector_diff = alt.selection_single(
 )
 
 # Base chart (x come Ordinal)
-base = alt.Chart(df_differenza_pd).encode(
+base = alt.Chart(df_differenza_arrow).encode(
     x=alt.X("Anno:O", title=None, axis=alt.Axis(labelAngle=0))
 )
 
@@ -253,19 +255,19 @@ base = alt.Chart(df_differenza_pd).encode(
 diff_line = base.mark_line(point=alt.OverlayMarkDef(filled=True, fill="blue"), color="green").encode(
     y=alt.Y("Differenza:Q", title=None,
         scale=alt.Scale(domain=[
-            df_differenza_pd["Differenza"].min(),
-            df_differenza_pd["Differenza"].max() + 0.5 
+            df_differenza["Differenza"].min(),
+            df_differenza["Differenza"].max() + 0.5 
         ])
     )
 )
 
 # Linea rossa sullo 0
-zero_line = alt.Chart(pd.DataFrame({'y': [0]})).mark_rule(
+zero_line = alt.Chart(in_arrow(pl.DataFrame({'y': [0]}))).mark_rule(
     color='red', strokeWidth=2
 ).encode(y='y:Q')
 
 # Rettangolo invisibile per il selettore
-rect_hover = alt.Chart(df_differenza_pd).mark_rect(opacity=0).encode(
+rect_hover = alt.Chart(df_differenza_arrow).mark_rect(opacity=0).encode(
     x=alt.X("Anno:O"),
     tooltip=[
         alt.Tooltip("Anno:O", title=None),
@@ -275,7 +277,7 @@ rect_hover = alt.Chart(df_differenza_pd).mark_rect(opacity=0).encode(
 ).add_selection(selector_diff)
 
 # Barra verticale che segue il selettore
-vertical_rule = alt.Chart(df_differenza_pd).mark_rule(
+vertical_rule = alt.Chart(df_differenza_arrow).mark_rule(
     color="black", strokeDash=[4, 4], strokeWidth=1
 ).encode(
     x=alt.X("Anno:O"),
@@ -304,7 +306,7 @@ final_diff = (
 
 st.subheader("Differenza Età Media: Vincitore vs Lega")
 st.caption("La linea evidenzia quanto la squadra vincente si discosti in termini anagrafici dalla media complessiva del campionato.")
-st.altair_chart(final_diff, use_container_width=True)
+grafico(final_diff, use_container_width=True)
 st.markdown("La differenza tra l’età media del vincitore " \
 "e quella della lega oscilla leggermente attorno allo zero, **senza evidenziare una tendenza costante**." \
 " Le stagioni con scostamenti più marcati sono isolate e sembrano più legate a contesti specifici che a un trend strutturale.")
@@ -325,7 +327,7 @@ selector_che = alt.selection_single(
 )
 
 # Base chart con asse X ordinato per stagione ---
-base = alt.Chart(df_chelsea_pd).encode(
+base = alt.Chart(df_chelsea_arrow).encode(
     x=alt.X("Anno:O",
             axis=alt.Axis(labelAngle=0, labelFontSize=12),
             title=None),
@@ -349,8 +351,7 @@ chelsea_line = base.mark_line(color="#001F5C", strokeWidth=2.5).encode(
 champ_years = [2004, 2005, 2009, 2014, 2016]
 win_points = (
     alt.Chart(
-        pd.DataFrame({"Anno": champ_years, 
-                      "Chelsea_avg": df_chelsea_pd.set_index("Anno").loc[champ_years, "Chelsea_avg"].values})
+        in_arrow(df_chelsea.filter(pl.col("Anno").is_in(champ_years)).select(["Anno", "Chelsea_avg"]))
     )
     .mark_point(shape="circle", size=100, filled=False, color="red", strokeWidth=2)
     .encode(
@@ -373,7 +374,7 @@ rolling_line = (
 
 # Rettangolo invisibile per il tooltip (su tutta l'altezza del grafico)
 rect_hover_che = (
-    alt.Chart(df_chelsea_pd)
+    alt.Chart(df_chelsea_arrow)
       .mark_rect(opacity=0)
       .encode(
           x=alt.X("Anno:O"),
@@ -388,7 +389,7 @@ rect_hover_che = (
 
 # Barra verticale che appare al passaggio sullo stesso 'Anno'
 vertical_line_che = (
-    alt.Chart(df_chelsea_pd)
+    alt.Chart(df_chelsea_arrow)
       .mark_rule(color="black", strokeDash=[4,4], strokeWidth=1)
       .encode(
           x=alt.X("Anno:O"),
@@ -424,7 +425,7 @@ st.caption(
     "La linea rossa liscia l'andamento dell'età media, i tondi rossi rappresentano gli anni in cui il Chelsea ha vinto il titolo.  \n" \
 "Per la Rolling Mean sono state prese in considerazione 5 stagioni"
 )
-st.altair_chart(combined, use_container_width=True)
+grafico(combined, use_container_width=True)
 
 st.markdown(
     "A partire dal 2003 si osserva un netto calo dell’età media del Chelsea, che può essere interpretato come l’avvio di un **nuovo ciclo**," \
@@ -445,11 +446,16 @@ st.divider()
 
 st.caption("Capocannonieri tra il 2002 e il 2010")
 st.dataframe(
-    df_topscorer
-        .slice(10, 9)  
-        .select(pl.all().exclude("Anno")) 
-        .to_pandas()
-        .style.apply(evidenzia_squadra("Chelsea FC", "#001F5C"), axis=1),
+    stile_in_cache(
+        ("top_scorer", "Chelsea FC"), versione_dati("top_scorer.parquet"),
+        lambda: evidenzia_squadra(
+            df_topscorer
+                .slice(10, 9)
+                .select(pl.all().exclude("Anno"))
+                .to_pandas(),
+            "Chelsea FC", "#001F5C"
+        ),
+    ),
     hide_index=True
 )
 st.markdown("Vediamo che il Chelsea è stata anche la squadra del capocannoniere della lega per **3 volte** (anche se non con numeri stratosferici) in questo periodo.")
@@ -470,16 +476,22 @@ if st.session_state.mostra_dataset:
 
     # 1) df_age
     st.markdown("**df_age** (scraped): Età media per squadra e stagione (fonte [Transfermarkt](https://www.transfermarkt.it/premier-league/altersschnitt/wettbewerb/GB1))")
-    st.dataframe(df_age.head(100), use_container_width=True)
+    st.dataframe(in_arrow(df_age.head(100)), use_container_width=True)
 
     st.divider()
 
     # 2) df_topscorer
     st.markdown("**df_topscorer** (copied): Migliori marcatori per ogni stagione (Top Scorer)")
-    st.dataframe(df_topscorer, use_container_width=True)
+    st.dataframe(in_arrow(df_topscorer), use_container_width=True)
     st.markdown("**Multipli**: 1 se in quella stagione più giocatori sono stati capocannonieri a pari merito, 0 altrimenti",unsafe_allow_html=True)
 
     # Nascondi Dataset
     st.markdown("<br><br><br>*Per nascondere i dataset, premere due volte il pulsante.*", unsafe_allow_html=True)
     if st.button("Nascondi dataset"):
-        st.session_state.mostra_dataset = False
\ No newline at end of file
+        st.session_state.mostra_dataset = False
+
+
+# Contatori della cache dati (hit/miss), byte dei grafici inviati al browser e tempo del rerun nella sidebar
+st.sidebar.caption(riepilogo_cache())
+st.sidebar.caption(riepilogo_payload("Ages"))
+st.sidebar.caption(fine_pagina("Ages"))
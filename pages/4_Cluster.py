@@ -2,10 +2,14 @@ import altair as alt
 import polars as pl
 import pandas as pd
 import streamlit as st
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from sklearn.decomposition import PCA
-from sklearn.metrics import silhouette_score
+
+from dati import carica_dati, riepilogo_cache, versione_dati
+from grafici import grafico, grafico_in_cache, in_arrow, riepilogo_payload
+from modelli import FEATURE_CLUSTER, feature_stagioni, modelli_cluster
+from sezioni import fine_pagina, inizio_pagina, sezione
+
+# Tempo del rerun completo, letto in fondo alla pagina (vedi sezioni.py)
+inizio_pagina()
 
 
 
@@ -14,9 +18,7 @@ from sklearn.metrics import silhouette_score
 # ===============================
 
 
-# Funzione di caricamento dati
-def carica_dati(path: str):
-    return pl.read_csv(path, null_values=["", "NA ", " NA", "NA"])
+# Funzione di caricamento dati: condivisa tra le pagine e con cache, vedi dati.py
 
 
 # ===============================
@@ -25,9 +27,9 @@ def carica_dati(path: str):
 
 
 # Caricamento dei dataset
-df_winners   = carica_dati("principale.csv")
-df_titles    = carica_dati("titles.csv")
-df_topscorer = carica_dati("top_scorer.csv")
+df_winners   = carica_dati("principale.parquet")
+df_titles    = carica_dati("titles.parquet")
+df_topscorer = carica_dati("top_scorer.parquet", colonne=["Squadra", "Anno"])
 
 # Mappa che associa a ogni cluster un colore esatto
 color_map = {
@@ -62,8 +64,8 @@ df_cluster = (
 # Features ordinate
 features = ["Punteggio", "GF", "GS", "GD", "Vittorie", "Pareggi", "Sconfitte", "HasTopScorer", "Average_age"]
 
-# Conversione in pandas
-df_cluster_pd = df_cluster.to_pandas().set_index(["Stagione", "Vincitore"])
+# Matrice delle feature in pandas solo per sklearn (vedi modelli.py), il resto della pagina resta in Polars
+X_features = df_cluster.select(features).to_pandas()
 
 
 # ------------------------------
@@ -79,24 +81,39 @@ k_clusters = st.sidebar.slider(         # metto lo slider nella sidebar
     help="Seleziona quanti cluster usare per raggruppare le stagioni"
 )
 
-# Standardizzazione delle variabili
-scaler = StandardScaler()
-X_scaled = scaler.fit_transform(df_cluster_pd[features])
-
-# PCA con 3 componenti
-pca = PCA(n_components=3)
-X_pca = pca.fit_transform(X_scaled)
-
-# KMeans con k che varia in base allo slider
-kmeans = KMeans(n_clusters=k_clusters, random_state=42)
-df_cluster_pd["Cluster"] = kmeans.fit_predict(X_scaled)
-df_cluster_pd[["PC1", "PC2", "PC3"]] = X_pca
+# Metodo di clustering: KMeans oppure gerarchico (Ward), dove ogni k è un taglio dello stesso dendrogramma
+metodo_cluster = st.sidebar.radio(
+    "Metodo di clustering",
+    ["KMeans", "Gerarchico (Ward)"],
+    help="Con il metodo gerarchico il linkage si calcola una volta sola: cambiare k taglia solo il dendrogramma"
+)
 
-# Reset index per visualizzazione
-df_cluster_pd.reset_index(inplace=True)
-df_cluster_pd["Cluster_label"] = df_cluster_pd["Cluster"].map(
-    lambda c: f"{c}"
+# Standardizzazione, PCA con 3 componenti e KMeans per ogni k: stimati una volta per versione dei dati
+# e salvati su disco (vedi modelli.py), quindi muovere lo slider legge solo il modello già pronto
+modelli = modelli_cluster(X_features)
+X_scaled = modelli.X_scaled
+pca = modelli.pca
+X_pca = modelli.X_pca
+
+# KMeans (o taglio del dendrogramma) con k che varia in base allo slider
+if metodo_cluster == "KMeans":
+    etichette_cluster = modelli.etichette(k_clusters)
+else:
+    etichette_cluster = modelli.etichette_gerarchiche(k_clusters)
+
+# Cluster e componenti principali accanto alle feature, più l'etichetta testuale per la legenda
+df_cluster_k = df_cluster.with_columns(
+    pl.Series("Cluster", etichette_cluster),
+    pl.Series("PC1", X_pca[:, 0]),
+    pl.Series("PC2", X_pca[:, 1]),
+    pl.Series("PC3", X_pca[:, 2]),
+).with_columns(
+    pl.col("Cluster").cast(pl.Utf8).alias("Cluster_label")
 )
+df_cluster_arrow = in_arrow(df_cluster_k)
+
+# Versione dei grafici dei vincitori: dataset di partenza + impronta della matrice di feature (vedi grafici.py)
+versione_grafici = f"{versione_dati('principale.parquet')}-{versione_dati('top_scorer.parquet')}-{modelli.impronta}"
 
 
 # ------------------------------
@@ -104,28 +121,26 @@ df_cluster_pd["Cluster_label"] = df_cluster_pd["Cluster"].map(
 
 # Calcolo delle medie delle variabili per cluster (valori raw)
 medie_raw = (
-    df_cluster_pd.groupby("Cluster")[features]
-    .mean()
-    .round(2)
-    .reset_index()
-    .melt(id_vars="Cluster", var_name="Variabile", value_name="Valore")
+    df_cluster_k.group_by("Cluster")
+    .agg(pl.col(features).mean().round(2))
+    .sort("Cluster")
+    .unpivot(index="Cluster", variable_name="Variabile", value_name="Valore")
 )
 
 # Calcolo delle medie standardizzate (Z-score)
 medie_z = (
-    pd.DataFrame(X_scaled, columns=features,
-                 index=df_cluster_pd.set_index(["Stagione","Vincitore"]).index)
-    .assign(Cluster=df_cluster_pd['Cluster'].values)
-    .groupby('Cluster')[features]
-    .mean()
-    .reset_index()
-    .melt(id_vars='Cluster', var_name='Variabile', value_name='Z-score')
+    pl.DataFrame(X_scaled, schema=features)
+    .with_columns(pl.Series("Cluster", etichette_cluster))
+    .group_by("Cluster")
+    .agg(pl.col(features).mean())
+    .sort("Cluster")
+    .unpivot(index="Cluster", variable_name="Variabile", value_name="Z-score")
 )
 
 # Unisco le due tabelle
 df_medie_scaled = (
     medie_raw
-    .merge(medie_z, on=['Cluster','Variabile'], how='inner')
+    .join(medie_z, on=["Cluster", "Variabile"], how="inner")
 )
 
 
@@ -141,31 +156,32 @@ df_medie_scaled = (
 # ------------------------------
 # 3.1 PCA 2D con dimensione proporzionale a PC3
 
-chart_3d_flat = (
-    alt.Chart(df_cluster_pd)
-    .mark_circle() 
-    .encode(
-        x=alt.X("PC1", title="Dominanza (PC1)"),
-        y=alt.Y("PC2", title="Età Media / Stile (PC2)"),
-        size=alt.Size(
-            "PC3", title=["(PC3)","Non Vittorie"], scale=alt.Scale(range=[100, 1000])  
-        ),
-        color=alt.Color("Cluster_label:N", title="Cluster"),
-        shape=alt.Shape("Cluster_label:N"),
-        tooltip=[
-            "Stagione", "Vincitore", "PC3", "Punteggio",
-            "GF", "Vittorie", "Sconfitte", "Average_age", "HasTopScorer"
-        ]
-    )
-    .properties(
-        width=800, height=500, background="#f0f0f0",
-        title={
-            "text": f"PCA (k = {k_clusters}): Dimensione proporzionale a PC3",
-            "anchor": "middle", "fontSize": 20, "dx": 10, "dy": 10
-        },
-        padding={"left": 20, "right": 20, "top": 20, "bottom": 20}
+def crea_chart_3d_flat() -> alt.Chart:
+    return (
+        alt.Chart(df_cluster_arrow)
+        .mark_circle() 
+        .encode(
+            x=alt.X("PC1", title="Dominanza (PC1)"),
+            y=alt.Y("PC2", title="Età Media / Stile (PC2)"),
+            size=alt.Size(
+                "PC3", title=["(PC3)","Non Vittorie"], scale=alt.Scale(range=[100, 1000])  
+            ),
+            color=alt.Color("Cluster_label:N", title="Cluster"),
+            shape=alt.Shape("Cluster_label:N"),
+            tooltip=[
+                "Stagione", "Vincitore", "PC3", "Punteggio",
+                "GF", "Vittorie", "Sconfitte", "Average_age", "HasTopScorer"
+            ]
+        )
+        .properties(
+            width=800, height=500, background="#f0f0f0",
+            title={
+                "text": f"PCA (k = {k_clusters}, {metodo_cluster}): Dimensione proporzionale a PC3",
+                "anchor": "middle", "fontSize": 20, "dx": 10, "dy": 10
+            },
+            padding={"left": 20, "right": 20, "top": 20, "bottom": 20}
+        )
     )
-)
 
 st.subheader("Cluster Analysis: Performance del Vincitore")
 st.caption(
@@ -173,7 +189,7 @@ st.caption(
     f"raggruppate in k = {k_clusters} cluster (k arbitrario).  \n" \
     "A dimensioni ridotte dei cerchi corrisponde un livello più basso in Sconfitte e più alto in Pareggi"
 )
-st.altair_chart(chart_3d_flat, use_container_width=True)
+grafico_in_cache(("pca", k_clusters, metodo_cluster), versione_grafici, crea_chart_3d_flat, use_container_width=True)
 st.markdown("Questo grafico mostra i vincitori di ogni stagione proiettati sulle prime due componenti principali, con il terzo asse rappresentato" \
     " dalla dimensione dei cerchi, proporzionale al numero di pareggi (valori positivi) o sconfitte (valori negativi).  \n" \
     "Con k = 3* cluster: Il **Cluster 0 (blu)** caratterizza stagioni con dominanza intermedia, pochissime sconfitte e/o elevato numero di pareggi (PC3 molto basso);" \
@@ -182,6 +198,9 @@ st.markdown("Questo grafico mostra i vincitori di ogni stagione proiettati sulle
     "In sintesi, il grafico distingue chiaramente epoche di supremazia netta, cicli più equilibrati e stagioni in cui il campionato è stato deciso da pochi punti.  \n\n" \
     "**Vedere Elbow Method e Silhouette Score per capire perchè la scelta di k = 3 cluster sia la più idonea.*" \
     )
+if metodo_cluster != "KMeans":
+    st.caption("Le descrizioni dei cluster in questa pagina si riferiscono a KMeans: con il metodo gerarchico i gruppi" \
+        " e la loro numerazione possono essere diversi (vedere il dendrogramma).")
 
 st.divider()
 
@@ -200,85 +219,73 @@ if show_validation:
 
     st.markdown("*Ecco perchè tutte le analisi sono state fatte su k=3 cluster...*")
 
+    # Inerzia e Silhouette per k = 1..10 in un solo passaggio (in parallelo se le righe sono molte, vedi modelli.py)
+    # stessi modelli del grafico principale: per il k dello slider nessun fit in più
+    validazione = modelli.valida(list(range(1, 11)))
+
     # --------------
     # Elbow Method
-    inertie = []
-    k_range = list(range(1, 11))
-    for k in k_range:
-        km = KMeans(n_clusters=k, random_state=42)
-        km.fit(X_scaled)
-        inertie.append(round(km.inertia_,3))
-
-    elbow_df = pd.DataFrame({
-        "k": k_range,
-        "Inerzia": inertie
-    })
+    elbow_df = validazione.select("k", pl.col("Inerzia").round(3))
 
     # Salvo il valore di SSE per k selezionato
-    sse_k = elbow_df.loc[elbow_df["k"] == k_clusters, "Inerzia"].iloc[0]
-
-    elbow_chart = (
-        alt.Chart(elbow_df)
-        .mark_line(point=True)
-        .encode(
-            x=alt.X("k:O", title="Numero di cluster (k)", axis=alt.Axis(labelAngle=0, labelFontSize=12)),
-            y=alt.Y("Inerzia:Q", title="Sum of Squared Errors"),
-            tooltip=["k", "Inerzia"]
-        )
-        .properties(
-            width=600, height=350, background="#f0f0f0",
-            padding={"left":20,"right":20,"top":20,"bottom":20}
+    sse_k = elbow_df.filter(pl.col("k") == k_clusters)["Inerzia"].item()
+
+    def crea_elbow() -> alt.Chart:
+        return (
+            alt.Chart(in_arrow(elbow_df))
+            .mark_line(point=True)
+            .encode(
+                x=alt.X("k:O", title="Numero di cluster (k)", axis=alt.Axis(labelAngle=0, labelFontSize=12)),
+                y=alt.Y("Inerzia:Q", title="Sum of Squared Errors"),
+                tooltip=["k", "Inerzia"]
+            )
+            .properties(
+                width=600, height=350, background="#f0f0f0",
+                padding={"left":20,"right":20,"top":20,"bottom":20}
+            )
         )
-    )
 
     st.subheader("Elbow Method")
     st.caption(
         "Somma dei quadrati delle distanze interne ai cluster (SSE) in base a k (Num. di Cluster).  \n"
         "Si sceglie il k in corrispondenza del punto in cui la curva inizia ad “appiattirsi”."
     )
-    st.altair_chart(elbow_chart, use_container_width=False)
+    grafico_in_cache(("elbow",), versione_grafici, crea_elbow, use_container_width=False)
     st.markdown(f"SSE per k = {k_clusters}: **{sse_k}**")
     st.text("La curva inizia a scendere con meno rapidità dal 3º o 4º cluster.")
 
     # --------------
     # Silhouette Score
-    silhouette_scores = []
-    k_range_sil = list(range(2, 11))
-
-    for k in k_range_sil:
-        km_temp = KMeans(n_clusters=k, random_state=42)
-        labels_temp = km_temp.fit_predict(X_scaled)
-        score = silhouette_score(X_scaled, labels_temp)
-        silhouette_scores.append(round(score, 3))
-
-    silhouette_df = pd.DataFrame({
-        "k": k_range_sil,
-        "Silhouette Score": silhouette_scores
-    })
-
-     # Score del numero di cluster selezionato
-    score_k = silhouette_scores[k_range_sil.index(k_clusters)]
-
-    silhouette_chart = (
-        alt.Chart(silhouette_df)
-        .mark_line(point=True)
-        .encode(
-            x=alt.X("k:O", title="Numero di cluster (k)", axis=alt.Axis(labelAngle=0, labelFontSize=12)),
-            y=alt.Y("Silhouette Score:Q", title="Silhouette Score"),
-            tooltip=["k", "Silhouette Score"]
-        )
-        .properties(
-            width=600, height=350, background="#f0f0f0",
-            padding={"left":20,"right":20,"top":20,"bottom":20}
-        )
+    silhouette_df = (
+        validazione
+        .filter(pl.col("k") >= 2)
+        .select("k", pl.col("Silhouette").round(3).alias("Silhouette Score"))
     )
 
+    # Score del numero di cluster selezionato
+    score_k = silhouette_df.filter(pl.col("k") == k_clusters)["Silhouette Score"].item()
+
+    def crea_silhouette() -> alt.Chart:
+        return (
+            alt.Chart(in_arrow(silhouette_df))
+            .mark_line(point=True)
+            .encode(
+                x=alt.X("k:O", title="Numero di cluster (k)", axis=alt.Axis(labelAngle=0, labelFontSize=12)),
+                y=alt.Y("Silhouette Score:Q", title="Silhouette Score"),
+                tooltip=["k", "Silhouette Score"]
+            )
+            .properties(
+                width=600, height=350, background="#f0f0f0",
+                padding={"left":20,"right":20,"top":20,"bottom":20}
+            )
+        )
+
     st.subheader("Silhouette Method")
     st.caption(
         "Silhouette Score misura quanto ciascun punto sia simile al proprio cluster rispetto a quelli vicini.\n"
         "Valori più alti indicano cluster ben separati e coerenti."
     )
-    st.altair_chart(silhouette_chart, use_container_width=False)
+    grafico_in_cache(("silhouette",), versione_grafici, crea_silhouette, use_container_width=False)
     st.markdown(f"Silhouette Score per k = {k_clusters}: **{score_k}**")
     st.text("Vedo un grande tonfo nel valore ottenuto con 3 o con 4 cluster.")
 
@@ -289,11 +296,59 @@ if show_validation:
     st.divider()
 
 
+# ------------------------------
+# 3.3 Dendrogramma (solo con il metodo gerarchico)
+
+if metodo_cluster != "KMeans":
+
+    # Segmenti e foglie dal linkage già calcolato: cambiare k ricolora solo i rami sotto il taglio
+    segmenti, foglie, altezza_taglio = modelli.dendrogramma(
+        k_clusters, df_cluster.select(pl.concat_str(["Stagione", "Vincitore"], separator=" ")).to_series().to_list()
+    )
+
+    rami = (
+        alt.Chart(in_arrow(segmenti))
+        .mark_rule(strokeWidth=2)
+        .encode(
+            x=alt.X("x:Q", axis=None),
+            x2="x2:Q",
+            y=alt.Y("y:Q", title="Distanza (Ward)"),
+            y2="y2:Q",
+            color=alt.condition("datum.Cluster !== null", alt.Color("Cluster:N", title="Cluster"), alt.value("#888888"))
+        )
+    )
+    linea_taglio = (
+        alt.Chart(in_arrow(pl.DataFrame({"y": [altezza_taglio]})))
+        .mark_rule(strokeDash=[6, 4], color="black")
+        .encode(y="y:Q")
+    )
+    etichette_foglie = (
+        alt.Chart(in_arrow(foglie))
+        .mark_text(angle=270, align="right", baseline="middle", fontSize=10, dx=-5)
+        .encode(x="x:Q", y=alt.value(400), text="Foglia:N", tooltip=["Foglia", "Cluster"])
+    )
+
+    st.subheader("Dendrogramma")
+    st.caption(
+        "Unioni successive delle stagioni vincenti con il metodo di Ward; la linea tratteggiata è il taglio"
+        f" che produce k = {k_clusters} cluster, i rami sopra il taglio sono grigi."
+    )
+    grafico(
+        alt.layer(rami, linea_taglio, etichette_foglie).properties(
+            width=800, height=400, background="#f0f0f0",
+            padding={"left": 20, "right": 20, "top": 20, "bottom": 20}
+        ),
+        use_container_width=True
+    )
+
+    st.divider()
+
+
 # ------------------------------
 # 3.4 GRAFICO BAR: Media per Cluster con tutte le variabili significative
 
 medie_chart = (
-    alt.Chart(df_medie_scaled)
+    alt.Chart(in_arrow(df_medie_scaled))
     .mark_bar()
     .encode(
         x=alt.X("Variabile:N", title=None),
@@ -309,7 +364,7 @@ medie_chart = (
 
 st.subheader(f"Statistiche Medie per Cluster (k = {k_clusters})")
 st.caption("Grafico a barre che mostra le medie assolute delle principali variabili per ciascun cluster di vincitori (k = 3).")
-st.altair_chart(medie_chart, use_container_width=False)
+grafico(medie_chart, use_container_width=False)
 st.markdown("In questo grafico è semplice individuare le variabili che caratterizzano ogni cluster, di fatti si possono confrontare le medie delle variabili" \
     " e da qui intuire facilmente un Vincitrice con dati valori dove probabilmente verrà raggruppato.   \n" \
     "Il **Cluster 0** è caratterizzato da punteggi elevati ma ottenuti attraverso molti pareggi e poche reti segnate," \
@@ -331,79 +386,85 @@ st.caption("Analisi delle statistiche standardizzate (z-score) dei vincitori di
 "Ogni freccia rappresenta di quante deviazioni standard il valore del cluster si sposta rispetto alla media su una variabile: " \
 "valori positivi indicano performance superiori alla media, valori negativi inferiori.")
 
-# Widget per selezionare quale singolo cluster plottare
-cluster_sel = st.selectbox(
-    "Seleziona il cluster da visualizzare",
-    options=sorted(df_medie_scaled["Cluster"].unique()),
-    index=0,
-    format_func=lambda x: f"Cluster {x}"
-)
+# Sezione a sé: cambiare cluster riesegue solo questa funzione, non KMeans e gli altri grafici (vedi sezioni.py)
+@sezione("Cluster")
+def frecce_cluster(df_medie_scaled: pl.DataFrame, features: list[str], color_map: dict[int, str]) -> None:
+    # Widget per selezionare quale singolo cluster plottare
+    cluster_sel = st.selectbox(
+        "Seleziona il cluster da visualizzare",
+        options=df_medie_scaled["Cluster"].unique().sort().to_list(),
+        index=0,
+        format_func=lambda x: f"Cluster {x}"
+    )
 
-# Filtriamo il DataFrame solo sul cluster scelto
-df_sel = df_medie_scaled[df_medie_scaled["Cluster"] == cluster_sel]
+    # Filtriamo il DataFrame solo sul cluster scelto
+    df_sel = df_medie_scaled.filter(pl.col("Cluster") == cluster_sel)
 
-# Prelevo il colore corrispondente dalla mia color map
-color_sel = color_map[int(cluster_sel)]
+    # Prelevo il colore corrispondente dalla mia color map
+    color_sel = color_map[int(cluster_sel)]
 
-# Costruisco il chart base su questo sottoinsieme, con i calcoli inline per x_start e x_end
-base_sel = (
-    alt.Chart(df_sel)
-    .transform_calculate(
-        # x_start = Z-score se negativo, altrimenti 0
-        x_start="datum['Z-score'] < 0 ? datum['Z-score'] : 0",
-        # x_end   = Z-score se positivo, altrimenti 0
-        x_end="datum['Z-score'] > 0 ? datum['Z-score'] : 0"
+    # Costruisco il chart base su questo sottoinsieme, con i calcoli inline per x_start e x_end
+    base_sel = (
+        alt.Chart(in_arrow(df_sel))
+        .transform_calculate(
+            # x_start = Z-score se negativo, altrimenti 0
+            x_start="datum['Z-score'] < 0 ? datum['Z-score'] : 0",
+            # x_end   = Z-score se positivo, altrimenti 0
+            x_end="datum['Z-score'] > 0 ? datum['Z-score'] : 0"
+        )
+        .encode(
+            y=alt.Y("Variabile:N", sort=features, title=None)
+        )
     )
-    .encode(
-        y=alt.Y("Variabile:N", sort=features, title=None)
+
+    # Regole orizzontali che vanno da x_start a x_end,
+    rules_sel = base_sel.mark_rule(strokeWidth=2).encode(
+        x=alt.X(
+            "x_start:Q",
+            title="Z-score",
+            scale=alt.Scale(domain=[-2.5, 2.5])
+        ),
+        x2="x_end:Q",
+        color=alt.value(color_sel)
     )
-)
 
-# Regole orizzontali che vanno da x_start a x_end,
-rules_sel = base_sel.mark_rule(strokeWidth=2).encode(
-    x=alt.X(
-        "x_start:Q",
-        title="Z-score",
-        scale=alt.Scale(domain=[-2.5, 2.5])
-    ),
-    x2="x_end:Q",
-    color=alt.value(color_sel)
-)
+    # Frecca per valori positivi (Triangolino per valori > 0) 
+    arrows_pos_sel = base_sel.mark_point(
+        shape="triangle-right",
+        size=80,
+        color=color_sel
+    ).transform_filter(
+        alt.datum["Z-score"] > 0
+    ).encode(
+        x=alt.X("x_end:Q", scale=alt.Scale(domain=[-2.5, 2.5]))
+    )
 
-# Frecca per valori positivi (Triangolino per valori > 0) 
-arrows_pos_sel = base_sel.mark_point(
-    shape="triangle-right",
-    size=80,
-    color=color_sel
-).transform_filter(
-    alt.datum["Z-score"] > 0
-).encode(
-    x=alt.X("x_end:Q", scale=alt.Scale(domain=[-2.5, 2.5]))
-)
+    # Frecca per valori negativi (Triangolino per valori < 0) 
+    arrows_neg_sel = base_sel.mark_point(
+        shape="triangle-left",
+        size=80,
+        color=color_sel
+    ).transform_filter(
+        alt.datum["Z-score"] < 0
+    ).encode(
+        x=alt.X("x_start:Q", scale=alt.Scale(domain=[-2.5, 2.5]))
+    )
 
-# Frecca per valori negativi (Triangolino per valori < 0) 
-arrows_neg_sel = base_sel.mark_point(
-    shape="triangle-left",
-    size=80,
-    color=color_sel
-).transform_filter(
-    alt.datum["Z-score"] < 0
-).encode(
-    x=alt.X("x_start:Q", scale=alt.Scale(domain=[-2.5, 2.5]))
-)
+    # Grafico Finale: unisco i layer 
+    chart_arrows_sel = alt.layer(rules_sel, arrows_pos_sel, arrows_neg_sel
+        ).properties(
+            width=600,   
+            height=400, 
+            background="#f0f0f0",
+            padding={"left":20,"right":20,"top":20,"bottom":20}
+    )
 
-# Grafico Finale: unisco i layer 
-chart_arrows_sel = alt.layer(rules_sel, arrows_pos_sel, arrows_neg_sel
-    ).properties(
-        width=600,   
-        height=400, 
-        background="#f0f0f0",
-        padding={"left":20,"right":20,"top":20,"bottom":20}
-)
+
+    # st.subheader() già visualizzato prima del selector
+    grafico(chart_arrows_sel, use_container_width=True)
 
 
-# st.subheader() già visualizzato prima del selector
-st.altair_chart(chart_arrows_sel, use_container_width=True)
+frecce_cluster(df_medie_scaled, features, color_map)
 st.markdown("Una valida alternativa al grafico precedente per capire la suddivisione in cluster delle Vincitrici è quella di vedere i valori" \
     " standardizzati al posto di quelli in scala reale: nonostante sia più difficile interpretare i risultati a colpo d'occhio, sarà più facile" \
     " notare le variazioni in media delle variabili con scala minore (come HasTopScorer, Sconfitte o Pareggi).   \n" \
@@ -460,23 +521,24 @@ def make_biplot(pc_x, pc_y):
     x_col, y_col = f"PC{pc_x}", f"PC{pc_y}"
 
     comps = pca.components_.T[:, [pc_x-1, pc_y-1]]
-    load_df = pd.DataFrame(comps, index=features, columns=[x_col, y_col])
-    max_x, max_y = df_cluster_pd[[x_col, y_col]].abs().max()
-    max_lx, max_ly = load_df.abs().max()
+    load_df = pl.DataFrame({"Variabile": features, x_col: comps[:, 0], y_col: comps[:, 1]})
+    max_x, max_y = df_cluster_k.select(pl.col(x_col, y_col).abs().max()).row(0)
+    max_lx, max_ly = load_df.select(pl.col(x_col, y_col).abs().max()).row(0)
     scale_vec = min(max_x / max_lx, max_y / max_ly) * 0.7
 
-    ld = load_df.reset_index().rename(columns={"index":"Variabile"})
-    ld["x2"] = ld[x_col] * scale_vec
-    ld["y2"] = ld[y_col] * scale_vec
+    ld = load_df.with_columns(
+        (pl.col(x_col) * scale_vec).alias("x2"),
+        (pl.col(y_col) * scale_vec).alias("y2"),
+    )
 
     lines = []
-    for _, r in ld.iterrows():
-        lines.append({x_col: 0,      y_col: 0,      "Variabile": r["Variabile"]})
+    for r in ld.iter_rows(named=True):
+        lines.append({x_col: 0.0,     y_col: 0.0,     "Variabile": r["Variabile"]})
         lines.append({x_col: r["x2"], y_col: r["y2"], "Variabile": r["Variabile"]})
-    lines_df = pd.DataFrame(lines)
+    lines_df = pl.DataFrame(lines)
 
     pts = (
-        alt.Chart(df_cluster_pd)
+        alt.Chart(df_cluster_arrow)
         .mark_circle(opacity=0.7)
         .encode(
             x=alt.X(f"{x_col}:Q", title=x_col),
@@ -492,7 +554,7 @@ def make_biplot(pc_x, pc_y):
     )
 
     vec = (
-        alt.Chart(lines_df)
+        alt.Chart(in_arrow(lines_df))
         .mark_line(strokeWidth=2, color="black", opacity=0.8)
         .encode(
             x=alt.X(f"{x_col}:Q"),
@@ -501,7 +563,7 @@ def make_biplot(pc_x, pc_y):
         )
     )
     lbl = (
-        alt.Chart(ld)
+        alt.Chart(in_arrow(ld))
         .mark_text(dx=5, dy=-5, fontSize=12, fontWeight="bold")
         .encode(x="x2:Q", y="y2:Q", text="Variabile:N")
     )
@@ -527,9 +589,12 @@ if show_biplot:
     "Gli assi mostrano le combinazioni lineari delle variabili (PC1, PC2, PC3), mentre la dimensione dei punti rappresenta la terza componente." \
     " I vettori indicano direzione e intensità del contributo delle variabili originali."
     )
-    st.altair_chart(make_biplot(1, 2), use_container_width=True)
-    st.altair_chart(make_biplot(1, 3), use_container_width=True)
-    st.altair_chart(make_biplot(2, 3), use_container_width=True)
+    grafico_in_cache(("biplot", 1, 2, k_clusters, metodo_cluster), versione_grafici,
+                     lambda: make_biplot(1, 2), use_container_width=True)
+    grafico_in_cache(("biplot", 1, 3, k_clusters, metodo_cluster), versione_grafici,
+                     lambda: make_biplot(1, 3), use_container_width=True)
+    grafico_in_cache(("biplot", 2, 3, k_clusters, metodo_cluster), versione_grafici,
+                     lambda: make_biplot(2, 3), use_container_width=True)
     st.markdown(
         "Nei biplot, la separazione tra cluster è ben visibile nel piano PC1–PC2 e PC1-PC3, ma meno marcata nel grafico PC2-PC3.  \n" \
         "Questo è dovuto al fatto che seconda e terza componente spiegano una porzione minore della varianza totale e rappresentano dimensioni" \
@@ -549,17 +614,17 @@ st.divider()
 # 3.8 Varianza Spiegata 
 
 # Percentuale di varianza spiegata
-explained_var = pd.DataFrame({
+explained_var = pl.DataFrame({
     "Componente": [f"PC{i+1}" for i in range(pca.n_components_)],
     "Varianza Spiegata (%)": (pca.explained_variance_ratio_ * 100).round(2)
 })
 
 # Calcolo della varianza spiegata totale (sommando le singole percentuali)
-total_varianza = explained_var["Varianza Spiegata (%)"].sum().round(2)
+total_varianza = round(explained_var["Varianza Spiegata (%)"].sum(), 2)
 
 st.subheader("Varianza Spiegata dalle Componenti")
 st.caption("Tabella della varianza spiegata (in percentuale) dalle prime tre componenti principali.")
-st.dataframe(explained_var, hide_index=True)
+st.dataframe(in_arrow(explained_var), hide_index=True)
 st.markdown(f"Viene spiegata quindi il **{total_varianza}** % della varianza totale.  \n" \
     "È un risultato piuttosto soddisfacente, le prime tre componenti catturano gran parte delle informazioni chiave"
     " (dominanza, età media/stile, non vittorie), garantendo una riduzione dimensionale efficace senza perdere eccessivi dettagli."
@@ -568,8 +633,89 @@ st.markdown(f"Viene spiegata quindi il **{total_varianza}** % della varianza tot
 st.divider()
 
 
+# ------------------------------
+# 3.9 Cluster di tutte le squadre-stagioni
+
+show_stagioni = st.sidebar.checkbox(
+    "Mostra tutte le squadre-stagioni",
+    value=False,
+    help="Stesse feature e stesso k applicati a ogni squadra di ogni stagione (rankings.csv), non solo ai vincitori"
+)
+
+if show_stagioni:
+
+    # Feature di ogni squadra-stagione (rankings + average_age + top_scorer, vedi modelli.py)
+    df_stagioni = feature_stagioni(
+        carica_dati("rankings.parquet").lazy(),
+        carica_dati("average_age.parquet").lazy(),
+        carica_dati("top_scorer.parquet", colonne=["Squadra", "Anno"]).lazy(),
+    ).collect()
+
+    # Standardizzazione e PCA a blocchi, MiniBatchKMeans: restano leggeri anche con molte leghe e stagioni
+    modelli_stagioni = modelli_cluster(df_stagioni.select(FEATURE_CLUSTER).to_pandas(), incrementale=True)
+    df_stagioni_k = (
+        df_stagioni
+        .with_columns(
+            pl.Series("Cluster", modelli_stagioni.etichette(k_clusters, minibatch=True)).cast(pl.Utf8),
+            pl.Series("PC1", modelli_stagioni.X_pca[:, 0]),
+            pl.Series("PC2", modelli_stagioni.X_pca[:, 1]),
+            pl.when(pl.col("Posizione") == 1).then(pl.lit("Vincitore")).otherwise(pl.lit("Altre")).alias("Esito"),
+        )
+    )
+
+    chart_stagioni = (
+        alt.Chart(in_arrow(df_stagioni_k))
+        .mark_point(filled=True, opacity=0.7)
+        .encode(
+            x=alt.X("PC1", title="PC1"),
+            y=alt.Y("PC2", title="PC2"),
+            color=alt.Color("Cluster:N", title="Cluster"),
+            shape=alt.Shape("Esito:N", title="Esito", scale=alt.Scale(domain=["Vincitore", "Altre"], range=["diamond", "circle"])),
+            size=alt.condition(alt.datum.Esito == "Vincitore", alt.value(150), alt.value(40)),
+            tooltip=["Stagione", "Squadra", "Posizione", "Punteggio", "GD", "Average_age", "HasTopScorer", "Cluster"]
+        )
+        .properties(
+            width=800, height=500, background="#f0f0f0",
+            title={
+                "text": f"PCA di tutte le squadre-stagioni (k = {k_clusters})",
+                "anchor": "middle", "fontSize": 20, "dx": 10, "dy": 10
+            },
+            padding={"left": 20, "right": 20, "top": 20, "bottom": 20}
+        )
+    )
+
+    # Medie per cluster, con quante stagioni e quanti titoli contiene ognuno
+    medie_stagioni = (
+        df_stagioni
+        .with_columns(pl.Series("Cluster", modelli_stagioni.etichette(k_clusters, minibatch=True)))
+        .group_by("Cluster")
+        .agg(
+            pl.len().alias("Squadre-stagioni"),
+            (pl.col("Posizione") == 1).sum().alias("Vincitori"),
+            pl.col("Posizione").mean().round(1).alias("Posizione media"),
+            *[pl.col(f).mean().round(2) for f in FEATURE_CLUSTER],
+        )
+        .sort("Cluster")
+    )
+
+    st.subheader("Cluster Analysis: Tutte le Squadre-Stagioni")
+    st.caption(
+        f"Le {df_stagioni.height} squadre-stagioni della Premier League proiettate sulle prime due componenti principali"
+        f" e raggruppate in k = {k_clusters} cluster; i rombi sono i vincitori del campionato.  \n"
+        "Standardizzazione e PCA sono stimate a blocchi di righe e i cluster con MiniBatchKMeans,"
+        " così la sezione resta reattiva anche aggiungendo altre leghe e stagioni."
+    )
+    grafico(chart_stagioni, use_container_width=True)
+    st.dataframe(in_arrow(medie_stagioni), use_container_width=True, hide_index=True)
+    st.markdown("Rispetto all'analisi dei soli vincitori la PC1 separa ora l'intera classifica, dalle squadre in lotta per il titolo" \
+        " a quelle in zona retrocessione: i vincitori si concentrano quasi tutti nel cluster con punteggio medio più alto," \
+        " insieme alle migliori non campioni della stessa stagione.")
+
+    st.divider()
+
+
 # -------------------------
-# 3.9 Mostra Dataset
+# 3.10 Mostra Dataset
 
 if "mostra_dataset" not in st.session_state:
     st.session_state.mostra_dataset = False
@@ -581,15 +727,21 @@ if st.session_state.mostra_dataset:
 
     # 1) df_cluster
     st.markdown("**df_cluster** (crafted): dataframe utilizzato per la clustering analysis, contiene index e feature")
-    st.dataframe(df_cluster, use_container_width=True)
+    st.dataframe(in_arrow(df_cluster), use_container_width=True)
 
     st.divider()
 
     # 2) df_medie_scaled
     st.markdown("**df_medie_scaled** (crafted): contiene il valore medio e il valore medio normalizzato delle variabile per i 3 Cluster")
-    st.dataframe(df_medie_scaled, use_container_width=True, hide_index= True)
+    st.dataframe(in_arrow(df_medie_scaled), use_container_width=True, hide_index= True)
     
     # Nascondi Dataset
     st.markdown("<br><br><br>*Per nascondere i dataset, premere due volte il pulsante.*", unsafe_allow_html=True)
     if st.button("Nascondi dataset"):
-        st.session_state.mostra_dataset = False
\ No newline at end of file
+        st.session_state.mostra_dataset = False
+
+
+# Contatori della cache dati (hit/miss), byte dei grafici inviati al browser e tempo del rerun nella sidebar
+st.sidebar.caption(riepilogo_cache())
+st.sidebar.caption(riepilogo_payload("Cluster"))
+st.sidebar.caption(fine_pagina("Cluster"))
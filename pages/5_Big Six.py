@@ -1,9 +1,15 @@
 import altair as alt
 import polars as pl
-import pandas as pd
 import streamlit as st
-import numpy as np
-import matplotlib.colors as mcolors
+
+from dati import carica_dati, riepilogo_cache, versione_dati
+from grafici import grafico, in_arrow, riepilogo_payload
+from matrici import matrici_scontri, scontri_diretti
+from sezioni import fine_pagina, inizio_pagina
+from stili import scala_colori, stile_in_cache
+
+# Tempo del rerun completo, letto in fondo alla pagina (vedi sezioni.py)
+inizio_pagina()
 
 
 # ===============================
@@ -11,9 +17,12 @@ import matplotlib.colors as mcolors
 # ===============================
 
 
-# Funzione di caricamento dati
-def carica_dati(path: str):
-    return pl.read_csv(path, null_values=["", "NA ", " NA", "NA"])
+# Funzione di caricamento dati: condivisa tra le pagine e con cache, vedi dati.py
+
+
+# Matrice in pandas (indice = squadra di casa): serve solo allo Styler, quindi si converte solo quando lo stile non è in cache
+def matrice_pd(nome: str):
+    return matrici[nome].to_pandas().set_index("home")
 
 
 # ====================================================
@@ -22,8 +31,8 @@ def carica_dati(path: str):
 
 
 # Caricamento dei dataset, completati e ordinati
-df_h2h   = carica_dati("h2h_premier.csv") 
-df_matches   = carica_dati("largest_win.csv") 
+df_h2h   = carica_dati("h2h_premier.parquet") 
+df_matches   = carica_dati("largest_win.parquet") 
 
 
 # Lista ordinata di tutte le squadre
@@ -31,97 +40,32 @@ unique_teams = sorted(df_matches["home"].unique().to_list())
 
 
 # -------------------------
-# 2.1) Matrice Vittorie Casalinghe
-
-# Costruisco la Matrice
-rows_home = []
-for h in unique_teams:
-    row = {"home": h}
-    for a in unique_teams:
-        if a == h:
-            row[a] = ""
-        else:
-            sub = df_matches.filter(
-                (pl.col("home") == h) & (pl.col("away") == a)
-            )
-            if sub.is_empty():
-                row[a] = ""
-            else:
-                row[a] = sub[0, "home_win"]
-    rows_home.append(row)
-
-wide_home_win_df = pl.DataFrame(rows_home)
-home_win_pd = wide_home_win_df.to_pandas().set_index("home")
-
-# Differenza Reti per Vittoria in Casa
-rows_home_diff = []
-for h in unique_teams:
-    diff_row = {"home": h}
-    for a in unique_teams:
-        if a == h:
-            diff_row[a] = np.nan
-        else:
-            sub = df_matches.filter(
-                (pl.col("home") == h) & (pl.col("away") == a)
-            )
-            diff_row[a] = sub[0, "home_diff"] if not sub.is_empty() else np.nan
-    rows_home_diff.append(diff_row)
-
-wide_home_diff_df = pl.DataFrame(rows_home_diff)
-home_diff_pd = wide_home_diff_df.to_pandas().set_index("home")
-
+# 2.1) Matrici Vittorie e Sconfitte Casalinghe
+
+# Costruisco le quattro Matrici (risultato e differenza reti, in casa e in trasferta) con un solo pivot:
+# le celle della diagonale e le coppie senza partita restano vuote ("" per i risultati, NaN per le differenze)
+matrici = matrici_scontri(
+    df_matches,
+    ["home_win", "home_diff", "away_win", "away_diff"],
+    squadre=unique_teams,
+    diagonale={"home_win": "", "away_win": ""},
+    mancante={"home_win": "", "away_win": ""},
+)
 
-# -------------------------
-# 2.2) Matrice Sconfitte Casalinghe
-
-# Costruisco la Matrice
-rows_away = []
-for h in unique_teams:  # ora “h” è la squadra di casa (indice di riga)
-    row = {"home": h}
-    for a in unique_teams:  # “a” è la squadra in trasferta (colonna)
-        if a == h:
-            row[a] = ""
-        else:
-            sub = df_matches.filter(
-                (pl.col("home") == h) & (pl.col("away") == a)
-            )
-            if sub.is_empty():
-                row[a] = ""
-            else:
-                row[a] = sub[0, "away_win"]
-    rows_away.append(row)
-
-wide_away_win_df = pl.DataFrame(rows_away)
-away_win_pd = wide_away_win_df.to_pandas().set_index("home")
-
-# Differenzaa Reti per Sconfitte in Casa
-rows_away_diff = []
-for h in unique_teams:  # “h” è la squadra di casa (indice di riga)
-    diff_row = {"home": h}
-    for a in unique_teams:  # “a” è la squadra in trasferta (colonna)
-        if a == h:
-            diff_row[a] = np.nan
-        else:
-            sub = df_matches.filter(
-                (pl.col("home") == h) & (pl.col("away") == a)
-            )
-            diff_row[a] = sub[0, "away_diff"] if not sub.is_empty() else np.nan
-    rows_away_diff.append(diff_row)
-
-wide_away_diff_df = pl.DataFrame(rows_away_diff)
-away_diff_pd = wide_away_diff_df.to_pandas().set_index("home")
+# Vittorie in Casa e relativa Differenza Reti ("home_win", "home_diff")
+# Sconfitte Casalinghe e relativa Differenza Reti ("away_win", "away_diff"), righe = squadra di casa
 
 
 # -------------------------
-# 2.3) Valori Minimi e Massimi di goal difference
+# 2.2) Valori Minimi e Massimi di goal difference (i valori mancanti vengono ignorati)
 
 all_min = min(
-    home_diff_pd.min().min(skipna=True),
-    away_diff_pd.min().min(skipna=True)
+    matrici["home_diff"].drop("home").min().min_horizontal().item(),
+    matrici["away_diff"].drop("home").min().min_horizontal().item()
 )
 all_max = max(
-    home_diff_pd.max().max(skipna=True),
-    away_diff_pd.max().max(skipna=True)
+    matrici["home_diff"].drop("home").max().max_horizontal().item(),
+    matrici["away_diff"].drop("home").max().max_horizontal().item()
 )
 
 vmin = int(all_min)
@@ -129,49 +73,20 @@ vmax = int(all_max)
 
 
 # -------------------------
-# 2.4) Dataframe per Heatmap
+# 2.3) Dataframe per Heatmap
 
 
-# Costruisco la lista completa di squadre in df_h2h
-unique_teams_h2h = sorted(
-    set(df_h2h["team1"].unique().to_list() + df_h2h["team2"].unique().to_list())
-)
+# Archivio degli scontri diretti: indice delle squadre e array squadra x squadra, costruito una volta per versione del file
+h2h = scontri_diretti()
+
+# Lista completa di squadre in df_h2h (già ordinata) e bilanci netti di ogni coppia (NaN sulla diagonale)
+unique_teams_h2h = h2h.squadre
+heatmap_df = h2h.heatmap()
 
-# Creo una lista di dizionari {'team1': t1, 'team2': t2, 'net': net_round, 'V': V, 'S': S}
-data_list = []
-for t1 in unique_teams_h2h:
-    for t2 in unique_teams_h2h:
-        if t1 == t2:
-            net = np.nan
-            V = 0
-            S = 0
-        else:
-            sub1 = df_h2h.filter(
-                (pl.col("team1") == t1) & (pl.col("team2") == t2)
-            )
-            if not sub1.is_empty():
-                V = int(sub1[0, "win1"])
-                S = int(sub1[0, "win2"])
-            else:
-                sub2 = df_h2h.filter(
-                    (pl.col("team1") == t2) & (pl.col("team2") == t1)
-                )
-                if not sub2.is_empty():
-                    V = int(sub2[0, "win2"])
-                    S = int(sub2[0, "win1"])
-                else:
-                    V = 0
-                    S = 0
-            net = round(V - S)
-        data_list.append({"team1": t1, "team2": t2, "net": net, "V": V, "S": S})
-
-# Converto in pandas DataFrame
-heatmap_df = pd.DataFrame(data_list)
-
-# Trovo il valore massimo assoluto di “net” per definire una scala simmetrica
+# Trovo il valore massimo assoluto di “net” per definire una scala simmetrica (NaN ignorati)
 max_abs = int(max(
-    heatmap_df["net"].max(skipna=True),
-    abs(heatmap_df["net"].min(skipna=True))
+    heatmap_df["net"].max(),
+    abs(heatmap_df["net"].min())
 ))
 
 
@@ -197,37 +112,20 @@ st.divider()
 # -------------------------
 # Preparo le Matrici
 
-custom_cmap = mcolors.LinearSegmentedColormap.from_list(
-    "rossobiancoverde",
-    ["#d7191c", "#f7f7f7", "#1a9641"]
-)
-
-# Definisco una Funzione per associare i colori ai valori normalizzati tra min e max
-def color_cell(val, vmin=vmin, vmax=vmax, cmap=custom_cmap):
-    if pd.isna(val):
-        return "background-color: transparent; text-align: center;"
-    norm = (val - vmin) / (vmax - vmin)
-    norm = min(max(norm, 0.0), 1.0)
-    rgba = cmap(norm)
-    hexcol = mcolors.to_hex(rgba)
-    return f"background-color: {hexcol}; color: black; text-align: center;"
+# Scala rosso-bianco-verde per differenza reti, uguale per le due matrici (256 colori precalcolati, vedi stili.py)
+colori_diff = ("#d7191c", "#f7f7f7", "#1a9641")
+versione_matches = versione_dati("largest_win.parquet")
 
 # Assegno colori alla Matrice Vittorie Casalinghe
-styled_home = home_win_pd.style.apply(
-    lambda row: [
-        color_cell(home_diff_pd.loc[row.name, col])
-        for col in home_win_pd.columns
-    ],
-    axis=1
+styled_home = stile_in_cache(
+    ("home_win", vmin, vmax), versione_matches,
+    lambda: (matrice_pd("home_win"), scala_colori(matrice_pd("home_diff"), vmin, vmax, colori_diff)),
 ).set_properties(**{"text-align": "center"})
 
 # Assegno colori alla Matrice Sconfitte Casalinghe
-styled_away = away_win_pd.style.apply(
-    lambda row: [
-        color_cell(away_diff_pd.loc[row.name, col])
-        for col in away_win_pd.columns
-    ],
-    axis=1
+styled_away = stile_in_cache(
+    ("away_win", vmin, vmax), versione_matches,
+    lambda: (matrice_pd("away_win"), scala_colori(matrice_pd("away_diff"), vmin, vmax, colori_diff)),
 ).set_properties(**{"text-align": "center"})
 
 
@@ -266,7 +164,7 @@ st.divider()
 
 # Costruisco la heatmap 
 heatmap = (
-    alt.Chart(heatmap_df)
+    alt.Chart(in_arrow(heatmap_df))
     .mark_rect()
     .encode(
         x=alt.X(
@@ -316,7 +214,7 @@ st.caption(
     "Heatmap con bilanci netti (V–S) tra le Big Six: asse Y = Team 1 , asse X = Team 2  \n"
     "Valore calcolato come vittorie di Team 1 (win1) - vittorie di Team 2 (win2)."
 )
-st.altair_chart(heatmap, use_container_width=True)
+grafico(heatmap, use_container_width=True)
 st.markdown("Il Tottenham Hotspur registra il bilancio **più sfavorevole** contro tutte le altre big, con saldi particolarmente" \
 " negativi nei confronti di Chelsea e Manchester United.    \nIl Manchester City è l’unica squadra con un saldo negativo nei confronti" \
 " di **tutte** le rimanenti cinque, nonostante i successi nazionali recenti.    \nI compaesani dello United al contrario hanno **saldo** " \
@@ -339,13 +237,13 @@ if st.session_state.mostra_dataset:
 
     # 1) df_h2h
     st.markdown("**df_h2h** (copied): statistiche testa-a-testa tra le squadre")
-    st.dataframe(df_h2h, use_container_width=True)
+    st.dataframe(in_arrow(df_h2h), use_container_width=True)
 
     st.divider()
 
     # 2) df_matches
     st.markdown("**df_matches** (copied): dataset degli scontri più pesanti tra i team")
-    st.dataframe(df_matches, use_container_width=True)
+    st.dataframe(in_arrow(df_matches), use_container_width=True)
 
     st.markdown(
         "I dati sono stati ricavati dal sito ufficiale [Premier League](https://www.premierleague.com/stats/head-to-head)" \
@@ -355,4 +253,10 @@ if st.session_state.mostra_dataset:
     # Nascondi Dataset
     st.markdown("<br><br><br>*Per nascondere i dataset, premere due volte il pulsante.*", unsafe_allow_html=True)
     if st.button("Nascondi dataset"):
-        st.session_state.mostra_dataset = False
\ No newline at end of file
+        st.session_state.mostra_dataset = False
+
+
+# Contatori della cache dati (hit/miss), byte dei grafici inviati al browser e tempo del rerun nella sidebar
+st.sidebar.caption(riepilogo_cache())
+st.sidebar.caption(riepilogo_payload("Big Six"))
+st.sidebar.caption(fine_pagina("Big Six"))
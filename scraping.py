@@ -0,0 +1,690 @@
+# FILE di supporto agli scraper: download concorrente delle stagioni con limite di richieste e retry
+
+import argparse
+import datetime
+import functools
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+
+import polars as pl
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+
+from dati import salva_dati, salva_partizioni, scansiona_partizioni
+
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+BASE_URL = "https://www.transfermarkt.it"
+CARTELLA_CACHE = ".cache_http"
+CARTELLA_CHECKPOINT = ".checkpoint"
+CARTELLA_DATASET = "dataset"
+
+# Competizioni di Transfermarkt: codice -> nome nell'indirizzo (il sito usa solo il codice,
+# il nome serve a tenere gli indirizzi leggibili; per i codici non elencati si usa SLUG_GENERICO)
+LEGA_PREDEFINITA = "GB1"
+LEGHE = {
+    "GB1": "premier-league", "GB2": "championship", "IT1": "serie-a", "IT2": "serie-b",
+    "ES1": "laliga", "L1": "bundesliga", "FR1": "ligue-1", "NL1": "eredivisie",
+    "PO1": "liga-portugal", "BE1": "jupiler-pro-league", "TR1": "super-lig", "SC1": "scottish-premiership",
+}
+SLUG_GENERICO = "campionato"
+
+
+# ===============================
+# 1. LIMITE DI RICHIESTE (TOKEN BUCKET)
+# ===============================
+
+class LimitatoreRichieste:
+    """
+    Token bucket condiviso tra i thread.
+    - rps: richieste al secondo concesse a regime
+    - capacita: quante richieste possono partire "a raffica" dopo una pausa
+    - Adattivo: dimezza il ritmo quando il server risponde 429/5xx (rallenta),
+      poi lo riporta gradualmente verso rps a ogni risposta andata a buon fine (accelera)
+    """
+
+    def __init__(self, rps: float, capacita: float = 1.0, rps_minimo: float = 0.05):
+        self.rps_base = rps
+        self.rps = rps
+        self.rps_minimo = min(rps_minimo, rps)
+        self.capacita = capacita
+        self._token = capacita
+        self._ultimo = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquisisci(self) -> None:
+        while True:
+            with self._lock:
+                adesso = time.monotonic()
+                self._token = min(self.capacita, self._token + (adesso - self._ultimo) * self.rps)
+                self._ultimo = adesso
+                if self._token >= 1:
+                    self._token -= 1
+                    return
+                attesa = (1 - self._token) / self.rps
+            time.sleep(attesa)
+
+    def rallenta(self) -> None:
+        with self._lock:
+            self.rps = max(self.rps / 2, self.rps_minimo)
+
+    def accelera(self) -> None:
+        with self._lock:
+            self.rps = min(self.rps + self.rps_base * 0.1, self.rps_base)
+
+
+# ===============================
+# 2. CACHE SU DISCO DELLE RISPOSTE
+# ===============================
+
+def stagione_corrente(oggi: datetime.date | None = None) -> int:
+    # la stagione 2024/25 inizia a luglio 2024: prima di luglio è ancora quella dell'anno precedente
+    oggi = oggi or datetime.date.today()
+    return oggi.year if oggi.month >= 7 else oggi.year - 1
+
+
+class CacheHTTP:
+    """
+    Cache persistente delle pagine scaricate, chiave = URL.
+    - Per ogni URL: <sha256>.html.gz (contenuto compresso) e <sha256>.json (ETag, Last-Modified, data di salvataggio)
+    - Le pagine "immutabili" (stagioni concluse) non scadono mai, le altre dopo ttl secondi
+    - Una pagina scaduta viene rivalidata con una richiesta condizionale (304 = riuso il contenuto)
+    """
+
+    def __init__(self, cartella: str = CARTELLA_CACHE, ttl: float = 24 * 3600):
+        self.cartella = Path(cartella)
+        self.ttl = ttl
+        self.cartella.mkdir(parents=True, exist_ok=True)
+
+    def _percorsi(self, url: str) -> tuple[Path, Path]:
+        chiave = hashlib.sha256(url.encode()).hexdigest()
+        return self.cartella / f"{chiave}.html.gz", self.cartella / f"{chiave}.json"
+
+    def leggi(self, url: str) -> tuple[bytes, dict] | None:
+        contenuto, meta = self._percorsi(url)
+        if not (contenuto.exists() and meta.exists()):
+            return None
+        return gzip.decompress(contenuto.read_bytes()), json.loads(meta.read_text())
+
+    def fresca(self, meta: dict, immutabile: bool) -> bool:
+        return immutabile or time.time() - meta["salvata"] < self.ttl
+
+    def salva(self, url: str, contenuto: bytes, headers) -> None:
+        path_contenuto, path_meta = self._percorsi(url)
+        meta = {
+            "url": url,
+            "salvata": time.time(),
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        # scrittura atomica: un'interruzione non lascia file a metà
+        for path, dati in [(path_contenuto, gzip.compress(contenuto)), (path_meta, json.dumps(meta).encode())]:
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_bytes(dati)
+            os.replace(tmp, path)
+
+    def rinnova(self, url: str) -> None:
+        # risposta 304: il contenuto è ancora valido, aggiorno solo la data
+        path_meta = self._percorsi(url)[1]
+        meta = json.loads(path_meta.read_text())
+        meta["salvata"] = time.time()
+        path_meta.write_text(json.dumps(meta))
+
+
+class PaginaNonInCache(Exception):
+    pass
+
+
+# ===============================
+# 3. SESSIONE E DOWNLOAD CON RETRY
+# ===============================
+
+def crea_sessione(max_connessioni: int = 1) -> requests.Session:
+    """Sessione condivisa da tutte le richieste: connessioni keep-alive riusate (pool grande quanto le richieste in volo)."""
+    sessione = requests.Session()
+    sessione.headers.update(HEADERS)
+    adattatore = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=max(max_connessioni, 1))
+    sessione.mount("http://", adattatore)
+    sessione.mount("https://", adattatore)
+    return sessione
+
+
+def _attesa_retry(response: requests.Response | None, tentativo: int, backoff: float) -> float:
+    # Rispetto Retry-After se il server lo indica, altrimenti backoff esponenziale con jitter
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    return backoff * 2 ** tentativo * random.uniform(0.75, 1.25)
+
+
+def scarica(url: str,
+            limitatore: LimitatoreRichieste,
+            tentativi: int = 4,
+            backoff: float = 1.0,
+            timeout: float = 30,
+            cache: CacheHTTP | None = None,
+            immutabile: bool = False,
+            replay: bool = False,
+            sessione: requests.Session | None = None) -> bytes:
+    """
+    Scarica il contenuto di url rispettando il limitatore (con la sessione, se indicata).
+    429 e 5xx (ed errori di connessione) vengono ritentati con backoff esponenziale,
+    gli altri codici di errore sollevano subito requests.HTTPError.
+    Con una cache: le pagine fresche non vanno in rete, quelle scadute vengono rivalidate
+    (ETag/Last-Modified); con replay=True si usa solo la cache, senza nessuna richiesta.
+    """
+    salvata = cache.leggi(url) if cache is not None else None
+    if replay:
+        if salvata is None:
+            raise PaginaNonInCache(f"pagina non presente in cache (modalità replay): {url}")
+        return salvata[0]
+    headers = dict(HEADERS)
+    if salvata is not None:
+        if cache.fresca(salvata[1], immutabile):
+            return salvata[0]
+        if salvata[1].get("etag"):
+            headers["If-None-Match"] = salvata[1]["etag"]
+        if salvata[1].get("last_modified"):
+            headers["If-Modified-Since"] = salvata[1]["last_modified"]
+
+    for tentativo in range(tentativi):
+        limitatore.acquisisci()
+        try:
+            response = (sessione or requests).get(url, headers=headers, timeout=timeout)   # Uso requests per ottenere il contenuto
+        except (requests.ConnectionError, requests.Timeout) as errore:
+            print(f"!! errore !!, {type(errore).__name__} su {url}")
+            response = None
+        else:
+            if response.status_code == 304 and salvata is not None:    #non modificata: riuso la copia in cache
+                limitatore.accelera()
+                cache.rinnova(url)
+                return salvata[0]
+            if response.status_code // 100 == 2:    #verifico che la risposta sia positiva (code 200, 201, 202,...)
+                limitatore.accelera()
+                if cache is not None:
+                    cache.salva(url, response.content, response.headers)
+                return response.content
+            print(f"!! errore !!, codice di risposta numero: {response.status_code}")
+            if response.status_code != 429 and response.status_code < 500:
+                response.raise_for_status()
+            limitatore.rallenta()
+        if tentativo < tentativi - 1:
+            time.sleep(_attesa_retry(response, tentativo, backoff))
+    raise requests.HTTPError(f"download fallito dopo {tentativi} tentativi: {url}")
+
+
+# ===============================
+# 4. DOWNLOAD CONCORRENTE DELLE STAGIONI
+# ===============================
+
+def scarica_stagioni(urls: dict[int, str],
+                     rps: float = 0.5,
+                     max_in_volo: int = 1,
+                     tentativi: int = 4,
+                     backoff: float = 1.0,
+                     cache: CacheHTTP | None = None,
+                     replay: bool = False,
+                     al_completamento=None,
+                     limitatore: LimitatoreRichieste | None = None,
+                     sessione: requests.Session | None = None,
+                     pool: ThreadPoolExecutor | None = None,
+                     etichetta: str = "") -> dict[int, bytes]:
+    """
+    Scarica le pagine {anno: url} con al massimo max_in_volo richieste contemporanee
+    e rps richieste al secondo. Il risultato è ordinato per anno, qualunque sia
+    l'ordine di arrivo delle risposte (così il pl.concat finale resta identico).
+    Con i valori di default il ritmo è quello del vecchio ciclo con time.sleep(2).
+    Le stagioni concluse sono immutabili per la cache, la stagione in corso scade dopo il ttl.
+    al_completamento(anno, contenuto), se indicata, viene chiamata appena arriva ogni pagina.
+    limitatore, sessione e pool di thread possono essere condivisi tra più tabelle
+    (altrimenti ne vengono creati di nuovi): così il limite di richieste vale per tutto lo scraping.
+    """
+    limitatore = limitatore or LimitatoreRichieste(rps)
+    sessione_propria = sessione is None
+    sessione = sessione or crea_sessione(max_in_volo)
+    in_corso = stagione_corrente()
+
+    def _scarica(anno: int) -> bytes:
+        contenuto = scarica(urls[anno], limitatore, tentativi, backoff, cache=cache,
+                            immutabile=anno < in_corso, replay=replay, sessione=sessione)
+        print(f"Raccolta dati per l'anno {anno}{etichetta}...")
+        if al_completamento is not None:
+            al_completamento(anno, contenuto)
+        return contenuto
+
+    anni = sorted(urls)
+    try:
+        if pool is not None:
+            return dict(zip(anni, pool.map(_scarica, anni)))
+        with ThreadPoolExecutor(max_workers=max_in_volo) as pool_proprio:
+            return dict(zip(anni, pool_proprio.map(_scarica, anni)))
+    finally:
+        if sessione_propria:
+            sessione.close()
+
+
+# ===============================
+# 5. LETTURA DELLE TABELLE HTML
+# ===============================
+
+# Backend disponibili per leggi_tabella (vedi benchmark/bench_parsing.py per il confronto)
+BACKEND_PARSING = ["auto", "veloce", "strainer", "lxml", "bs4"]
+
+
+def _lxml_disponibile() -> bool:
+    try:
+        import lxml.html  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _ParserTabella(HTMLParser):
+    """
+    Parser a eventi (libreria standard) che guarda solo la tabella numero indice della pagina:
+    tutto il resto viene scorso senza costruire alberi, e i valori delle celle
+    vengono aggiunti direttamente alla lista della loro colonna.
+    """
+
+    def __init__(self, indice: int):
+        super().__init__(convert_charrefs=True)
+        self.indice = indice
+        self.tabelle_viste = 0
+        self.profondita = 0     # > 0 dentro la tabella cercata (conta le tabelle annidate)
+        self.intestazioni: list[str] = []
+        self.colonne: list[list[str]] = []
+        self.righe = -1         # la prima riga (intestazione) è la numero 0 e viene saltata
+        self.celle_riga: list[int] = []
+        self._cella: list[str] | None = None
+        self._tipo = ""
+        self._j = 0
+        self.finito = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            if self.profondita:
+                self.profondita += 1
+            else:
+                if self.tabelle_viste == self.indice:
+                    self.profondita = 1
+                self.tabelle_viste += 1
+            return
+        if not self.profondita:
+            return
+        if tag == "tr":
+            self._chiudi_cella()
+            self.righe += 1
+            self._j = 0
+            if self.righe >= 1:
+                self.celle_riga.append(0)
+        elif tag in ("th", "td"):
+            self._chiudi_cella()    # </td> può mancare in HTML
+            self._cella, self._tipo = [], tag
+
+    def handle_endtag(self, tag):
+        if not self.profondita:
+            return
+        if tag in ("th", "td"):
+            self._chiudi_cella()
+        elif tag == "table":
+            self._chiudi_cella()
+            self.profondita -= 1
+            if self.profondita == 0:
+                self.finito = True
+
+    def handle_data(self, data):
+        if self._cella is not None:
+            self._cella.append(data)
+
+    def _chiudi_cella(self):
+        if self._cella is None:
+            return
+        testo = "".join(self._cella).strip()
+        self._cella = None
+        if self._tipo == "th":
+            self.intestazioni.append(testo)
+        elif self.righe >= 1:
+            if self._j == len(self.colonne):
+                self.colonne.append([])
+            self.colonne[self._j].append(testo)
+            self._j += 1
+            self.celle_riga[-1] += 1
+
+
+def _in_colonne(righe: list[list[str]]) -> list[list[str]]:
+    if not righe:
+        return []
+    if any(len(riga) != len(righe[0]) for riga in righe):
+        raise ValueError("tabella con righe di lunghezza diversa")
+    return [list(colonna) for colonna in zip(*righe)]
+
+
+def leggi_tabella(contenuto: bytes | str, indice: int = 1, backend: str = "auto") -> tuple[list[str], list[list[str]]]:
+    """
+    Legge la tabella numero indice della pagina e restituisce:
+    - intestazioni: il testo di tutti i <th> della tabella
+    - colonne: per ogni colonna, il testo dei <td> delle righe successive alla prima
+    I backend danno lo stesso risultato:
+    - "auto": lxml se installato, altrimenti "veloce" (default)
+    - "veloce": parser a eventi, niente albero e colonne costruite direttamente
+    - "strainer": BeautifulSoup limitato alle sole tabelle (SoupStrainer)
+    - "lxml": albero lxml, se la libreria è installata (dipendenza opzionale)
+    - "bs4": albero completo con html.parser, il metodo originale
+    """
+    if isinstance(contenuto, bytes):
+        contenuto = contenuto.decode("utf-8", errors="replace")
+    if backend == "auto":
+        backend = "lxml" if _lxml_disponibile() else "veloce"
+
+    if backend == "veloce":
+        parser = _ParserTabella(indice)
+        # a blocchi: appena la tabella cercata si chiude il resto della pagina non viene letto
+        for inizio in range(0, len(contenuto), 1 << 16):
+            parser.feed(contenuto[inizio:inizio + (1 << 16)])
+            if parser.finito:
+                break
+        else:
+            parser.close()
+        parser._chiudi_cella()
+        if parser.tabelle_viste <= indice:
+            raise IndexError(f"la pagina ha solo {parser.tabelle_viste} tabelle")
+        if any(n != len(parser.colonne) for n in parser.celle_riga):
+            raise ValueError("tabella con righe di lunghezza diversa")
+        return parser.intestazioni, parser.colonne
+
+    if backend == "lxml":
+        try:
+            import lxml.html
+        except ImportError as errore:
+            raise ImportError("il backend 'lxml' richiede il pacchetto lxml (pip install lxml)") from errore
+        box = list(lxml.html.fromstring(contenuto).iter("table"))[indice]
+        intestazioni = [th.text_content().strip() for th in box.iter("th")]
+        righe = [[td.text_content().strip() for td in tr.iter("td")] for tr in list(box.iter("tr"))[1:]]
+        return intestazioni, _in_colonne(righe)
+
+    if backend == "strainer":
+        soup = BeautifulSoup(contenuto, "html.parser", parse_only=SoupStrainer("table"))
+    elif backend == "bs4":
+        soup = BeautifulSoup(contenuto, "html.parser")
+    else:
+        raise ValueError(f"backend sconosciuto: {backend} (disponibili: {BACKEND_PARSING})")
+    box = soup.find_all('table')[indice]
+    intestazioni = [th.text.strip() for th in box.find_all('th')]
+    righe = [[td.text.strip() for td in tr.find_all('td')] for tr in box.find_all('tr')[1:]]
+    return intestazioni, _in_colonne(righe)
+
+
+# ===============================
+# 6. MODALITÀ INCREMENTALE E CHECKPOINT
+# ===============================
+
+def anni_da_aggiornare(esistente: pl.DataFrame | None, anni, in_corso: int | None = None) -> list[int]:
+    """Stagioni di anni mancanti nel dataset esistente, più quelle non ancora concluse."""
+    in_corso = stagione_corrente() if in_corso is None else in_corso
+    presenti = set() if esistente is None else set(esistente["Anno"].unique().to_list())
+    return [anno for anno in anni if anno not in presenti or anno >= in_corso]
+
+
+def unisci_stagioni(esistente: pl.DataFrame, nuovo: pl.DataFrame) -> pl.DataFrame:
+    # le stagioni riscaricate sostituiscono quelle vecchie, l'ordine delle righe in ogni stagione resta quello della pagina
+    return (
+        pl.concat([esistente.filter(~pl.col("Anno").is_in(nuovo["Anno"].unique())), nuovo.select(esistente.columns)])
+        .sort("Anno", maintain_order=True)
+    )
+
+
+def raccogli_stagioni(urls: dict[int, str], get_table, checkpoint: str | None = None, **opzioni) -> list[pl.DataFrame]:
+    """
+    Scarica e legge (get_table) le stagioni di urls, restituendo i DataFrame in ordine di anno.
+    Ogni stagione letta viene salvata subito in checkpoint/<anno>.parquet: se lo script si
+    interrompe, al riavvio le stagioni già salvate non vengono riscaricate.
+    I checkpoint vanno cancellati con chiudi_checkpoint dopo aver salvato il dataset finale.
+    """
+    tabelle: dict[int, pl.DataFrame] = {}
+    cartella = Path(checkpoint) if checkpoint is not None else None
+    if cartella is not None:
+        cartella.mkdir(parents=True, exist_ok=True)
+        for anno in urls:
+            if (cartella / f"{anno}.parquet").exists():
+                tabelle[anno] = pl.read_parquet(cartella / f"{anno}.parquet")
+                print(f"Anno {anno} ripreso dal checkpoint.")
+
+    def _salva(anno: int, contenuto: bytes) -> None:
+        df = get_table(contenuto, anno)
+        if cartella is not None:
+            tmp = cartella / f"{anno}.parquet.tmp"
+            df.write_parquet(tmp)
+            os.replace(tmp, cartella / f"{anno}.parquet")
+        tabelle[anno] = df
+
+    da_scaricare = {anno: url for anno, url in urls.items() if anno not in tabelle}
+    scarica_stagioni(da_scaricare, al_completamento=_salva, **opzioni)
+    return [tabelle[anno] for anno in sorted(tabelle)]
+
+
+def chiudi_checkpoint(checkpoint: str) -> None:
+    cartella = Path(checkpoint)
+    for path in cartella.glob("*.parquet"):
+        path.unlink()
+    for vuota in [cartella, cartella.parent]:    # cartella della lega e, se non resta altro, quella della tabella
+        if vuota.exists() and not any(vuota.iterdir()):
+            vuota.rmdir()
+
+
+# ===============================
+# 7. SCHEMA DICHIARATIVO DELLE TABELLE
+# ===============================
+
+@dataclass(frozen=True)
+class SchemaTabella:
+    """
+    Descrizione di una tabella di Transfermarkt da raccogliere stagione per stagione
+    (il registro delle tabelle è in tabelle.py).
+    - url: modello dell'indirizzo, con {base_url}, {slug} e {lega} (competizione) e {anno}
+    - colonne: indice della cella <td> nella riga -> nome della colonna (le altre celle vengono scartate)
+    - tipi: cast finali delle colonne
+    - ordine: colonne del file finale, nell'ordine in cui vengono salvate
+    - indice_tabella: posizione della tabella nella pagina
+    - posizione: se indicato, colonna con il numero di riga (posizione in classifica)
+    - prima / dopo: espressioni Polars applicate prima e dopo i cast (es. divisione del "Gol", PPG)
+    """
+    nome: str
+    url: str
+    colonne: dict[int, str]
+    tipi: dict[str, pl.DataType]
+    ordine: tuple[str, ...]
+    indice_tabella: int = 1
+    posizione: str | None = None
+    prima: tuple[pl.Expr, ...] = ()
+    dopo: tuple[pl.Expr, ...] = ()
+
+    @property
+    def file(self) -> str:
+        return f"{self.nome}_copia.parquet"
+
+
+# 1) Lettura di una stagione: DataFrame di stringhe con le sole colonne dello schema
+def leggi_stagione(schema: SchemaTabella, contenuto: bytes, anno: int, backend: str = "auto") -> pl.DataFrame:
+    _, box_columns = leggi_tabella(contenuto, indice=schema.indice_tabella, backend=backend)
+    n_rows = len(box_columns[0]) if box_columns else 0
+    dati = {}
+    if schema.posizione is not None:
+        dati[schema.posizione] = [str(idx) for idx in range(1, n_rows + 1)]
+    for j, nome in schema.colonne.items():
+        dati[nome] = box_columns[j] if box_columns else []
+    dati["Anno"] = [str(anno)] * n_rows
+    return pl.DataFrame(dati, schema={nome: pl.String for nome in dati})
+
+
+# 2) Pulizia: concatenazione delle stagioni, espressioni e tipi dello schema
+def pulisci(schema: SchemaTabella, all_data: list[pl.DataFrame]) -> pl.DataFrame:
+    return (
+        pl.concat(all_data)
+        .with_columns(*schema.prima)
+        .with_columns([pl.col(nome).cast(tipo) for nome, tipo in schema.tipi.items()])
+        .with_columns(*schema.dopo)
+        .select(schema.ordine)
+    )
+
+
+# 3) Raccolta completa (o incrementale) di una tabella per una competizione, con salvataggio
+def aggiorna_tabella(schema: SchemaTabella, args, lega: str = LEGA_PREDEFINITA, anni=None, **opzioni) -> None:
+    """
+    Senza --leghe il risultato è il file schema.file (solo Premier League, come in origine);
+    con --leghe ogni stagione va nel dataset partizionato <cartella-dataset>/<nome>/Lega=<codice>/Anno=<anno>/.
+    """
+    partizionato = args.leghe is not None
+    radice = os.path.join(args.cartella_dataset, schema.nome)
+    checkpoint = os.path.join(CARTELLA_CHECKPOINT, schema.nome, lega)   #stagioni già lette, per riprendere uno scraping interrotto
+    etichetta = f" ({schema.nome}, {lega})"
+
+    anni = range(args.primo_anno, args.ultimo_anno + 1) if anni is None else anni
+    esistente = None
+    if args.incrementale:
+        if partizionato and os.path.isdir(os.path.join(radice, f"Lega={lega}")):
+            esistente = scansiona_partizioni(radice).filter(pl.col("Lega") == lega).select("Anno").unique().collect()
+        elif not partizionato and os.path.exists(schema.file):
+            esistente = pl.read_parquet(schema.file)
+        anni = anni_da_aggiornare(esistente, anni)    #solo stagioni mancanti o ancora in corso
+        if not anni:
+            print(f"{schema.nome}, {lega}: dataset già aggiornato, nessuna stagione da scaricare.")
+            return
+
+    slug = LEGHE.get(lega, SLUG_GENERICO)
+    urls = {anno: schema.url.format(base_url=args.base_url, slug=slug, lega=lega, anno=anno) for anno in anni}
+    lettura = functools.partial(leggi_stagione, schema, backend=args.parser)
+    all_data = raccogli_stagioni(urls, lettura, checkpoint, etichetta=etichetta, **opzioni)   #lista dei dataframe di ogni stagione, in ordine di anno
+    df = pulisci(schema, all_data)
+
+    if partizionato:
+        #una partizione per stagione, sostituita in modo atomico: le altre stagioni e leghe non vengono riscritte
+        salva_partizioni(df.with_columns(pl.lit(lega).alias("Lega")), radice, ["Lega", "Anno"])
+    else:
+        if esistente is not None:
+            df = unisci_stagioni(esistente, df)
+        salva_dati(df, schema.file, esporta_csv=args.csv)    #salvo il file in locale (Parquet, CSV con --csv), con sostituzione atomica
+    chiudi_checkpoint(checkpoint)
+
+
+# ===============================
+# 8. RIGA DI COMANDO
+# ===============================
+
+# 1) Opzioni comuni a tutti gli scraper
+def aggiungi_opzioni(parser) -> None:
+    parser.add_argument("--rps", type=float, default=0.5,
+                        help="richieste al secondo (default 0.5, una ogni 2 secondi)")
+    parser.add_argument("--max-in-volo", type=int, default=1,
+                        help="richieste contemporanee (1 = sequenziale)")
+    parser.add_argument("--tentativi", type=int, default=4, help="tentativi per pagina su 429/5xx")
+    parser.add_argument("--backoff", type=float, default=1.0, help="attesa base del backoff esponenziale (s)")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="sito da cui scaricare (es. http://localhost:8000 per un server di prova locale)")
+    parser.add_argument("--csv", action="store_true", help="esporta anche il CSV")
+    parser.add_argument("--replay", action="store_true",
+                        help="nessuna richiesta in rete: usa solo le pagine già in cache")
+    parser.add_argument("--no-cache", action="store_true", help="non leggere né scrivere la cache su disco")
+    parser.add_argument("--ttl-ore", type=float, default=24,
+                        help="validità in cache della stagione in corso (le stagioni concluse non scadono)")
+    parser.add_argument("--cartella-cache", default=CARTELLA_CACHE, help="cartella della cache delle pagine")
+    parser.add_argument("--primo-anno", type=int, default=1992, help="prima stagione da raccogliere")
+    parser.add_argument("--ultimo-anno", type=int, default=2023, help="ultima stagione da raccogliere (2023 = 2023/24)")
+    parser.add_argument("--incrementale", action="store_true",
+                        help="aggiorna il file esistente scaricando solo le stagioni mancanti o in corso")
+    parser.add_argument("--parser", choices=BACKEND_PARSING, default="auto",
+                        help="backend di lettura delle tabelle HTML")
+    parser.add_argument("--leghe", nargs="+", type=_voce_lega, metavar="CODICE[:PRIMO-ULTIMO]",
+                        help="competizioni da raccogliere (es. GB1 IT1:2000-2023 ES1), salvate nel dataset partizionato")
+    parser.add_argument("--cartella-dataset", default=CARTELLA_DATASET,
+                        help="radice del dataset partizionato per lega e stagione (con --leghe)")
+
+
+def _voce_lega(voce: str) -> tuple[str, int | None, int | None]:
+    # "IT1" -> stagioni di --primo-anno/--ultimo-anno, "IT1:2000-2023" o "IT1:2010" -> stagioni indicate
+    codice, _, intervallo = voce.partition(":")
+    if not codice:
+        raise argparse.ArgumentTypeError(f"codice della competizione mancante in {voce!r}")
+    if not intervallo:
+        return codice.upper(), None, None
+    primo, _, ultimo = intervallo.partition("-")
+    try:
+        return codice.upper(), int(primo), int(ultimo or primo)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"stagioni non valide in {voce!r} (es. IT1:2000-2023)") from None
+
+
+def leghe_da_opzioni(args) -> dict[str, range]:
+    # competizione -> stagioni da raccogliere (senza --leghe solo la Premier League)
+    standard = range(args.primo_anno, args.ultimo_anno + 1)
+    if args.leghe is None:
+        return {LEGA_PREDEFINITA: standard}
+    return {
+        codice: standard if primo is None else range(primo, ultimo + 1)
+        for codice, primo, ultimo in args.leghe
+    }
+
+
+# 2) Cache, sessione e limitatore a partire dalle opzioni
+def cache_da_opzioni(args) -> CacheHTTP | None:
+    if args.no_cache:
+        if args.replay:
+            raise SystemExit("--replay richiede la cache (togliere --no-cache)")
+        return None
+    return CacheHTTP(args.cartella_cache, ttl=args.ttl_ore * 3600)
+
+
+def opzioni_download(args) -> dict:
+    # un solo limitatore e una sola sessione per tutte le tabelle della stessa esecuzione
+    return {
+        "limitatore": LimitatoreRichieste(args.rps), "sessione": crea_sessione(args.max_in_volo),
+        "max_in_volo": args.max_in_volo, "tentativi": args.tentativi, "backoff": args.backoff,
+        "cache": cache_da_opzioni(args), "replay": args.replay,
+    }
+
+
+# 3) Esecuzione: raccoglie le tabelle indicate, per ogni competizione, condividendo connessioni,
+#    limite di richieste e richieste in volo (il budget vale per tutto lo scraping, non per tabella)
+def main(schemi: list[SchemaTabella], descrizione: str, scelta: bool = False) -> None:
+    """Con scelta=True i nomi delle tabelle da raccogliere si passano da riga di comando (di default tutte)."""
+    parser = argparse.ArgumentParser(description=descrizione)
+    if scelta:
+        parser.add_argument("tabelle", nargs="*", metavar="tabella", help=f"tra: {', '.join(s.nome for s in schemi)}")
+    aggiungi_opzioni(parser)
+    args = parser.parse_args()
+    if scelta and args.tabelle:
+        sconosciute = set(args.tabelle) - {s.nome for s in schemi}
+        if sconosciute:
+            parser.error(f"tabelle sconosciute: {', '.join(sorted(sconosciute))}")
+        schemi = [s for s in schemi if s.nome in args.tabelle]
+
+    lavori = [(schema, lega, anni) for schema in schemi for lega, anni in leghe_da_opzioni(args).items()]
+    opzioni = opzioni_download(args)
+    falliti = []
+    try:
+        #pool: le richieste di tutte le tabelle; tabelle: quante tabelle tengono il pool occupato insieme
+        with ThreadPoolExecutor(max_workers=args.max_in_volo) as pool, \
+                ThreadPoolExecutor(max_workers=max(1, min(len(lavori), args.max_in_volo))) as tabelle:
+            futuri = {
+                tabelle.submit(aggiorna_tabella, schema, args, lega, anni, pool=pool, **opzioni): f"{schema.nome} {lega}"
+                for schema, lega, anni in lavori
+            }
+            for futuro in as_completed(futuri):
+                try:
+                    futuro.result()
+                except Exception as errore:    # le altre tabelle continuano, le stagioni lette restano nei checkpoint
+                    print(f"{futuri[futuro]}: non completata ({errore})")
+                    falliti.append(futuri[futuro])
+    finally:
+        opzioni["sessione"].close()
+    if falliti:
+        raise SystemExit(f"Tabelle non completate: {', '.join(sorted(falliti))} (rilanciare per riprendere dai checkpoint)")
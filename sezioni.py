@@ -0,0 +1,72 @@
+# FILE delle sezioni interattive: st.fragment con ingressi espliciti e tempo di ogni interazione
+#
+# Un widget dentro una sezione (es. lo slider degli anni in Titles) riesegue solo la funzione della sezione,
+# non la pagina intera: caricamento dei dati, modelli e grafici delle altre sezioni restano come sono.
+# Ogni sezione riceve i dati che usa come argomenti (li conserva Streamlit tra un'esecuzione e l'altra)
+# e scrive sotto di sé quanto ha impiegato, accanto al tempo dell'ultimo rerun completo della pagina.
+
+import functools
+import threading
+import time
+from typing import Callable
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from grafici import riepilogo_payload
+
+# inizio del rerun completo in corso (ogni rerun gira nel thread della propria sessione)
+_rerun = threading.local()
+
+
+# ===============================
+# 1. TEMPO DELLA PAGINA INTERA
+# ===============================
+
+# 1) Da chiamare all'inizio della pagina, prima del caricamento dei dati
+def inizio_pagina() -> None:
+    _rerun.inizio = time.perf_counter()
+
+
+# 2) Da chiamare in fondo alla pagina: tempo del rerun completo, ricordato per le sezioni e restituito per la sidebar
+def fine_pagina(pagina: str) -> str:
+    ms = (time.perf_counter() - _rerun.inizio) * 1000
+    st.session_state.setdefault("tempi_pagine", {})[pagina] = ms
+    return f"Rerun completo della pagina: {ms:.0f} ms"
+
+
+# ===============================
+# 2. SEZIONI
+# ===============================
+
+def _solo_sezioni() -> bool:
+    """True se Streamlit sta rieseguendo solo delle sezioni (un widget dentro un fragment), non la pagina."""
+    ctx = get_script_run_ctx()
+    return ctx is not None and bool(ctx.fragment_ids_this_run)
+
+
+# 1) Decoratore: la funzione diventa un fragment che si riesegue da solo quando cambia un suo widget
+def sezione(pagina: str) -> Callable[[Callable[..., None]], Callable[..., None]]:
+    """
+    @sezione("Titles") sopra una funzione che disegna una parte della pagina.
+    - I widget creati nella funzione rieseguono solo la funzione (st.fragment)
+    - Sotto la sezione: tempo dell'ultima esecuzione; se è stata rieseguita da sola, anche il tempo
+      dell'ultimo rerun completo e i byte dei grafici inviati (riepilogo_payload)
+    """
+    def decoratore(funzione: Callable[..., None]) -> Callable[..., None]:
+        @st.fragment
+        @functools.wraps(funzione)
+        def eseguita(*args, **kwargs) -> None:
+            t0 = time.perf_counter()
+            funzione(*args, **kwargs)
+            ms = (time.perf_counter() - t0) * 1000
+            if not _solo_sezioni():
+                st.caption(f"Sezione: {ms:.0f} ms")
+                return
+            completa = st.session_state.get("tempi_pagine", {}).get(pagina)
+            testo = f"Rieseguita solo questa sezione: {ms:.0f} ms"
+            if completa is not None:
+                testo += f" (rerun completo della pagina: {completa:.0f} ms)"
+            st.caption(f"{testo}  \n{riepilogo_payload(f'{pagina} - {funzione.__name__}')}")
+        return eseguita
+    return decoratore
@@ -0,0 +1,64 @@
+# FILE nomi delle squadre: i dataset non usano tutti lo stesso nome per la stessa squadra
+#
+# rankings (classifiche di Transfermarkt) usa i nomi brevi ("Manchester Utd."), mentre average_age,
+# winners/principale e perpetua usano quelli completi ("Manchester United"); top_scorer usa quelli completi
+# ma scritti diversamente per tre squadre ("FC Tottenham Hotspur").
+# Quando una squadra nuova arriva in Premier League va aggiunta qui: i nomi non presenti restano invariati.
+
+import polars as pl
+
+
+# nome in rankings -> nome completo (average_age, principale, perpetua)
+NOMI_SQUADRE: dict[str, str] = {
+    "Arsenal": "FC Arsenal",
+    "Birmingham": "Birmingham City",
+    "Blackburn": "Blackburn Rovers",
+    "Blackpool": "FC Blackpool",
+    "Bolton": "Bolton Wanderers",
+    "Bournemouth": "AFC Bournemouth",
+    "Bradford": "Bradford City",
+    "Brentford": "FC Brentford",
+    "Brighton": "Brighton & Hove Albion",
+    "Burnley": "FC Burnley",
+    "Cardiff": "Cardiff City",
+    "Charlton": "Charlton Athletic",
+    "Chelsea": "Chelsea FC",
+    "Derby": "Derby County",
+    "Everton": "FC Everton",
+    "Huddersfield": "Huddersfield Town",
+    "Ipswich": "Ipswich Town",
+    "Leeds": "Leeds United",
+    "Liverpool": "FC Liverpool",
+    "Luton": "Luton Town",
+    "Manchester Utd.": "Manchester United",
+    "Middlesbrough": "FC Middlesbrough",
+    "Newcastle Utd.": "Newcastle United",
+    "Norwich": "Norwich City",
+    "Nottm Forest": "Nottingham Forest",
+    "QPR": "Queens Park Rangers",
+    "Reading": "FC Reading",
+    "Sheff Utd": "Sheffield United",
+    "Sheff Wed": "Sheffield Wednesday",
+    "Southampton": "FC Southampton",
+    "Sunderland": "AFC Sunderland",
+    "Tottenham": "Tottenham Hotspur",
+    "Watford": "FC Watford",
+    "West Brom": "West Bromwich Albion",
+    "West Ham Utd.": "West Ham United",
+    "Wigan": "Wigan Athletic",
+    "Wimbledon FC": "Wimbledon FC (- 2004)",
+    "Wolverhampton": "Wolverhampton Wanderers",
+}
+
+
+# nome in top_scorer -> nome completo, solo dove è diverso
+NOMI_CAPOCANNONIERI: dict[str, str] = {
+    "FC Newcastle United": "Newcastle United",
+    "FC Tottenham Hotspur": "Tottenham Hotspur",
+    "Sunderland AFC": "AFC Sunderland",
+}
+
+
+def nome_completo(colonna: str = "Squadra", nomi: dict[str, str] = NOMI_SQUADRE) -> pl.Expr:
+    """Nome completo della squadra a partire dal nome di rankings (o di top_scorer con NOMI_CAPOCANNONIERI)."""
+    return pl.col(colonna).replace(nomi)
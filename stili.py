@@ -0,0 +1,87 @@
+# FILE stili delle tabelle mostrate con st.dataframe (pandas Styler)
+#
+# Lo stile di ogni cella si calcola per l'intera tabella in un solo passaggio NumPy (una matrice di CSS),
+# invece di una funzione Python chiamata per ogni riga o cella. Tabella e CSS restano in cache
+# per versione del dataset (hash del contenuto, vedi dati.py).
+
+import functools
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import matplotlib.colors as mcolors
+import numpy as np
+import pandas as pd
+from pandas.io.formats.style import Styler
+
+
+# ===============================
+# 1. MATRICI DI CSS
+# ===============================
+
+CELLA_VUOTA = "background-color: transparent; text-align: center;"
+PASSI_LUT = 256
+
+
+# 1) CSS di ognuno dei 256 colori della scala (stessi colori di cmap(valore) + to_hex)
+@functools.lru_cache(maxsize=16)
+def lut_css(colori: tuple[str, ...]) -> np.ndarray:
+    cmap = mcolors.LinearSegmentedColormap.from_list("scala", list(colori), N=PASSI_LUT)
+    return np.array(
+        [f"background-color: {mcolors.to_hex(rgba)}; color: black; text-align: center;"
+         for rgba in cmap(np.arange(PASSI_LUT))],
+        dtype=object,
+    )
+
+
+# 2) Scala di colori: valori normalizzati tra vmin e vmax, poi un indice nella LUT (NaN -> cella trasparente)
+def scala_colori(valori: pd.DataFrame, vmin: float, vmax: float, colori: tuple[str, ...]) -> pd.DataFrame:
+    v = valori.to_numpy(dtype=np.float64)
+    norm = np.clip((v - vmin) / (vmax - vmin), 0.0, 1.0)
+    indici = np.minimum((np.nan_to_num(norm) * PASSI_LUT).astype(np.int64), PASSI_LUT - 1)
+    css = np.where(np.isnan(v), CELLA_VUOTA, lut_css(colori)[indici])
+    return pd.DataFrame(css, index=valori.index, columns=valori.columns)
+
+
+# 3) Righe della squadra evidenziate (colore con '55' finale, ~30% di opacità)
+def evidenzia_righe(df: pd.DataFrame, colonna: str, valore: str, colore_hex: str) -> pd.DataFrame:
+    righe = (df[colonna] == valore).to_numpy()[:, None]
+    css = np.where(righe, f"background-color: {colore_hex}55", "")
+    return pd.DataFrame(np.broadcast_to(css, df.shape), index=df.index, columns=df.columns)
+
+
+# 4) Styler con la matrice di CSS applicata in una sola chiamata
+def applica(df: pd.DataFrame, css: pd.DataFrame) -> Styler:
+    return df.style.apply(lambda _: css, axis=None)
+
+
+# ===============================
+# 2. CACHE PER VERSIONE DEL DATASET
+# ===============================
+
+# (chiave, versione) -> (tabella, CSS); lo Styler si crea a ogni uso perché pandas lo modifica mentre lo disegna
+_stili: OrderedDict[tuple, tuple[pd.DataFrame, pd.DataFrame]] = OrderedDict()
+_lock = threading.Lock()
+MAX_STILI = 32
+
+
+def stile_in_cache(chiave: tuple, versione: str,
+                   crea: Callable[[], tuple[pd.DataFrame, pd.DataFrame]]) -> Styler:
+    """
+    Styler della tabella chiave per la versione del dataset da cui viene (es. versione_dati(path)):
+    crea() restituisce (tabella, CSS) e viene chiamata solo quando la versione cambia.
+    """
+    voce = (chiave, versione)
+    with _lock:
+        trovato = _stili.get(voce)
+        if trovato is not None:
+            _stili.move_to_end(voce)
+    if trovato is None:
+        trovato = crea()
+        with _lock:
+            for vecchia in [k for k in _stili if k[0] == chiave]:    # versioni precedenti della stessa tabella
+                del _stili[vecchia]
+            _stili[voce] = trovato
+            while len(_stili) > MAX_STILI:
+                _stili.popitem(last=False)
+    return applica(*trovato)
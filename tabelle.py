@@ -0,0 +1,45 @@
+# FILE registro delle tabelle di Transfermarkt raccolte dagli scraper
+#
+# Ogni tabella è descritta da uno SchemaTabella (scraping.py): indirizzo, celle da tenere,
+# trasformazioni e tipi. Per aggiungere una tabella basta aggiungere uno schema a SCHEMI.
+#
+# Uso (dalla cartella del progetto):
+#   python tabelle.py rankings average_age --max-in-volo 4 --rps 1
+#   python tabelle.py --leghe GB1 IT1 ES1:2000-2023 --max-in-volo 8 --rps 2
+
+import polars as pl
+
+from scraping import SchemaTabella, main
+
+
+RANKINGS = SchemaTabella(
+    nome="rankings",
+    url="{base_url}/{slug}/tabelle/wettbewerb/{lega}?saison_id={anno}",
+    #celle della riga: posizione, stemma ("wappen"), squadra, giocate, V, P, S, "GF:GS", differenza reti, punti
+    colonne={2: "Squadra", 3: "Giocate", 4: "Vittorie", 5: "Pareggi", 6: "Sconfitte", 7: "Gol", 8: "GD", 9: "Punteggio"},
+    posizione="Posizione",
+    prima=(
+        pl.col("Gol").str.split(":").list.get(0).alias("GF"),
+        pl.col("Gol").str.split(":").list.get(1).alias("GS"),
+    ),
+    tipi={nome: pl.Int64 for nome in
+          ["Anno", "Posizione", "Punteggio", "Giocate", "Vittorie", "Pareggi", "Sconfitte", "GF", "GS", "GD"]},
+    dopo=((pl.col("Punteggio") / pl.col("Giocate")).round(2).alias("PPG"),),
+    ordine=("Anno", "Posizione", "Squadra", "Punteggio", "PPG", "Giocate", "Vittorie", "Pareggi", "Sconfitte", "GF", "GS", "GD"),
+)
+
+AVERAGE_AGE = SchemaTabella(
+    nome="average_age",
+    url="{base_url}/{slug}/altersschnitt/wettbewerb/{lega}/plus/?saison_id={anno}",
+    #celle della riga: posizione, squadra, rosa, giocatori impiegati, età media per partita ("26,3")
+    colonne={1: "Squadra", 2: "Rosa", 3: "Impiegati", 4: "Average_age"},
+    prima=(pl.col("Average_age").str.replace(",", "."),),
+    tipi={"Rosa": pl.Int64, "Impiegati": pl.Int64, "Average_age": pl.Float64, "Anno": pl.Int64},
+    ordine=("Squadra", "Rosa", "Impiegati", "Average_age", "Anno"),
+)
+
+SCHEMI = {schema.nome: schema for schema in [RANKINGS, AVERAGE_AGE]}
+
+
+if __name__ == "__main__":
+    main(list(SCHEMI.values()), "Scraping delle tabelle di Premier League da Transfermarkt", scelta=True)
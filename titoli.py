@@ -0,0 +1,94 @@
+# FILE indice dei titoli per intervallo di stagioni (somme prefisse squadra x stagione)
+#
+# Per ogni stagione t e squadra s, cumulati[t, s] = titoli vinti da s nelle prime t stagioni.
+# I titoli di ogni squadra in [min_anno, max_anno] sono la differenza di due righe dell'array:
+# lo slider degli anni nella pagina Titles non filtra né raggruppa più il dataset dei vincitori.
+# Dallo stesso indice viene anche il conteggio cumulativo del grafico a barre (titles).
+
+import functools
+from dataclasses import dataclass, field
+
+import numpy as np
+import polars as pl
+
+from dati import carica_dati, versione_dati
+
+
+# ===============================
+# 1. INDICE
+# ===============================
+
+@dataclass
+class IndiceTitoli:
+    """
+    Somme prefisse dei titoli, righe = stagioni (più la riga 0 di zeri), colonne = squadre.
+    - anni, stagioni: una voce per stagione, in ordine di anno
+    - vincitori[t]: colonna della squadra che ha vinto la stagione t
+    - indice: squadra -> colonna
+    """
+    squadre: list[str]
+    anni: np.ndarray
+    stagioni: list[str]
+    vincitori: np.ndarray
+    cumulati: np.ndarray
+    indice: dict[str, int] = field(init=False)
+
+    def __post_init__(self):
+        self.indice = {squadra: k for k, squadra in enumerate(self.squadre)}
+
+    # 1) Dal dataset dei vincitori (principale): una riga per stagione con Anno, Stagione e Vincitore
+    @classmethod
+    def da_dataframe(cls, df: pl.DataFrame) -> "IndiceTitoli":
+        df = df.select("Anno", "Stagione", "Vincitore").sort("Anno")
+        squadre = df["Vincitore"].unique().sort().to_list()
+        vincitori = df["Vincitore"].replace_strict({s: k for k, s in enumerate(squadre)}, return_dtype=pl.Int64).to_numpy()
+        titoli = np.zeros((df.height + 1, len(squadre)), dtype=np.int64)
+        titoli[np.arange(1, df.height + 1), vincitori] = 1
+        return cls(squadre, df["Anno"].to_numpy(), df["Stagione"].to_list(), vincitori, np.cumsum(titoli, axis=0))
+
+    # 2) Titoli di ogni squadra nelle stagioni con min_anno <= Anno <= max_anno: due righe e una sottrazione
+    def intervallo(self, min_anno: int, max_anno: int) -> np.ndarray:
+        inizio = np.searchsorted(self.anni, min_anno, side="left")
+        fine = np.searchsorted(self.anni, max_anno, side="right")
+        return self.cumulati[max(fine, inizio)] - self.cumulati[inizio]
+
+    # 3) Tabella del grafico a torta: squadre con almeno un titolo nell'intervallo, con la percentuale
+    def distribuzione(self, min_anno: int, max_anno: int) -> pl.DataFrame:
+        titoli = self.intervallo(min_anno, max_anno)
+        vinte = np.flatnonzero(titoli)
+        percentuale = titoli[vinte] / titoli.sum() * 100
+        return pl.DataFrame({
+            "Vincitore": [self.squadre[k] for k in vinte],
+            "Totale_Titoli": titoli[vinte],
+            "Percentuale": percentuale,
+        }).with_columns(
+            (pl.col("Percentuale").round(1).cast(pl.Utf8) + "%").alias("Percentuale_str")
+        )
+
+    # 4) Titoli cumulativi del vincitore di ogni stagione (stesse righe e colonne di titles)
+    def cumulativi(self) -> pl.DataFrame:
+        righe = np.arange(1, len(self.anni) + 1)
+        return pl.DataFrame({
+            "Stagione": self.stagioni,
+            "Vincitore": [self.squadre[k] for k in self.vincitori],
+            "Titoli": self.cumulati[righe, self.vincitori],
+            "Anno": self.anni,
+        })
+
+    # 5) Massimo dei titoli di una squadra (per la scala del grafico a barre)
+    def massimo(self) -> int:
+        return int(self.cumulati[-1].max())
+
+
+# ===============================
+# 2. INDICE IN CACHE
+# ===============================
+
+# Indice costruito una volta per versione del file (hash del contenuto, vedi dati.py)
+@functools.lru_cache(maxsize=4)
+def _titoli(path: str, versione: str) -> IndiceTitoli:
+    return IndiceTitoli.da_dataframe(carica_dati(path, colonne=["Anno", "Stagione", "Vincitore"]))
+
+
+def indice_titoli(path: str = "principale.parquet") -> IndiceTitoli:
+    return _titoli(path, versione_dati(path))